@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Fuzz the bash rule pipeline with pathological commands and report worst-case cost.
+
+Generates random commands that grow along one dimension each (long chains,
+long pipelines, deep process substitution nesting, large heredocs, long
+words, and random shell-ish noise), then times evaluate_bash_rules on every
+command with the command complexity limits enabled and, for comparison,
+effectively disabled. With limits, the worst case stays bounded no matter
+how large the generated command is.
+
+Usage:
+    uv run python -m benchmarks.bench_command_limits [--commands 300] [--seed 1]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from src.evaluation.handlers import evaluate_bash_rules
+from src.evaluation.limits import CommandLimits
+from src.evaluation.parser import BashCommandParser
+from src.server.enums import SourceClient
+from src.server.models import ToolUseEvent
+
+UNLIMITED = CommandLimits(
+    max_length=sys.maxsize,
+    max_segments=sys.maxsize,
+    max_depth=sys.maxsize,
+    max_heredoc_bytes=sys.maxsize,
+)
+
+WORDS = ["ls", "cat", "git", "status", "grep", "-v", "foo", "a.txt", "'x y'", "$HOME"]
+NOISE = list(" ;|&()<>'\"\\$`{}[]*?!#=\n") + WORDS
+
+
+def chain(rng: random.Random, size: int) -> str:
+    return " && ".join(rng.choice(["ls", "pwd", "git status"]) for _ in range(size))
+
+
+def pipeline(rng: random.Random, size: int) -> str:
+    return " | ".join(rng.choice(["cat a", "sort", "uniq -c"]) for _ in range(size))
+
+
+def nested(rng: random.Random, size: int) -> str:
+    command = "cat a"
+    for _ in range(size):
+        command = f"diff <({command}) {rng.choice(WORDS)}"
+    return command
+
+
+def heredoc(rng: random.Random, size: int) -> str:
+    body = "\n".join(" ".join(rng.choices(WORDS, k=6)) for _ in range(size))
+    return f"cat > out.txt <<EOF\n{body}\nEOF"
+
+
+def long_word(rng: random.Random, size: int) -> str:
+    return "echo " + "".join(rng.choices("abcdef", k=size * 10))
+
+
+def noise(rng: random.Random, size: int) -> str:
+    return "".join(rng.choices(NOISE, k=size))
+
+
+GENERATORS: Dict[str, Callable[[random.Random, int], str]] = {
+    "chain": chain,
+    "pipeline": pipeline,
+    "nested": nested,
+    "heredoc": heredoc,
+    "long_word": long_word,
+    "noise": noise,
+}
+
+
+def generate(rng: random.Random, count: int) -> List[str]:
+    """Commands of each shape, with sizes spread log-uniformly up to 4096."""
+    commands = []
+    for i in range(count):
+        shape = list(GENERATORS)[i % len(GENERATORS)]
+        size = int(2 ** rng.uniform(0, 12))
+        if shape == "nested":
+            size = min(size, 200)  # bashlex recurses per level
+        commands.append(GENERATORS[shape](rng, size))
+    return commands
+
+
+def run(commands: List[str], limits: CommandLimits) -> List[float]:
+    """Return per-command evaluation time in milliseconds."""
+    BashCommandParser.configure_limits(limits)
+    timings = []
+    for command in commands:
+        event = ToolUseEvent(
+            session_id="bench-session",
+            source_client=SourceClient.CLAUDE_CODE,
+            tool_name="Bash",
+            tool_is_bash=True,
+            command=command,
+        )
+        start = time.perf_counter()
+        list(evaluate_bash_rules(event))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> None:
+    ordered = sorted(timings)
+    p99 = ordered[max(0, int(len(ordered) * 0.99) - 1)]
+    print(
+        f"{name:<10} mean {statistics.mean(ordered):8.2f} ms"
+        f"  p99 {p99:8.2f} ms  max {ordered[-1]:8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--skip-unlimited",
+        action="store_true",
+        help="Only run with limits (the unlimited run can take minutes)",
+    )
+    args = parser.parse_args()
+
+    commands = generate(random.Random(args.seed), args.commands)
+    print(f"{len(commands)} commands, longest {max(map(len, commands))} characters\n")
+
+    limited = run(commands, CommandLimits())
+    report("limited", limited)
+    if not args.skip_unlimited:
+        report("unlimited", run(commands, UNLIMITED))
+
+    BashCommandParser.configure_limits(CommandLimits())
+
+
+if __name__ == "__main__":
+    main()
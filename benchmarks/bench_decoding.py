@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Compare request decoding paths for Claude Code hook payloads.
+
+The two-pass path is how routes decoded requests before: json.loads, validate
+a RequestWrapper with a dict event, validate the event again into the hook
+model, then model_dump it for the Rego parameters. The single-pass path
+validates the raw bytes straight into HookRequest[PreToolUseInput].
+
+Usage:
+    uv run python -m benchmarks.bench_decoding [--iterations 2000]
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Dict, List
+
+from pydantic import BaseModel
+
+from src.server.claude_code.api.pre_tool_use import PreToolUseInput
+from src.server.claude_code.api.request_wrapper import HookRequest
+
+
+class RequestWrapper(BaseModel):
+    """Previous wrapper: event left as an untyped dict."""
+
+    bundles: List[str]
+    event: Dict[str, Any]
+
+
+def payload(tool_name: str, tool_input: Dict[str, Any]) -> bytes:
+    return json.dumps(
+        {
+            "bundles": ["universal", "python_uv"],
+            "event": {
+                "session_id": "bench-session",
+                "transcript_path": "/tmp/transcript.jsonl",
+                "cwd": "/workspace",
+                "hook_event_name": "PreToolUse",
+                "tool_name": tool_name,
+                "tool_input": tool_input,
+                "tool_use_id": "toolu_bench",
+            },
+        }
+    ).encode()
+
+
+def two_pass(body: bytes):
+    wrapper = RequestWrapper.model_validate(json.loads(body))
+    input_data = PreToolUseInput(**wrapper.event)
+    return input_data.model_dump(exclude={"session_id", "tool_name"})
+
+
+def single_pass(body: bytes):
+    input_data = HookRequest[PreToolUseInput].model_validate_json(body).event
+    return {
+        name: value
+        for name, value in input_data
+        if name not in ("session_id", "tool_name")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    source = "\n".join(f"def f{i}(x):\n    return x * {i}\n" for i in range(4000))
+    cases = {
+        "small Bash": payload("Bash", {"command": "git status"}),
+        "large Write": payload(
+            "Write", {"file_path": "/workspace/big.py", "content": source}
+        ),
+    }
+
+    for name, body in cases.items():
+        assert two_pass(body) == single_pass(body)
+        results = []
+        for label, decode in (("two-pass", two_pass), ("single-pass", single_pass)):
+            seconds = timeit.timeit(lambda: decode(body), number=args.iterations)
+            results.append(seconds)
+            print(
+                f"{name:<12} ({len(body):>7} bytes) {label:<12}"
+                f" {seconds / args.iterations * 1e6:9.1f} us"
+            )
+        print(f"{name:<12} speedup {results[0] / results[1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
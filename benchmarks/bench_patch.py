@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Compare per-line PatchLine objects with the compact PatchLines sequence.
+
+The per-line path is how large Writes were handled before: one validated
+PatchLine model per diff line, then a list of dicts for the Rego input. The
+compact path keeps the decoded diff lines plus an operation code per line
+and hands Rego a lazy view. Timings cover building the patch and encoding
+it as Rego input; memory is what the parsed patch keeps alive on top of the
+decoded request.
+
+Usage:
+    uv run python -m benchmarks.bench_patch [--lines 10000] [--iterations 20]
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+from typing import Any, Dict, List
+
+from regopy import Input
+
+from src.server.models import PatchLine, PatchLines, StructuredPatch
+
+
+class _PerLinePatch:
+    """Previous representation: a list of validated PatchLine models."""
+
+    def __init__(self, raw_lines: List[str]):
+        self.lines = [
+            PatchLine(operation="added", content=line[1:]) for line in raw_lines
+        ]
+
+
+def per_line_parse(raw_lines: List[str]) -> Any:
+    return _PerLinePatch(raw_lines)
+
+
+def compact_parse(raw_lines: List[str]) -> Any:
+    return StructuredPatch(
+        oldStart=0,
+        oldLines=0,
+        newStart=1,
+        newLines=len(raw_lines),
+        lines=PatchLines.from_diff(raw_lines),
+    )
+
+
+def per_line_document(patch: Any) -> Dict[str, Any]:
+    return {
+        "lines": [
+            {"operation": line.operation, "content": line.content}
+            for line in patch.lines
+        ]
+    }
+
+
+def compact_document(patch: Any) -> Dict[str, Any]:
+    return {"lines": patch.lines.documents()}
+
+
+def retained_bytes(parse, raw_lines: List[str]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    patch = parse(raw_lines)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del patch
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    raw_lines = [
+        f"+def f{i}(x):" if i % 2 == 0 else f"+    return x * {i}"
+        for i in range(args.lines)
+    ]
+    paths = {
+        "per-line": (per_line_parse, per_line_document),
+        "compact": (compact_parse, compact_document),
+    }
+
+    timings = {}
+    for label, (parse, document) in paths.items():
+        patch = parse(raw_lines)
+        steps = {
+            "parse": lambda: parse(raw_lines),
+            "rego input": lambda: Input(document(patch)),
+        }
+        for step, run in steps.items():
+            seconds = timeit.timeit(run, number=args.iterations)
+            timings[(label, step)] = seconds
+            print(f"{label:<9} {step:<10} {seconds / args.iterations * 1e3:9.2f} ms")
+        print(
+            f"{label:<9} {'memory':<10}"
+            f" {retained_bytes(parse, raw_lines) / 1024:9.0f} KiB"
+        )
+
+    for step in ("parse", "rego input"):
+        speedup = timings[("per-line", step)] / timings[("compact", step)]
+        print(f"{step} speedup {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
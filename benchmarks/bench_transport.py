@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Compare per-hook round-trip latency over TCP loopback and a Unix socket.
+
+Starts the policy server listening on both transports, then sends the same
+PreToolUse event repeatedly over each, once reusing a connection and once
+opening a new connection per hook (as a short-lived hook client does).
+
+Usage:
+    uv run python -m benchmarks.bench_transport [--requests 2000]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+EVENT = {
+    "event": {
+        "session_id": "bench-session",
+        "transcript_path": "/tmp/transcript.jsonl",
+        "cwd": "/workspace",
+        "hook_event_name": "PreToolUse",
+        "tool_name": "Bash",
+        "tool_input": {"command": "git status"},
+        "tool_use_id": "toolu_bench",
+    },
+    "bundles": ["universal"],
+}
+PATH = "/policy/claude-code/PreToolUse"
+BODY = json.dumps(EVENT).encode()
+HEADERS = {"Content-Type": "application/json"}
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, path: str):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def post(conn: http.client.HTTPConnection) -> None:
+    """Send the hook event and read the full response."""
+    conn.request("POST", PATH, body=BODY, headers=HEADERS)
+    response = conn.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"Unexpected status {response.status}")
+
+
+def start_server(port: int, uds_path: str) -> subprocess.Popen:
+    """Start the server on TCP and UDS and wait until both accept requests."""
+    env = dict(
+        os.environ,
+        POLICY_SERVER_HOST="127.0.0.1",
+        POLICY_SERVER_PORT=str(port),
+        POLICY_SERVER_UDS=uds_path,
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.main"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            post(http.client.HTTPConnection("127.0.0.1", port))
+            post(UnixHTTPConnection(uds_path))
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Server did not start within 30 seconds")
+
+
+def measure(send: Callable[[], None], requests: int) -> List[float]:
+    """Return per-request latencies in milliseconds after a warmup."""
+    for _ in range(min(100, requests)):
+        send()
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        send()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: List[float]) -> None:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:<28} mean {statistics.mean(latencies):7.3f} ms"
+        f"  p50 {statistics.median(latencies):7.3f} ms  p99 {p99:7.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=18338)
+    args = parser.parse_args()
+
+    uds_path = os.path.join(tempfile.mkdtemp(), "policy.sock")
+    server = start_server(args.port, uds_path)
+
+    def tcp_connection() -> http.client.HTTPConnection:
+        return http.client.HTTPConnection("127.0.0.1", args.port)
+
+    def uds_connection() -> http.client.HTTPConnection:
+        return UnixHTTPConnection(uds_path)
+
+    def fresh(connect: Callable[[], http.client.HTTPConnection]):
+        def send():
+            conn = connect()
+            post(conn)
+            conn.close()
+
+        return send
+
+    try:
+        tcp, uds = tcp_connection(), uds_connection()
+        report("TCP keep-alive", measure(lambda: post(tcp), args.requests))
+        report("UDS keep-alive", measure(lambda: post(uds), args.requests))
+        report(
+            "TCP new connection per hook",
+            measure(fresh(tcp_connection), args.requests),
+        )
+        report(
+            "UDS new connection per hook",
+            measure(fresh(uds_connection), args.requests),
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
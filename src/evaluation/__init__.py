@@ -2,18 +2,39 @@
 
 This module provides the foundation for the Rego-based policy system:
 - BashCommandParser: Parse bash commands into structured AST
+- CommandLimits: Complexity bounds enforced by the parser
 - RegoEvaluator: Evaluate Rego policies against commands
+- canonical_key: Stable cache key for semantically equivalent commands
 """
 
-from src.evaluation.parser import BashCommandParser, ParsedCommand, ParseError
+from src.evaluation.limits import CommandLimits
+from src.evaluation.parser import (
+    BashCommandParser,
+    CommandTooComplex,
+    ParsedCommand,
+    ParseError,
+)
+from src.evaluation.normalize import canonical_key
 from src.evaluation.rego import RegoEvaluator
-from src.evaluation.handlers import evaluate_bash_rules, evaluate_guidance
 
 __all__ = [
     "BashCommandParser",
+    "CommandLimits",
+    "CommandTooComplex",
     "ParsedCommand",
     "ParseError",
     "RegoEvaluator",
+    "canonical_key",
     "evaluate_bash_rules",
     "evaluate_guidance",
 ]
+
+
+def __getattr__(name):
+    # Handlers import the guidance checks, which use this package's caches;
+    # importing them lazily lets src.guidance be imported first
+    if name in ("evaluate_bash_rules", "evaluate_guidance"):
+        from src.evaluation import handlers
+
+        return getattr(handlers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
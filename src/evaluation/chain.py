@@ -0,0 +1,181 @@
+"""Top-level command chain splitter.
+
+split_chain() cuts a command line at its top-level `&&`, `||`, `;` and `|`
+operators in one quote-aware pass, so the parser can parse (and cache) each
+segment on its own. Operators inside quotes, backticks, `$(...)`, `<(...)`,
+subshells and `${...}` are not top level.
+
+The splitter only handles what it can split with certainty. Commands with
+heredocs, comments, unquoted newlines, background `&`, `|&`, compound
+commands or subshell segments are left to bashlex as a whole (split_chain()
+returns None), as are commands with nothing to split.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Words that open compound commands; `;` inside them is not a chain operator
+_COMPOUND_WORDS = frozenset(
+    "! [[ { case coproc do done elif else esac fi for function if in "
+    "select then time until while".split()
+)
+
+Span = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class CommandChain:
+    """Segment spans of a command, grouped into pipelines.
+
+    Attributes:
+        pipelines: Spans of each pipeline's commands, whitespace trimmed
+        is_list: Whether any pipelines are joined by `&&`, `||` or `;`
+    """
+
+    pipelines: List[List[Span]]
+    is_list: bool
+
+
+def _skip_quoted(command: str, i: int) -> Optional[int]:
+    """Return the offset after the quoted string or backtick span at i."""
+    quote = command[i]
+    i += 1
+    while i < len(command):
+        char = command[i]
+        if char == quote:
+            return i + 1
+        if quote != "'" and char == "\\":
+            i += 2
+            continue
+        if quote == '"' and (char == "`" or command.startswith("$(", i)):
+            return None  # Nested substitution inside double quotes
+        i += 1
+    return None
+
+
+def _trim(command: str, start: int, end: int) -> Span:
+    while start < end and command[start] in " \t":
+        start += 1
+    while end > start and command[end - 1] in " \t":
+        end -= 1
+    return start, end
+
+
+def _is_simple_segment(command: str, span: Span) -> bool:
+    """Check that a segment is a plain command bashlex can parse alone."""
+    start, end = span
+    if start == end or command[start] in "({":
+        return False
+    first_word = command[start:end].split(None, 1)[0]
+    return first_word not in _COMPOUND_WORDS
+
+
+def split_chain(command: str) -> Optional[CommandChain]:
+    """Split a command at its top-level chain and pipe operators.
+
+    Args:
+        command: Raw command text without heredocs
+
+    Returns:
+        CommandChain with two or more segments, or None if the command has
+        a single segment or uses syntax the splitter leaves to bashlex
+    """
+    pipelines: List[List[Span]] = [[]]
+    is_list = False
+    closers: List[str] = []
+    segment_start = 0
+    i = 0
+    length = len(command)
+
+    def cut(end: int) -> Span:
+        return _trim(command, segment_start, end)
+
+    while i < length:
+        char = command[i]
+
+        if char == "\\":
+            i += 2
+            continue
+        if char in ("'", '"', "`"):
+            skipped = _skip_quoted(command, i)
+            if skipped is None:
+                return None
+            i = skipped
+            continue
+        if char == "\n":
+            return None
+        if char == "#" and (i == 0 or command[i - 1] in " \t;&|()"):
+            return None
+        if char == "(":
+            closers.append(")")
+        elif char == "$" and command.startswith("${", i):
+            closers.append("}")
+            i += 2
+            continue
+        elif closers and char == closers[-1]:
+            closers.pop()
+        elif char == ")":
+            return None
+        elif closers:
+            pass
+        elif char == "<" and command.startswith("<<", i):
+            if not command.startswith("<<<", i):
+                return None
+            i += 3
+            continue
+        elif char == ";":
+            if command.startswith(";;", i):
+                return None
+            pipelines[-1].append(cut(i))
+            pipelines.append([])
+            is_list = True
+            segment_start = i + 1
+        elif char == "|":
+            previous = command[i - 1] if i else ""
+            if previous == ">":
+                pass  # >| clobber redirect
+            elif command.startswith("||", i):
+                pipelines[-1].append(cut(i))
+                pipelines.append([])
+                is_list = True
+                segment_start = i + 2
+                i += 2
+                continue
+            elif command.startswith("|&", i):
+                return None
+            else:
+                pipelines[-1].append(cut(i))
+                segment_start = i + 1
+        elif char == "&":
+            previous = command[i - 1] if i else ""
+            if previous in ("<", ">") or command.startswith("&>", i):
+                pass  # Redirect (>&, <&, &>)
+            elif command.startswith("&&", i):
+                pipelines[-1].append(cut(i))
+                pipelines.append([])
+                is_list = True
+                segment_start = i + 2
+                i += 2
+                continue
+            else:
+                return None  # Background job
+        i += 1
+
+    if closers:
+        return None
+
+    last = cut(length)
+    if last[0] == last[1] and pipelines[-1] == [] and len(pipelines) > 1:
+        # A single trailing `;` ends the list without another command
+        if command[segment_start - 1] != ";":
+            return None
+        pipelines.pop()
+    else:
+        pipelines[-1].append(last)
+
+    spans = [span for pipeline in pipelines for span in pipeline]
+    if len(spans) < 2:
+        return None
+    if not all(_is_simple_segment(command, span) for span in spans):
+        return None
+    return CommandChain(pipelines, is_list)
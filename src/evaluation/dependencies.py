@@ -0,0 +1,511 @@
+"""Static analysis of which session flags each policy bundle reads.
+
+Result caches must include every session flag a policy can read in their
+keys, but including the full flag snapshot invalidates every entry whenever
+any flag changes (invocation-expiring flags change on every request). This
+module scans the Rego sources once at startup and records, per bundle, which
+flags each rule reads and which executable/subcommand guards the rule has,
+so cache keys can be built from only the flags that can affect a result.
+
+The analysis is conservative: any read it cannot resolve to a literal flag
+name makes the rule depend on all flags.
+
+Rules that read the command text as written (`input.event.command`,
+`input.parsed.original`) are tracked as well: results of bundles that
+include such rules depend on more than the canonical command key.
+
+The same scan records which file path tests the guidance activation rules
+make (see ActivationPaths), so activations can be reused for every path
+that passes the same tests.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Package providing flag accessor functions whose first argument is the flag name
+FLAG_ACCESSOR_PACKAGE = "helpers.flags"
+
+# Rules queried by the evaluator; other rules are helpers referenced by them
+_QUERIED_RULES = {"decisions", "guidances", "guidance_activations"}
+
+_PACKAGE_RE = re.compile(r"^package\s+([\w.]+)", re.MULTILINE)
+_IMPORT_RE = re.compile(r"^import\s+data\.([\w.]+)(?:\s+as\s+(\w+))?", re.MULTILINE)
+_DATA_REF_RE = re.compile(r"\bdata\.([\w.]+)")
+# Input fields holding the command as written, or whole documents containing them
+_RAW_COMMAND_RE = re.compile(
+    r"\binput\.event\.(?:command|parameters)\b"
+    r"|\binput\.parsed\.original\b"
+    r"|\binput\.(?:event|parsed)\["
+    r"|\binput(?:\.(?:event|parsed))?(?![\w.\[])"
+)
+_RULE_NAME_RE = re.compile(r"^(\w+)")
+_DIRECT_LITERAL_RE = re.compile(
+    r'input\.session_flags(?:\s*\[\s*"([^"]+)"\s*\]|\.(\w+))'
+)
+_DIRECT_ANY_RE = re.compile(r"input\.session_flags")
+_GUARD_EQ_RE = re.compile(r'^input\.parsed\.(executable|subcommand)\s*==\s*"([^"]*)"$')
+_GUARD_IN_RE = re.compile(
+    r"^input\.parsed\.(executable|subcommand)\s+in\s+[\[{](.*)[\]}]$"
+)
+_STRING_RE = re.compile(r'"([^"]*)"')
+_PATH_TEST_RE = re.compile(
+    r'^(?:not\s+)?(endswith|startswith|contains)\(\s*input\.file_path\s*,\s*"([^"]*)"\s*\)$'
+)
+_PATH_EQ_RE = re.compile(r'^(?:not\s+)?input\.file_path\s*==\s*"([^"]*)"$')
+_LITERAL_ASSIGN_RE = re.compile(r'^\w+\s*:?=\s*"[^"]*"$')
+_ACTIVATION_RULE = "guidance_activations"
+
+# A test of the file path: (Rego builtin or "==", literal argument)
+PathTest = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class FlagRead:
+    """Flags read by one rule, together with the command guards of that rule.
+
+    Attributes:
+        flags: Flag names read, or None if the rule may read any flag
+        executables: Executables the rule is limited to (None = any)
+        subcommands: Subcommands the rule is limited to (None = any)
+    """
+
+    flags: Optional[FrozenSet[str]]
+    executables: Optional[FrozenSet[str]] = None
+    subcommands: Optional[FrozenSet[str]] = None
+
+    def applies_to(self, executable: Optional[str], subcommand: Optional[str]) -> bool:
+        """Check whether the rule can fire for a command."""
+        if self.executables is not None and executable not in self.executables:
+            return False
+        if self.subcommands is not None and subcommand not in self.subcommands:
+            return False
+        return True
+
+
+def _strip_comments(source: str) -> str:
+    """Remove # comments, leaving string literals intact."""
+    lines = []
+    for line in source.splitlines():
+        quote = None
+        for i, char in enumerate(line):
+            if quote:
+                if char == quote and line[i - 1] != "\\":
+                    quote = None
+            elif char in '"`':
+                quote = char
+            elif char == "#":
+                line = line[:i]
+                break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _split_top_level(text: str, separators: str) -> List[str]:
+    """Split text at separator characters that are outside brackets and strings."""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote and text[i - 1] != "\\":
+                quote = None
+        elif char in '"`':
+            quote = char
+        elif char in "{[(":
+            depth += 1
+        elif char in "}])":
+            depth -= 1
+        elif char in separators and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _split_rules(source: str) -> List[str]:
+    """Split a module into top-level statements (rules, package, imports)."""
+    statements: List[str] = []
+    for chunk in _split_top_level(source, "\n"):
+        if not chunk.strip():
+            continue
+        # Continuation lines (indented or `else`) belong to the previous rule
+        if statements and (chunk[0].isspace() or chunk.startswith("else")):
+            statements[-1] += "\n" + chunk
+        else:
+            statements.append(chunk)
+    return statements
+
+
+def _rule_guards(
+    rule: str,
+) -> Tuple[Optional[FrozenSet[str]], Optional[FrozenSet[str]]]:
+    """Extract executable/subcommand equality guards from a rule body."""
+    body_start = rule.find("{")
+    body_end = rule.rfind("}")
+    if body_start < 0 or body_end <= body_start:
+        return None, None
+
+    guards: Dict[str, FrozenSet[str]] = {}
+    for statement in _split_top_level(rule[body_start + 1 : body_end], "\n;"):
+        statement = statement.strip()
+        match = _GUARD_EQ_RE.match(statement)
+        if match:
+            values = frozenset([match.group(2)])
+        else:
+            match = _GUARD_IN_RE.match(statement)
+            if not match:
+                continue
+            values = frozenset(_STRING_RE.findall(match.group(2)))
+        field_name = match.group(1)
+        existing = guards.get(field_name)
+        guards[field_name] = values if existing is None else existing & values
+
+    return guards.get("executable"), guards.get("subcommand")
+
+
+def _rule_path_tests(rule: str, accessors: List[str]) -> Optional[List[PathTest]]:
+    """Return the file path tests of an activation rule.
+
+    Returns None unless every statement in the rule body is a path test, an
+    assignment of a string literal, or a call to a flag accessor.
+    """
+    body_start = rule.find("{")
+    body_end = rule.rfind("}")
+    if body_start < 0:
+        return [] if "input" not in rule else None
+    if body_end <= body_start:
+        return None
+
+    tests: List[PathTest] = []
+    for statement in _split_top_level(rule[body_start + 1 : body_end], "\n;"):
+        statement = statement.strip()
+        if not statement or _LITERAL_ASSIGN_RE.match(statement):
+            continue
+        match = _PATH_TEST_RE.match(statement)
+        if match:
+            tests.append((match.group(1), match.group(2)))
+            continue
+        match = _PATH_EQ_RE.match(statement)
+        if match:
+            tests.append(("==", match.group(1)))
+            continue
+        if any(
+            re.match(re.escape(accessor) + r'\.\w+\(\s*"[^"]*"\s*\)$', statement)
+            for accessor in accessors
+        ):
+            continue
+        return None
+    return tests
+
+
+def _rule_flag_reads(rule: str, accessors: List[str]) -> Optional[FrozenSet[str]]:
+    """Return flag names read by a rule (None = unresolvable, any flag)."""
+    names = set()
+
+    for accessor in accessors:
+        pattern = re.compile(
+            r"(?<![\w.])" + re.escape(accessor) + r"\.\w+\(\s*([^,)]*)"
+        )
+        for argument in pattern.findall(rule):
+            literal = _STRING_RE.fullmatch(argument.strip())
+            if literal is None:
+                return None
+            names.add(literal.group(1))
+
+    literal_reads = _DIRECT_LITERAL_RE.findall(rule)
+    if len(literal_reads) != len(_DIRECT_ANY_RE.findall(rule)):
+        return None
+    names.update(bracket or dotted for bracket, dotted in literal_reads)
+
+    return frozenset(names)
+
+
+def _referenced_packages(
+    references: Dict[str, Set[str]], packages: Iterable[str]
+) -> Dict[str, Set[str]]:
+    """Resolve data references of each package to the packages they reach.
+
+    A reference to `data.a` reaches package `a` and every package below it;
+    a reference to `data.a.rule` reaches package `a`. References are
+    followed transitively.
+
+    Args:
+        references: Package name to the dotted paths it references under `data.`
+        packages: All package names
+
+    Returns:
+        Package name to every other package it can reach
+    """
+    packages = set(packages)
+
+    def direct(path: str) -> Set[str]:
+        reached = {p for p in packages if p == path or p.startswith(path + ".")}
+        parts = path.split(".")
+        for end in range(len(parts) - 1, 0, -1):
+            prefix = ".".join(parts[:end])
+            if prefix in packages:
+                reached.add(prefix)
+                break
+        return reached
+
+    edges = {
+        package: set().union(*(direct(path) for path in paths)) - {package}
+        for package, paths in references.items()
+    }
+    closure: Dict[str, Set[str]] = {}
+    for package in edges:
+        seen: Set[str] = set()
+        stack = list(edges[package])
+        while stack:
+            current = stack.pop()
+            if current in seen or current == package:
+                continue
+            seen.add(current)
+            stack.extend(edges.get(current, ()))
+        closure[package] = seen
+    return closure
+
+
+def _module_references(source: str) -> Set[str]:
+    """Return the dotted paths a module references under `data.`."""
+    return set(_DATA_REF_RE.findall(source))
+
+
+def raw_command_packages(modules: Iterable[Tuple[str, str]]) -> FrozenSet[str]:
+    """Return packages whose rules can read the command text as written.
+
+    A package counts if any of its rules, or any rule in a package it
+    references (directly or through other packages), reads such a field.
+
+    Args:
+        modules: Iterable of (module_name, source) pairs
+
+    Returns:
+        Names of the packages whose results depend on the raw command text
+    """
+    reading: Set[str] = set()
+    references: Dict[str, Set[str]] = {}
+    for _, source in modules:
+        source = _strip_comments(source)
+        package_match = _PACKAGE_RE.search(source)
+        if not package_match:
+            continue
+        package = package_match.group(1)
+        body = source[package_match.end() :]
+        references.setdefault(package, set()).update(_module_references(body))
+        if _RAW_COMMAND_RE.search(body):
+            reading.add(package)
+
+    closure = _referenced_packages(references, references)
+    return frozenset(
+        package
+        for package, reached in closure.items()
+        if package in reading or reached & reading
+    )
+
+
+def _accessor_names(imports: List[Tuple[str, Optional[str]]]) -> List[str]:
+    """Return the names under which the flag accessor package is reachable."""
+    accessors = ["data." + FLAG_ACCESSOR_PACKAGE]
+    for path, alias in imports:
+        name = alias or path.rsplit(".", 1)[-1]
+        if path == FLAG_ACCESSOR_PACKAGE:
+            accessors.append(name)
+        elif FLAG_ACCESSOR_PACKAGE.startswith(path + "."):
+            accessors.append(name + FLAG_ACCESSOR_PACKAGE[len(path) :])
+    return accessors
+
+
+class FlagDependencies:
+    """Index of session flags read by each policy package."""
+
+    def __init__(self, reads: Dict[str, List[FlagRead]]):
+        """Create an index from per-package flag reads.
+
+        Args:
+            reads: Mapping of package name to the flag reads of its rules
+        """
+        self.reads = reads
+
+    @classmethod
+    def from_modules(cls, modules: Iterable[Tuple[str, str]]) -> "FlagDependencies":
+        """Analyze Rego modules.
+
+        Args:
+            modules: Iterable of (module_name, source) pairs
+
+        Returns:
+            FlagDependencies index covering every package in the modules
+        """
+        own_reads: Dict[str, List[FlagRead]] = {}
+        references: Dict[str, Set[str]] = {}
+
+        for _, source in modules:
+            source = _strip_comments(source)
+            package_match = _PACKAGE_RE.search(source)
+            if not package_match:
+                continue
+            package = package_match.group(1)
+            if package == FLAG_ACCESSOR_PACKAGE:
+                continue
+
+            accessors = _accessor_names(
+                [(path, alias or None) for path, alias in _IMPORT_RE.findall(source)]
+            )
+            references.setdefault(package, set()).update(
+                _module_references(source[package_match.end() :])
+            )
+            package_reads = own_reads.setdefault(package, [])
+
+            for rule in _split_rules(source):
+                name_match = _RULE_NAME_RE.match(rule)
+                if not name_match or name_match.group(1) in ("package", "import"):
+                    continue
+
+                flags = _rule_flag_reads(rule, accessors)
+                if flags is not None and not flags:
+                    continue
+
+                if name_match.group(1) in _QUERIED_RULES:
+                    executables, subcommands = _rule_guards(rule)
+                    package_reads.append(FlagRead(flags, executables, subcommands))
+                else:
+                    # Helper rules may be referenced from any rule: unguarded
+                    package_reads.append(FlagRead(flags))
+
+        # Rules of referenced packages, and of the packages they reference in
+        # turn, may be called from any rule: unguarded
+        reads: Dict[str, List[FlagRead]] = {}
+        closure = _referenced_packages(references, own_reads)
+        for package, package_reads in own_reads.items():
+            reads[package] = list(package_reads)
+            for reached in sorted(closure[package]):
+                reads[package].extend(
+                    FlagRead(read.flags) for read in own_reads[reached]
+                )
+
+        return cls(reads)
+
+    def flags_read(
+        self,
+        bundles: Iterable[str],
+        commands: Iterable[Tuple[Optional[str], Optional[str]]],
+    ) -> Optional[FrozenSet[str]]:
+        """Return the flags that can affect evaluating commands against bundles.
+
+        Args:
+            bundles: Policy bundles being evaluated
+            commands: (executable, subcommand) of every command evaluated; use
+                (None, None) for inputs without a parsed command
+
+        Returns:
+            Set of flag names, or None if any flag may be read
+        """
+        commands = list(commands)
+        names: set = set()
+        for bundle in bundles:
+            for read in self.reads.get(bundle, []):
+                if not any(read.applies_to(exe, sub) for exe, sub in commands):
+                    continue
+                if read.flags is None:
+                    return None
+                names.update(read.flags)
+        return frozenset(names)
+
+
+def _path_passes(test: PathTest, file_path: str) -> bool:
+    builtin, literal = test
+    if builtin == "endswith":
+        return file_path.endswith(literal)
+    if builtin == "startswith":
+        return file_path.startswith(literal)
+    if builtin == "contains":
+        return literal in file_path
+    return file_path == literal
+
+
+class ActivationPaths:
+    """Index of the file path tests made by each package's activation rules.
+
+    Two file edits whose paths pass and fail the same tests activate the same
+    guidance checks, given the same bundles and session flags. A package
+    whose activation rules read anything else has no entry in `tests`, and
+    paths cannot be classified for bundles that include it.
+    """
+
+    def __init__(self, tests: Dict[str, Tuple[PathTest, ...]]):
+        """Create an index from per-package path tests.
+
+        Args:
+            tests: Mapping of package name to the path tests of its
+                activation rules; packages that cannot be classified are
+                left out
+        """
+        self.tests = tests
+
+    @classmethod
+    def from_modules(cls, modules: Iterable[Tuple[str, str]]) -> "ActivationPaths":
+        """Analyze Rego modules.
+
+        Args:
+            modules: Iterable of (module_name, source) pairs
+
+        Returns:
+            ActivationPaths index covering every package in the modules
+        """
+        tests: Dict[str, set] = {}
+        unresolved: set = set()
+
+        for _, source in modules:
+            source = _strip_comments(source)
+            package_match = _PACKAGE_RE.search(source)
+            if not package_match:
+                continue
+            package = package_match.group(1)
+            accessors = _accessor_names(
+                [(path, alias or None) for path, alias in _IMPORT_RE.findall(source)]
+            )
+            package_tests = tests.setdefault(package, set())
+
+            for rule in _split_rules(source):
+                name_match = _RULE_NAME_RE.match(rule)
+                if not name_match or name_match.group(1) != _ACTIVATION_RULE:
+                    continue
+                rule_tests = _rule_path_tests(rule, accessors)
+                if rule_tests is None:
+                    unresolved.add(package)
+                else:
+                    package_tests.update(rule_tests)
+
+        return cls(
+            {
+                package: tuple(sorted(package_tests))
+                for package, package_tests in tests.items()
+                if package not in unresolved
+            }
+        )
+
+    def path_class(
+        self, bundles: Iterable[str], file_path: Optional[str]
+    ) -> Optional[Tuple[bool, ...]]:
+        """Classify a file path by the activation tests of bundles.
+
+        Args:
+            bundles: Policy bundles being evaluated
+            file_path: Edited file path
+
+        Returns:
+            Outcome of every path test of the bundles, in a fixed order, or
+            None if the path cannot be classified
+        """
+        if file_path is None:
+            return None
+        outcomes: List[bool] = []
+        for bundle in bundles:
+            tests = self.tests.get(bundle)
+            if tests is None:
+                return None
+            outcomes.extend(_path_passes(test, file_path) for test in tests)
+        return tuple(outcomes)
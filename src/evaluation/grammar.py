@@ -0,0 +1,278 @@
+"""Per-executable command grammars.
+
+The parser has to decide, for each word of a command, whether it is a
+subcommand, a boolean flag, an option that consumes the next word, or a
+positional argument. Guessing (`-x value` is an option whenever the next
+word does not start with "-") misreads commands like `git commit --amend
+file.py`. Grammar files declare the answer per executable:
+
+    # policies/grammar/git.grammar.toml
+    subcommands = "any"              # or a list of subcommand names
+    value_flags = ["-C", "-c"]       # flags that consume the next word
+    boolean_flags = ["--no-pager"]   # flags that never do
+
+    [subcommand.commit]              # extra flags after `git commit`
+    value_flags = ["-m", "--message"]
+    boolean_flags = ["--amend"]
+
+    # docker.grammar.toml
+    [subcommand.run]
+    positionals = 1                  # IMAGE, then the command to run
+
+`subcommands = "any"` treats the first positional word as a subcommand
+unless it looks like a path (contains "/" or "."). `positionals` is the
+positional arity: after that many positional arguments, the remaining words
+belong to another command (the one `docker run IMAGE` starts) and are kept
+as arguments as written, flags included. It is set per subcommand, or at
+the top level for executables without subcommands.
+
+Clusters of single-letter flags (`ls -la`, `tar -xzf out.tgz`) are read
+the way getopt reads them: each letter is looked up on its own, and the
+cluster takes the next word only when its last letter is a value flag.
+Flags a grammar does not mention keep the guessing behaviour. The file name
+(without .grammar.toml) is the executable name unless the file sets
+`executable`. The double extension keeps files such as ruff.grammar.toml
+from being picked up as the tools' own configuration.
+
+load_grammar() compiles a directory of grammar files into frozensets and
+dicts once, so classifying a word during parsing is a constant-time lookup.
+"""
+
+import logging
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
+
+ANY_SUBCOMMAND = "any"
+
+# Grammar file name suffix; the rest of the name is the executable
+GRAMMAR_SUFFIX = ".grammar.toml"
+
+# Grammars shipped with the server, used until others are configured
+DEFAULT_GRAMMAR_DIR = Path(__file__).resolve().parents[2] / "policies" / "grammar"
+
+_SECTION_KEYS = {"value_flags", "boolean_flags", "positionals"}
+_KEYS = _SECTION_KEYS | {"subcommands", "subcommand"}
+
+
+class GrammarError(ValueError):
+    """Raised when a grammar file is malformed."""
+
+
+@dataclass(frozen=True)
+class FlagTable:
+    """Flags whose arity is known.
+
+    Attributes:
+        value_flags: Flags that take the next word as their value
+        boolean_flags: Flags that never take a value
+    """
+
+    value_flags: FrozenSet[str] = frozenset()
+    boolean_flags: FrozenSet[str] = frozenset()
+
+    def takes_value(self, flag: str) -> Optional[bool]:
+        """Return whether a flag takes a value, or None if it is not declared."""
+        if flag in self.value_flags:
+            return True
+        if flag in self.boolean_flags:
+            return False
+        return None
+
+
+def _is_cluster(flag: str) -> bool:
+    """Check whether a flag is several single-letter flags written together."""
+    return len(flag) > 2 and flag[0] == "-" and flag[1] != "-"
+
+
+@dataclass(frozen=True)
+class CommandGrammar:
+    """Compiled grammar for one executable.
+
+    Attributes:
+        any_subcommand: Any non-path first positional word is a subcommand
+        subcommands: Known subcommand names
+        flags: Flags valid anywhere in the command
+        subcommand_flags: Additional flags per subcommand
+        positionals: Positional arguments before the rest of the words are
+            kept as written (None = no limit)
+        subcommand_positionals: The same limit per subcommand
+    """
+
+    any_subcommand: bool = False
+    subcommands: FrozenSet[str] = frozenset()
+    flags: FlagTable = FlagTable()
+    subcommand_flags: Dict[str, FlagTable] = field(default_factory=dict)
+    positionals: Optional[int] = None
+    subcommand_positionals: Dict[str, int] = field(default_factory=dict)
+
+    def is_subcommand(self, word: str) -> bool:
+        """Check whether a positional word names a subcommand."""
+        if word in self.subcommands:
+            return True
+        return self.any_subcommand and "/" not in word and "." not in word
+
+    def takes_value(self, flag: str, subcommand: Optional[str]) -> Optional[bool]:
+        """Return whether a flag takes a value, or None if it is not declared.
+
+        An undeclared cluster such as `-xzf` is read letter by letter: it
+        takes a value if its last letter does, and none if an earlier value
+        letter consumes the rest of the cluster (`-n5`).
+        """
+        declared = self._declared(flag, subcommand)
+        if declared is not None or not _is_cluster(flag):
+            return declared
+        for position, letter in enumerate(flag[1:], start=2):
+            declared = self._declared("-" + letter, subcommand)
+            if declared is None:
+                return None
+            if declared:
+                return position == len(flag)
+        return False
+
+    def _declared(self, flag: str, subcommand: Optional[str]) -> Optional[bool]:
+        if subcommand is not None and subcommand in self.subcommand_flags:
+            declared = self.subcommand_flags[subcommand].takes_value(flag)
+            if declared is not None:
+                return declared
+        return self.flags.takes_value(flag)
+
+    def positional_limit(self, subcommand: Optional[str]) -> Optional[int]:
+        """Return the positional arguments parsed before the rest are kept as written."""
+        if subcommand is not None:
+            return self.subcommand_positionals.get(subcommand)
+        return self.positionals
+
+
+@dataclass(frozen=True)
+class GrammarTable:
+    """Grammars by executable name."""
+
+    commands: Dict[str, CommandGrammar] = field(default_factory=dict)
+
+    def get(self, executable: str) -> Optional[CommandGrammar]:
+        return self.commands.get(executable)
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+
+def _string_set(data: Dict[str, Any], key: str, source: str) -> FrozenSet[str]:
+    values = data.get(key, [])
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        raise GrammarError(f"{source}: '{key}' must be a list of strings")
+    return frozenset(values)
+
+
+def _positionals(data: Dict[str, Any], source: str) -> Optional[int]:
+    value = data.get("positionals")
+    if value is None:
+        return None
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise GrammarError(f"{source}: 'positionals' must be a non-negative integer")
+    return value
+
+
+def _flag_table(data: Dict[str, Any], source: str) -> FlagTable:
+    table = FlagTable(
+        value_flags=_string_set(data, "value_flags", source),
+        boolean_flags=_string_set(data, "boolean_flags", source),
+    )
+    overlap = table.value_flags & table.boolean_flags
+    if overlap:
+        raise GrammarError(
+            f"{source}: flags declared both with and without a value: "
+            f"{', '.join(sorted(overlap))}"
+        )
+    return table
+
+
+def _section(data: Any, source: str) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise GrammarError(f"{source}: must be a table")
+    unknown = set(data) - _SECTION_KEYS
+    if unknown:
+        raise GrammarError(f"{source}: unknown keys {', '.join(sorted(unknown))}")
+    return data
+
+
+def compile_grammar(data: Dict[str, Any], source: str) -> CommandGrammar:
+    """Compile one parsed grammar file.
+
+    Args:
+        data: Grammar file contents
+        source: Name used in error messages
+
+    Raises:
+        GrammarError: If the grammar is malformed
+    """
+    unknown = set(data) - _KEYS
+    if unknown:
+        raise GrammarError(f"{source}: unknown keys {', '.join(sorted(unknown))}")
+
+    subcommands = data.get("subcommands", [])
+    any_subcommand = subcommands == ANY_SUBCOMMAND
+    if any_subcommand:
+        subcommands = []
+
+    sections = data.get("subcommand", {})
+    if not isinstance(sections, dict):
+        raise GrammarError(f"{source}: 'subcommand' must be a table")
+    sections = {
+        name: _section(section, f"{source} [subcommand.{name}]")
+        for name, section in sections.items()
+    }
+    if "positionals" in data and (subcommands or any_subcommand or sections):
+        raise GrammarError(
+            f"{source}: top-level 'positionals' needs a grammar without subcommands"
+        )
+
+    return CommandGrammar(
+        any_subcommand=any_subcommand,
+        subcommands=_string_set({"subcommands": subcommands}, "subcommands", source)
+        | frozenset(sections),
+        flags=_flag_table(data, source),
+        subcommand_flags={
+            name: _flag_table(section, f"{source} [subcommand.{name}]")
+            for name, section in sections.items()
+        },
+        positionals=_positionals(data, source),
+        subcommand_positionals={
+            name: limit
+            for name, section in sections.items()
+            if (limit := _positionals(section, f"{source} [subcommand.{name}]"))
+            is not None
+        },
+    )
+
+
+def load_grammar(directory: Path) -> GrammarTable:
+    """Load and compile every *.grammar.toml file in a directory.
+
+    Args:
+        directory: Directory holding one grammar file per executable
+
+    Returns:
+        GrammarTable (empty if the directory does not exist)
+
+    Raises:
+        GrammarError: If any grammar file is malformed
+    """
+    commands: Dict[str, CommandGrammar] = {}
+    if not directory.is_dir():
+        logger.warning(f"Grammar directory {directory} does not exist")
+        return GrammarTable(commands)
+
+    for path in sorted(directory.glob("*" + GRAMMAR_SUFFIX)):
+        try:
+            data = tomllib.loads(path.read_text())
+        except tomllib.TOMLDecodeError as e:
+            raise GrammarError(f"{path}: {e}") from e
+        executable = data.pop("executable", path.name[: -len(GRAMMAR_SUFFIX)])
+        commands[executable] = compile_grammar(data, str(path))
+
+    logger.info(f"Loaded {len(commands)} command grammars from {directory}")
+    return GrammarTable(commands)
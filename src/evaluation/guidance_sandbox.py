@@ -0,0 +1,310 @@
+"""Sandboxed worker processes for Python guidance checks.
+
+Guidance checks normally run inline on the request thread, so a check with a
+pathological regex or an enormous patch holds the response until it
+finishes. With a sandbox configured, each check runs in a worker process
+instead: the request thread sends the event, waits for whichever check
+finishes first and yields its guidance straight away.
+
+Every check has a time limit, further capped by the request's deadline.
+A worker that runs past it is killed and replaced, and the check is
+recorded as killed. Workers also run under a data size limit
+(RLIMIT_DATA), so a check that allocates too much fails with MemoryError
+inside the worker instead of growing the server process. The data limit
+rather than the address space limit is used because native libraries may
+reserve large unused address ranges.
+
+Workers import only the modules of the checks they run. Check functions
+and their arguments are pickled by reference, so they must be module-level.
+"""
+
+import logging
+import multiprocessing
+import pickle
+import queue
+import signal
+import threading
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple
+from typing import Optional, Tuple
+
+from src.server.deadline import current_deadline, check_deadline, remaining_time
+from src.server.metrics import counter
+from src.server.models import PolicyGuidance, PostFileEditEvent
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Longest wait, without a request deadline, for a free and started worker
+WORKER_WAIT_TIMEOUT = 10.0
+
+GUIDANCE_CHECKS = counter(
+    "policy_guidance_sandbox_checks_total",
+    "Guidance checks run in worker processes, by check and outcome",
+)
+
+
+class GuidanceJob(NamedTuple):
+    """One unit of guidance work.
+
+    Attributes:
+        name: Check name used in errors and metrics
+        function: Called as function(event, *args); yields PolicyGuidance
+        args: Extra positional arguments
+    """
+
+    name: str
+    function: Callable[..., Iterable[PolicyGuidance]]
+    args: Tuple[Any, ...] = ()
+
+
+def _limit_memory(memory_limit_mb: int) -> None:
+    """Cap this process's heap and other private writable memory."""
+    if resource is None or memory_limit_mb <= 0:
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not limit guidance worker memory: {e}")
+
+
+def _worker_main(conn: Connection, memory_limit_mb: int) -> None:
+    """Run guidance jobs sent over `conn` until it closes."""
+    # Ctrl-C reaches the whole process group; the server stops workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _limit_memory(memory_limit_mb)
+    conn.send(("ready", None))
+    while True:
+        try:
+            job = conn.recv_bytes()
+        except EOFError:
+            return
+        try:
+            function, args, payload = pickle.loads(job)
+            event = pickle.loads(payload)
+            reply = ("ok", list(function(event, *args)))
+        except MemoryError:
+            reply = ("error", "exceeded the worker memory limit")
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        conn.send(reply)
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe."""
+
+    def __init__(self, context, memory_limit_mb: int):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child, memory_limit_mb),
+            name="guidance-worker",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Wait for the worker to finish starting; return whether it has."""
+        if not self.ready and self.conn.poll(timeout):
+            try:
+                self.ready = self.conn.recv()[0] == "ready"
+            except (EOFError, OSError):
+                return False
+        return self.ready
+
+    def stop(self) -> None:
+        """Kill the process, whatever it is doing."""
+        self.process.kill()
+        self.process.join(timeout=1.0)
+        self.conn.close()
+
+
+class GuidanceSandbox:
+    """Pool of worker processes that run guidance checks under limits.
+
+    Workers are started on first use with the spawn start method, since the
+    server process runs threads and forking it is unsafe. The pool is shared
+    by all request threads.
+
+    Attributes:
+        workers: Number of worker processes
+        check_timeout: Seconds each check may run
+        memory_limit_mb: Data size limit per worker in MiB (0 = none)
+    """
+
+    def __init__(self, workers: int, check_timeout: float, memory_limit_mb: int):
+        """Create a sandbox; no processes are started until first use.
+
+        Args:
+            workers: Number of worker processes
+            check_timeout: Seconds each check may run
+            memory_limit_mb: Data size limit per worker in MiB (0 = none)
+        """
+        self.workers = max(1, workers)
+        self.check_timeout = check_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._all: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            for _ in range(self.workers):
+                self._add_worker()
+            self._started = True
+            logger.info(f"Started guidance sandbox with {self.workers} workers")
+
+    def _add_worker(self) -> None:
+        worker = _Worker(self._context, self.memory_limit_mb)
+        self._all.append(worker)
+        self._idle.put(worker)
+
+    def _replace(self, worker: _Worker) -> None:
+        """Kill a worker and start a fresh one in its place."""
+        worker.stop()
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+                self._add_worker()
+
+    def _acquire(self, timeout: float) -> Optional[_Worker]:
+        """Take a started worker, waiting up to `timeout` seconds."""
+        expires_at = time.monotonic() + timeout
+        try:
+            worker = (
+                self._idle.get(timeout=timeout) if timeout else self._idle.get_nowait()
+            )
+        except queue.Empty:
+            return None
+        if worker.wait_ready(max(0.0, expires_at - time.monotonic())):
+            return worker
+        if worker.process.is_alive():
+            self._idle.put(worker)
+        else:
+            self._replace(worker)
+        return None
+
+    def run(
+        self, event: PostFileEditEvent, jobs: List[GuidanceJob], errors: List[str]
+    ) -> Iterator[PolicyGuidance]:
+        """Run guidance jobs in workers, yielding guidance as each finishes.
+
+        Args:
+            event: File edit event passed to every job
+            jobs: Checks to run
+            errors: Receives a message for every job that failed, was killed
+                or could not be started
+
+        Raises:
+            DeadlineExceeded: If the request's deadline passes; running jobs
+                are killed first
+        """
+        self._start()
+        payload = pickle.dumps(event, protocol=pickle.HIGHEST_PROTOCOL)
+        pending = list(jobs)
+        running: Dict[Connection, Tuple[_Worker, GuidanceJob, float]] = {}
+
+        def record(job: GuidanceJob, outcome: str, message: str) -> None:
+            GUIDANCE_CHECKS.inc(check=job.name, outcome=outcome)
+            errors.append(message)
+            logger.error(message)
+
+        try:
+            while pending or running:
+                while pending:
+                    timeout = 0.0 if running else remaining_time(WORKER_WAIT_TIMEOUT)
+                    worker = self._acquire(timeout)
+                    if worker is None:
+                        break
+                    job = pending.pop(0)
+                    try:
+                        worker.conn.send_bytes(
+                            pickle.dumps((job.function, job.args, payload))
+                        )
+                    except (OSError, ValueError, pickle.PicklingError) as e:
+                        self._replace(worker)
+                        record(
+                            job,
+                            "error",
+                            f"Could not start guidance check '{job.name}': {e}",
+                        )
+                        continue
+                    expires_at = time.monotonic() + self.check_timeout
+                    running[worker.conn] = (worker, job, expires_at)
+
+                if not running:
+                    check_deadline("guidance")
+                    for job in pending:
+                        record(
+                            job,
+                            "error",
+                            f"No guidance worker free for check '{job.name}'",
+                        )
+                    return
+
+                wait_until = min(expires_at for _, _, expires_at in running.values())
+                deadline = current_deadline()
+                if deadline is not None:
+                    wait_until = min(wait_until, deadline.expires_at)
+                ready = wait(list(running), max(0.0, wait_until - time.monotonic()))
+
+                for conn in ready:
+                    worker, job, _ = running.pop(conn)
+                    try:
+                        status, value = conn.recv()
+                    except (EOFError, OSError):
+                        self._replace(worker)
+                        record(
+                            job, "crashed", f"Guidance check '{job.name}' worker exited"
+                        )
+                        continue
+                    self._idle.put(worker)
+                    if status == "ok":
+                        GUIDANCE_CHECKS.inc(check=job.name, outcome="ok")
+                        yield from value
+                    else:
+                        record(
+                            job,
+                            "error",
+                            f"Error running guidance check '{job.name}': {value}",
+                        )
+
+                now = time.monotonic()
+                for conn, (worker, job, expires_at) in list(running.items()):
+                    if now >= expires_at:
+                        del running[conn]
+                        self._replace(worker)
+                        record(
+                            job,
+                            "killed",
+                            f"Guidance check '{job.name}' ran past its "
+                            f"{self.check_timeout * 1000:.0f} ms limit and was stopped",
+                        )
+                check_deadline("guidance")
+        finally:
+            # Deadline passed or the caller stopped reading; nothing will
+            # collect these results
+            for worker, job, _ in running.values():
+                GUIDANCE_CHECKS.inc(check=job.name, outcome="killed")
+                self._replace(worker)
+
+    def shutdown(self) -> None:
+        """Stop all worker processes."""
+        with self._lock:
+            workers, self._all = self._all, []
+            self._idle = queue.Queue()
+            self._started = False
+        for worker in workers:
+            worker.stop()
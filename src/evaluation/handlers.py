@@ -1,30 +1,102 @@
 """Policy bundle functions for different project types."""
 
-import re
+import hashlib
 import logging
-from typing import Generator, Callable, Dict, Union
+from pathlib import Path
+from typing import Generator, Callable, Dict, Hashable, List, Type, Union
+from src.server.config import config
+from src.server.deadline import DeadlineExceeded, check_deadline
+from src.server.metrics import CollectorSample, register_collector
 from src.server.models import (
     ToolUseEvent,
     PostFileEditEvent,
+    PolicyAction,
     PolicyDecision,
     PolicyGuidance,
 )
+from src.evaluation.cache import LRUCache
+from src.evaluation.grammar import load_grammar
+from src.evaluation.guidance_sandbox import GuidanceJob, GuidanceSandbox
+from src.evaluation.limits import CommandLimits
 from src.evaluation.rego import RegoEvaluator
-from src.evaluation.parser import BashCommandParser, ParseError
+from src.evaluation.parser import BashCommandParser, CommandTooComplex, ParseError
 
 from src.guidance.python_comments import (
+    CommentOverlapCheck,
+    CommentRatioCheck,
+    CommentedCodeCheck,
+    LegacyCodeCheck,
     comment_ratio_guidance_rule,
     comment_overlap_guidance_rule,
     commented_code_guidance_rule,
     legacy_code_guidance_rule,
 )
-from src.guidance.python_imports import mid_code_import_guidance_rule
-from src.guidance.documentation import license_guidance_rule
+from src.guidance.python_imports import (
+    MidCodeImportCheck,
+    mid_code_import_guidance_rule,
+)
+from src.guidance.documentation import LicenseCheck, license_guidance_rule
 from src.guidance.package_management import uv_pyproject_guidance_rule
+from src.guidance.scanner import LineCheck, run_checks
 
 logger = logging.getLogger(__name__)
 
-rego_evaluator = RegoEvaluator(policy_dir="policies")
+POLICY_DIR = Path("policies")
+GRAMMAR_DIR = POLICY_DIR / "grammar"
+
+
+def _new_rego_evaluator() -> RegoEvaluator:
+    return RegoEvaluator(
+        policy_dir=str(POLICY_DIR),
+        parallel_threshold=config.rego_parallel_threshold,
+        process_workers=config.rego_process_workers,
+    )
+
+
+rego_evaluator = _new_rego_evaluator()
+BashCommandParser.configure_grammar(load_grammar(GRAMMAR_DIR))
+
+BashCommandParser.configure_limits(
+    CommandLimits(
+        max_length=config.max_command_length,
+        max_segments=config.max_command_segments,
+        max_depth=config.max_command_depth,
+        max_heredoc_bytes=config.max_heredoc_bytes,
+    )
+)
+COMMAND_LIMIT_ACTION = PolicyAction(config.command_limit_action)
+
+# File edit guidance results by patch hash and path class; see _guidance_cache_key()
+guidance_cache = LRUCache(maxsize=config.guidance_cache_size)
+
+# Worker processes that run guidance checks under limits (None = inline)
+guidance_sandbox = (
+    GuidanceSandbox(
+        workers=config.guidance_process_workers,
+        check_timeout=config.guidance_check_timeout_ms / 1000,
+        memory_limit_mb=config.guidance_check_memory_mb,
+    )
+    if config.guidance_process_workers > 0
+    else None
+)
+
+
+def reload_policies() -> None:
+    """Reload the Rego policies and command grammars from disk.
+
+    Both are loaded before either is swapped in, so a malformed policy or
+    grammar file raises and leaves the running ones in place.
+    """
+    global rego_evaluator
+    grammar = load_grammar(GRAMMAR_DIR)
+    evaluator = _new_rego_evaluator()
+
+    previous, rego_evaluator = rego_evaluator, evaluator
+    BashCommandParser.configure_grammar(grammar)
+    guidance_cache.clear()
+    previous.close()
+    logger.info(f"Reloaded policies and {len(grammar)} command grammars")
+
 
 # Guidance implementation registry - maps check names (from Rego) to Python implementations
 GuidanceImplementation = Callable[
@@ -41,6 +113,17 @@ GUIDANCE_REGISTRY: Dict[str, GuidanceImplementation] = {
     "uv_pyproject": uv_pyproject_guidance_rule,
 }
 
+# Checks that run together in one pass over the patch lines; activated checks
+# listed here are run by a shared scanner instead of their registry function
+LINE_CHECKS: Dict[str, Type[LineCheck]] = {
+    "comment_ratio": CommentRatioCheck,
+    "comment_overlap": CommentOverlapCheck,
+    "commented_code": CommentedCodeCheck,
+    "legacy_code": LegacyCodeCheck,
+    "mid_code_import": MidCodeImportCheck,
+    "license": LicenseCheck,
+}
+
 
 def evaluate_bash_rules(
     event: ToolUseEvent,
@@ -53,16 +136,10 @@ def evaluate_bash_rules(
     if not event.tool_is_bash:
         return
 
-    # Check for quoted heredoc delimiters (not supported by bashlex)
-    if event.command and re.search(r'<<\s*["\'][^"\']+["\']', event.command):
-        yield PolicyDecision.deny(
-            "Quoted heredoc delimiters (<< 'EOF' or << \"EOF\") are not allowed.\n"
-            "Use unquoted delimiters instead (e.g., << EOF)."
-        )
-        return
-
     try:
-        command = event.command or ""
+        # Leading/trailing whitespace is insignificant to bash; strip it so
+        # policies reading the raw command see the same text for equal commands
+        command = (event.command or "").strip()
         parsed = BashCommandParser.parse(command)
         decisions = rego_evaluator.evaluate(
             event, parsed, bundles=event.enabled_bundles
@@ -77,6 +154,11 @@ def evaluate_bash_rules(
             event, parsed, bundles=event.enabled_bundles
         )
         yield from guidances
+    except CommandTooComplex as e:
+        yield PolicyDecision(
+            action=COMMAND_LIMIT_ACTION,
+            reason=f"{e}; the command is too complex to validate.",
+        )
     except ParseError:
         return
 
@@ -90,6 +172,11 @@ def evaluate_guidance(
 
     Yields both PolicyDecision objects (for flag-setting rules) and PolicyGuidance objects
     (for guidance checks). The executor processes flags from PolicyDecision objects.
+
+    Guidance output is cached by patch content, path class and activated
+    checks, so re-applying an identical edit skips the guidance Rego queries
+    and the Python checks. Decisions always run, since they update session
+    flags.
     """
     # Evaluate file-edit decisions (e.g., flag-setting rules like invalidating ran_tests)
     file_edit_decisions = rego_evaluator.evaluate_file_edit_decisions(
@@ -98,6 +185,83 @@ def evaluate_guidance(
     if file_edit_decisions:
         yield from file_edit_decisions
 
+    activated_checks = (
+        rego_evaluator.evaluate_guidance_activations(
+            event, bundles=event.enabled_bundles
+        )
+        if event.structured_patch
+        else []
+    )
+    cache_key = _guidance_cache_key(event, activated_checks)
+    cached = guidance_cache.get(cache_key)
+    if cached is not None:
+        yield from cached
+        return
+
+    errors: List[str] = []
+    guidances: List[PolicyGuidance] = []
+    for guidance in _evaluate_file_edit_guidance(event, activated_checks, errors):
+        guidances.append(guidance)
+        yield guidance
+    if not errors:
+        guidance_cache.put(cache_key, tuple(guidances))
+
+
+def _guidance_cache_key(
+    event: PostFileEditEvent, activated_checks: List[str]
+) -> Hashable:
+    """Build the guidance cache key for a file edit.
+
+    The key holds a content hash of each patch rather than the lines
+    themselves, a hash of the edited file's content (Python checks read the
+    lines around the patch), the class of the file path under the bundles'
+    activation rules, the activated checks, the bundles and the session flags
+    guidance rules can read. An identical edit of another file in the same
+    class, such as another `.py` file, is a hit.
+
+    The exact path is used instead of its class when the bundles' activation
+    rules cannot be analyzed, and when the event has no content: Python
+    checks then rebuild the file from the analysis cached for that path.
+    """
+    patches = tuple(
+        (patch.oldStart, patch.oldLines, patch.newStart, patch.newLines)
+        + (patch.lines.digest(),)
+        for patch in event.structured_patch or ()
+    )
+    content = (
+        hashlib.blake2b(event.content.encode("utf-8", "surrogatepass")).digest()
+        if event.content is not None
+        else None
+    )
+    path_class = None
+    if content is not None:
+        path_class = rego_evaluator.activation_paths.path_class(
+            event.enabled_bundles, event.file_path
+        )
+    return (
+        event.file_path if path_class is None else path_class,
+        content,
+        tuple(event.enabled_bundles),
+        event.source_client,
+        patches,
+        tuple(sorted(activated_checks)),
+        rego_evaluator.session_flags_key(
+            event.session_id, event.enabled_bundles, [(None, None)]
+        ),
+    )
+
+
+def _evaluate_file_edit_guidance(
+    event: PostFileEditEvent, activated_checks: List[str], errors: List[str]
+) -> Generator[PolicyGuidance, None, None]:
+    """Run the guidance Rego rules and activated Python checks for a file edit.
+
+    Args:
+        event: The file edit event
+        activated_checks: Check names from the guidance activation rules
+        errors: Receives a message for every check that failed; results
+            with errors are not cached
+    """
     # Evaluate Rego guidances for file edits (may trigger on file_path alone, no structured_patch needed)
     rego_guidances = rego_evaluator.evaluate_file_edit_guidances(
         event, bundles=event.enabled_bundles
@@ -107,19 +271,88 @@ def evaluate_guidance(
     if not event.structured_patch:
         return
 
-    activated_checks = rego_evaluator.evaluate_guidance_activations(
-        event, bundles=event.enabled_bundles
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Activated guidance checks: {activated_checks}")
 
-    logger.debug(f"Activated guidance checks: {activated_checks}")
+    jobs = _guidance_jobs(activated_checks, errors)
+    if guidance_sandbox is not None:
+        yield from guidance_sandbox.run(event, jobs, errors)
+        return
 
-    for check_name in activated_checks:
+    for job in jobs:
+        check_deadline("guidance")
         try:
-            guidance_impl = GUIDANCE_REGISTRY[check_name]
-            yield from guidance_impl(event)
-        except KeyError:
-            logger.error(
+            yield from job.function(event, *job.args)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            errors.append(f"Error running guidance check '{job.name}': {e}")
+            logger.error(errors[-1])
+
+
+def _guidance_jobs(activated_checks: List[str], errors: List[str]) -> List[GuidanceJob]:
+    """Turn activated check names into jobs.
+
+    Activated line checks become a single job that scans the patch once;
+    every other check is a job of its own.
+
+    Args:
+        activated_checks: Check names from the guidance activation rules
+        errors: Receives a message for every unregistered check name
+    """
+    jobs: List[GuidanceJob] = []
+    line_checks = sorted(name for name in activated_checks if name in LINE_CHECKS)
+    if line_checks:
+        jobs.append(
+            GuidanceJob(
+                name=",".join(line_checks),
+                function=run_checks,
+                args=tuple(LINE_CHECKS[name] for name in line_checks),
+            )
+        )
+
+    for check_name in activated_checks:
+        if check_name in LINE_CHECKS:
+            continue
+        if check_name not in GUIDANCE_REGISTRY:
+            errors.append(
                 f"Unknown guidance check '{check_name}' - not registered in GUIDANCE_REGISTRY"
             )
-        except Exception as e:
-            logger.error(f"Error running guidance check '{check_name}': {e}")
+            logger.error(errors[-1])
+            continue
+        jobs.append(GuidanceJob(check_name, GUIDANCE_REGISTRY[check_name]))
+    return jobs
+
+
+def _guidance_cache_metrics() -> List[CollectorSample]:
+    """Export guidance cache size and hit counts."""
+    stats = guidance_cache.stats()
+    return [
+        (
+            "policy_guidance_cache_hits_total",
+            "counter",
+            "File edit guidance results served from the cache",
+            stats["hits"],
+        ),
+        (
+            "policy_guidance_cache_misses_total",
+            "counter",
+            "File edit guidance results computed because no cache entry matched",
+            stats["misses"],
+        ),
+        (
+            "policy_guidance_cache_hit_ratio",
+            "gauge",
+            "Share of guidance cache lookups that were hits",
+            stats["hit_rate"],
+        ),
+        (
+            "policy_guidance_cache_entries",
+            "gauge",
+            "Guidance results currently cached",
+            stats["size"],
+        ),
+    ]
+
+
+register_collector(_guidance_cache_metrics)
@@ -0,0 +1,229 @@
+"""Heredoc pre-tokenizer.
+
+bashlex cannot parse quoted heredoc delimiters (<< 'EOF') and lexes heredoc
+bodies character by character. split_heredocs() finds every heredoc in a
+command in one linear pass, cuts the bodies out into a side table, and
+returns the command skeleton that bashlex actually parses.
+
+In the skeleton each `<<DELIM` operator becomes an input redirect from a
+placeholder word (`< __heredoc_0__`), and the body lines including the
+terminator are removed. The parser maps placeholder redirects back to their
+heredocs and skeleton positions back to the original command.
+"""
+
+import bisect
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Characters that end an unquoted delimiter word
+DELIMITER_TERMINATORS = frozenset(";&|<>()")
+
+
+class HeredocError(ValueError):
+    """Raised when a heredoc is incomplete (no body or no terminator line)."""
+
+
+@dataclass(frozen=True)
+class Heredoc:
+    """A heredoc cut out of a command.
+
+    Attributes:
+        operator: "<<" or "<<-" (leading tabs stripped from body lines)
+        word: Delimiter word as written in the command
+        delimiter: Terminator line (the word with quotes removed)
+        quoted: Delimiter was quoted, so the body is not expanded by the shell
+        body: Body text, excluding the terminator line
+    """
+
+    operator: str
+    word: str
+    delimiter: str
+    quoted: bool
+    body: str
+
+
+@dataclass
+class Skeleton:
+    """A command with its heredoc bodies removed.
+
+    Attributes:
+        text: Command text passed to bashlex
+        heredocs: Heredocs by placeholder word
+    """
+
+    text: str
+    heredocs: Dict[str, Heredoc] = field(default_factory=dict)
+    # Sorted (skeleton offset, original offset) pairs where the texts realign
+    _anchors: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def heredoc_bytes(self) -> int:
+        """Total size of all heredoc bodies."""
+        return sum(len(heredoc.body) for heredoc in self.heredocs.values())
+
+    def to_original(self, offset: int) -> int:
+        """Map an offset in the skeleton to the same character in the original."""
+        index = bisect.bisect_right(self._anchors, (offset, float("inf"))) - 1
+        if index < 0:
+            return offset
+        skeleton_offset, original_offset = self._anchors[index]
+        return original_offset + (offset - skeleton_offset)
+
+
+def _read_delimiter(command: str, start: int) -> Tuple[int, str, bool, int]:
+    """Read the delimiter word after a heredoc operator.
+
+    Returns:
+        (word start, delimiter without quotes, whether any part was quoted,
+        word end)
+    """
+    i = start
+    while i < len(command) and command[i] in " \t":
+        i += 1
+    word_start = i
+
+    chars: List[str] = []
+    quoted = False
+    while i < len(command):
+        char = command[i]
+        if char in ("'", '"'):
+            end = command.find(char, i + 1)
+            if end < 0:
+                raise HeredocError("Unterminated quote in heredoc delimiter")
+            chars.append(command[i + 1 : end])
+            quoted = True
+            i = end + 1
+        elif char == "\\" and i + 1 < len(command):
+            chars.append(command[i + 1])
+            quoted = True
+            i += 2
+        elif char.isspace() or char in DELIMITER_TERMINATORS:
+            break
+        else:
+            chars.append(char)
+            i += 1
+
+    delimiter = "".join(chars)
+    if not delimiter:
+        raise HeredocError("Missing heredoc delimiter")
+    return word_start, delimiter, quoted, i
+
+
+def _placeholder_prefix(command: str) -> str:
+    """Pick a placeholder prefix that does not occur in the command."""
+    prefix = "__heredoc_"
+    while prefix in command:
+        prefix = "_" + prefix
+    return prefix
+
+
+def split_heredocs(command: str) -> Skeleton:
+    """Cut heredoc bodies out of a command.
+
+    Args:
+        command: Raw command text
+
+    Returns:
+        Skeleton of the command; its text is the command itself when there
+        are no heredocs
+
+    Raises:
+        HeredocError: If a heredoc has no body or no terminator line
+    """
+    if "<<" not in command:
+        return Skeleton(command)
+
+    prefix = _placeholder_prefix(command)
+    pieces: List[str] = []
+    heredocs: Dict[str, Heredoc] = {}
+    anchors: List[Tuple[int, int]] = []
+    # Heredocs opened on the current line; bodies start after its newline
+    pending: List[Tuple[str, str, str, str, bool]] = []
+
+    skeleton_length = 0
+    copied_from = 0
+    quote: Optional[str] = None
+    i = 0
+    length = len(command)
+
+    def copy_until(end: int) -> None:
+        nonlocal skeleton_length, copied_from
+        pieces.append(command[copied_from:end])
+        skeleton_length += end - copied_from
+        copied_from = end
+
+    while i < length:
+        char = command[i]
+
+        if char == "\\":
+            i += 2
+            continue
+        if quote:
+            if char == quote:
+                quote = None
+            i += 1
+            continue
+        if char in ("'", '"'):
+            quote = char
+        elif char == "#" and (i == 0 or command[i - 1].isspace()):
+            newline = command.find("\n", i)
+            i = length if newline < 0 else newline
+            continue
+        elif char == "<" and command.startswith("<<", i):
+            if command.startswith("<<<", i):
+                i += 3
+                continue
+            operator = "<<-" if command.startswith("<<-", i) else "<<"
+            word_start, delimiter, quoted, end = _read_delimiter(
+                command, i + len(operator)
+            )
+            word = command[word_start:end]
+            placeholder = f"{prefix}{len(heredocs) + len(pending)}__"
+
+            copy_until(i)
+            replacement = f"< {placeholder}"
+            pieces.append(replacement)
+            skeleton_length += len(replacement)
+            copied_from = end
+            anchors.append((skeleton_length, end))
+
+            pending.append((placeholder, operator, word, delimiter, quoted))
+            i = end
+            continue
+        elif char == "\n" and pending:
+            # Keep the newline, then consume each pending body in order
+            copy_until(i + 1)
+            position = i + 1
+            for placeholder, operator, word, delimiter, quoted in pending:
+                body_lines: List[str] = []
+                while True:
+                    if position >= length:
+                        raise HeredocError(
+                            f"Heredoc delimited by end of command (wanted {delimiter!r})"
+                        )
+                    newline = command.find("\n", position)
+                    line_end = length if newline < 0 else newline
+                    line = command[position:line_end]
+                    position = line_end + 1
+                    if operator == "<<-":
+                        line = line.lstrip("\t")
+                    if line == delimiter:
+                        break
+                    body_lines.append(line)
+                heredocs[placeholder] = Heredoc(
+                    operator, word, delimiter, quoted, "\n".join(body_lines)
+                )
+            pending = []
+            copied_from = min(position, length)
+            anchors.append((skeleton_length, copied_from))
+            i = copied_from
+            continue
+        i += 1
+
+    if pending:
+        raise HeredocError(
+            f"Heredoc delimited by end of command (wanted {pending[0][3]!r})"
+        )
+
+    copy_until(length)
+    return Skeleton("".join(pieces), heredocs, anchors)
@@ -0,0 +1,100 @@
+"""Complexity limits for bash commands.
+
+Parsing and evaluation cost grows with the size and shape of a command:
+bashlex is linear in the command length, and the evaluator queries every
+segment (chained, piped and substituted command) against every bundle.
+CommandLimits bounds each dimension so a pathological command costs a
+bounded amount of work before it is rejected.
+
+scan_shape() estimates the shape of a command in one linear pass without
+parsing it, so oversized commands are rejected before bashlex runs. The
+parser enforces the exact segment and depth limits on the AST.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CommandLimits:
+    """Upper bounds on the commands the parser accepts.
+
+    Attributes:
+        max_length: Characters in the command
+        max_segments: Commands in the tree (chained, piped and substituted)
+        max_depth: Nesting depth of process substitutions and subshells
+        max_heredoc_bytes: Characters in heredoc bodies
+    """
+
+    max_length: int = 16384
+    max_segments: int = 64
+    max_depth: int = 8
+    max_heredoc_bytes: int = 65536
+
+
+@dataclass(frozen=True)
+class CommandShape:
+    """Unparsed estimate of a command's structure.
+
+    Attributes:
+        separators: Unquoted command separators (;, &, &&, ||, |, newline)
+        depth: Deepest unquoted parenthesis nesting
+    """
+
+    separators: int
+    depth: int
+
+
+def scan_shape(command: str) -> CommandShape:
+    """Scan a command once, counting separators and nesting outside quotes.
+
+    Heredoc bodies are not shell syntax, so the parser scans the command
+    skeleton produced by split_heredocs() rather than the raw command.
+
+    Args:
+        command: Command text without heredoc bodies
+
+    Returns:
+        CommandShape for the command
+    """
+    separators = 0
+    depth = 0
+    max_depth = 0
+    quote = None
+    i = 0
+    length = len(command)
+
+    while i < length:
+        char = command[i]
+
+        if char == "\\":
+            i += 2
+            continue
+        if quote:
+            if char == quote:
+                quote = None
+            i += 1
+            continue
+        if char in ("'", '"'):
+            quote = char
+        elif char == "\n":
+            separators += 1
+        elif char == "(":
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif char == ")":
+            depth = max(0, depth - 1)
+        elif char in ";|":
+            separators += 1
+            if command.startswith(("||", ";;"), i):
+                i += 1
+        elif char == "&":
+            # Redirects (>&, &>, <&) are not separators
+            previous = command[i - 1] if i else ""
+            following = command[i + 1] if i + 1 < length else ""
+            if previous not in ("<", ">") and following != ">":
+                separators += 1
+                if following == "&":
+                    i += 1
+        i += 1
+
+    return CommandShape(separators, max_depth)
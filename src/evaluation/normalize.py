@@ -0,0 +1,102 @@
+"""Canonical keys for parsed commands.
+
+Commands that bash treats identically can be written in many ways
+(`--tag=v1` vs `--tag v1`, `'file'` vs `file`, `-a -b` vs `-b -a`, extra
+whitespace). The canonical key erases those differences so caches keyed on
+it hit for every spelling of the same command.
+"""
+
+import json
+import re
+import shlex
+from typing import List
+
+from src.evaluation.parser import ParsedCommand
+
+# Characters that never need quoting (same set shlex.quote leaves bare)
+_SAFE_WORD = re.compile(r"[\w@%+=:,./-]+")
+
+# Characters that keep their special meaning inside double quotes
+_DOUBLE_QUOTE_SPECIAL = set('$`\\"')
+
+
+def canonical_word(word: str) -> str:
+    """Return the canonical spelling of a single shell word.
+
+    Quotes wrapping the whole word are removed when they do not change its
+    meaning, then the word is re-quoted only if it needs quoting. Words with
+    partial quoting or expansions inside double quotes are kept verbatim.
+
+    Args:
+        word: Word as written in the original command
+
+    Returns:
+        Canonical spelling of the word
+    """
+    if len(word) >= 2 and word[0] == word[-1] and word[0] in "'\"":
+        inner = word[1:-1]
+        if word[0] == "'" and "'" not in inner:
+            return inner if _SAFE_WORD.fullmatch(inner) else shlex.quote(inner)
+        if word[0] == '"' and not _DOUBLE_QUOTE_SPECIAL.intersection(inner):
+            return inner if _SAFE_WORD.fullmatch(inner) else shlex.quote(inner)
+    return word
+
+
+def _segment_tokens(parsed: ParsedCommand) -> List[str]:
+    """Build the ordered token list for a single command (without pipes/chains)."""
+    tokens = [canonical_word(parsed.executable)]
+    if parsed.subcommand:
+        tokens.append(canonical_word(parsed.subcommand))
+
+    # Flags and options are order-independent; positional arguments are not
+    tokens.extend(sorted(canonical_word(flag) for flag in parsed.flags))
+    tokens.extend(
+        f"{canonical_word(key)}={canonical_word(value)}"
+        for key, value in sorted(parsed.options.items())
+    )
+
+    # Process substitutions appear verbatim among the arguments; replace each
+    # one in place with the canonical key of the substituted command
+    substitutions = iter(parsed.process_substitutions)
+    for arg in parsed.arguments:
+        if arg[:2] in ("<(", ">(") and arg.endswith(")"):
+            subst = next(substitutions, None)
+            if subst is not None:
+                tokens.append(f"{arg[0]}({canonical_key(subst)})")
+                continue
+        tokens.append(canonical_word(arg))
+
+    for redirect in parsed.redirects:
+        if redirect.content is None:
+            tokens.append(f"{redirect.op}{canonical_word(redirect.target)}")
+        else:
+            # Quoting the delimiter disables expansion in the body, so the
+            # word is kept as written; the body is encoded onto one line
+            tokens.append(
+                f"{redirect.op}{redirect.target}:{json.dumps(redirect.content)}"
+            )
+    return tokens
+
+
+def canonical_key(parsed: ParsedCommand) -> str:
+    """Return a stable key identifying the command up to semantic equivalence.
+
+    The key covers the whole command tree: piped commands are joined with
+    ` | ` and chained commands with ` ; ` (chain operators do not affect
+    policy evaluation, which always evaluates every command).
+
+    Args:
+        parsed: Parsed command structure
+
+    Returns:
+        Canonical single-line representation of the command
+    """
+    key = " ".join(_segment_tokens(parsed))
+    for piped in parsed.pipes:
+        key += " | " + canonical_key(piped)
+    for chained in parsed.chained:
+        key += " ; " + canonical_key(chained)
+    # Unparsed segments are kept verbatim so they still distinguish keys
+    for segment in parsed.unsupported:
+        key += " ; ?" + json.dumps(segment)
+    return key
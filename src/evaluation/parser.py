@@ -5,10 +5,33 @@ It uses bashlex (Python port of GNU bash parser) to generate AST and extract
 command components.
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+import re
 import bashlex
 
+from src.evaluation.cache import LRUCache
+from src.evaluation.chain import CommandChain, split_chain
+from src.evaluation.grammar import (
+    DEFAULT_GRAMMAR_DIR,
+    CommandGrammar,
+    GrammarTable,
+    load_grammar,
+)
+from src.evaluation.heredoc import HeredocError, Skeleton, split_heredocs
+from src.evaluation.limits import CommandLimits, scan_shape
+from src.server.deadline import check_deadline
+
+# A command of plain words separated by blanks: no quoting, expansion,
+# redirection, globbing brackets or operators, so bash splits it on blanks
+_SIMPLE_COMMAND = re.compile(r"[\w@%+=:,./*^-]+(?:[ \t]+[\w@%+=:,./*^-]+)*", re.ASCII)
+
+# Words that start compound commands or pipelines when used as the executable
+_RESERVED_WORDS = frozenset(
+    "! [[ ]] { } case coproc do done elif else esac fi for function if in "
+    "select then time until while".split()
+)
+
 
 class ParseError(Exception):
     """Raised when command parsing fails."""
@@ -16,6 +39,61 @@ class ParseError(Exception):
     pass
 
 
+class CommandTooComplex(ParseError):
+    """Raised when a command exceeds a CommandLimits bound.
+
+    Attributes:
+        limit: Name of the exceeded limit (e.g. "max_segments")
+    """
+
+    def __init__(self, message: str, limit: str):
+        super().__init__(message, limit)
+
+    @property
+    def limit(self) -> str:
+        return self.args[1]
+
+    def __str__(self) -> str:
+        return self.args[0]
+
+
+class _ParseBudget:
+    """Tracks segments and nesting while walking one command's AST."""
+
+    def __init__(self, limits: CommandLimits):
+        self.limits = limits
+        self.segments = 0
+
+    def add_segment(self) -> None:
+        self.segments += 1
+        if self.segments > self.limits.max_segments:
+            raise CommandTooComplex(
+                f"Command has more than {self.limits.max_segments} segments",
+                "max_segments",
+            )
+
+    def check_depth(self, depth: int) -> None:
+        if depth > self.limits.max_depth:
+            raise CommandTooComplex(
+                f"Command nests deeper than {self.limits.max_depth} levels",
+                "max_depth",
+            )
+
+
+class Redirect(NamedTuple):
+    """A redirect operation on a command.
+
+    Attributes:
+        op: Redirect operator (e.g. ">", ">>", "2>", "<<")
+        target: Target word as written (the delimiter word for heredocs)
+        content: Heredoc body, or None for redirects to and from files
+    """
+
+    op: str
+    target: str
+    content: Optional[str] = None
+
+
 @dataclass
 class ParsedCommand:
     """Represents a parsed bash command with all its components.
@@ -26,12 +104,14 @@ class ParsedCommand:
         arguments: Positional arguments (excludes flags and options)
         flags: Boolean flags (e.g., ["--force", "-v"])
         options: Options with values (e.g., {"-m": "message", "--tag": "v1.0"})
-        redirects: List of redirect operations (e.g., [(">>", "output.log")])
+        redirects: List of Redirect operations (e.g., [(">>", "output.log")])
         pipes: List of piped commands
         chained: List of chained commands (&&, ||, ;)
         process_substitutions: List of commands from <(...) or >(...) substitutions
         original: Original command string
         pos: Position tuple (start, end) in original string for text extraction
+        unsupported: Chain segments that could not be parsed (on the root
+            command only); the other segments are still parsed
     """
 
     executable: str
@@ -39,12 +119,13 @@ class ParsedCommand:
     arguments: List[str] = field(default_factory=list)
     flags: List[str] = field(default_factory=list)
     options: Dict[str, str] = field(default_factory=dict)
-    redirects: List[Tuple[str, str]] = field(default_factory=list)
+    redirects: List[Redirect] = field(default_factory=list)
     pipes: List["ParsedCommand"] = field(default_factory=list)
     chained: List["ParsedCommand"] = field(default_factory=list)
     process_substitutions: List["ParsedCommand"] = field(default_factory=list)
     original: str = ""
     pos: Optional[Tuple[int, int]] = None
+    unsupported: List[str] = field(default_factory=list)
 
     def get_command_text(self) -> str:
         """Extract this command's text from the original string using position info."""
@@ -60,14 +141,56 @@ class BashCommandParser:
     - Simple commands (git add file.txt)
     - Pipes (cat file.txt | grep pattern)
     - Logical operators (cmd1 && cmd2, cmd1 || cmd2, cmd1 ; cmd2)
-    - Redirects (>, >>, <)
+    - Redirects (>, >>, <) and heredocs (<<EOF, << 'EOF', <<-EOF)
     - Flags and options (--flag, -f, --option=value, -o value)
 
     Does NOT handle (returns ParseError):
     - Command substitution ($(cmd), `cmd`)
     - Compound commands (if, for, while, case)
+
+    Heredoc bodies are cut out by split_heredocs() before bashlex runs, so
+    parsing cost depends on the command skeleton only; the bodies are
+    attached to the command's redirects afterwards.
+
+    Commands beyond the configured CommandLimits raise CommandTooComplex,
+    checked on the raw text before bashlex runs and on the AST while it is
+    walked. max_length applies to the skeleton and max_heredoc_bytes to the
+    heredoc bodies.
+
+    Subcommands and flag values are classified with the configured
+    GrammarTable (see src/evaluation/grammar.py); executables without a
+    grammar have no subcommand. Until configure_grammar() is called, the
+    grammars shipped in policies/grammar are loaded on first use.
+
+    Chains are split at top-level `&&`, `||`, `;` and `|` by split_chain()
+    and each segment is parsed on its own, so a segment bashlex cannot parse
+    is listed in `unsupported` instead of failing the whole chain.
+
+    Parse results (including failures) are cached by command text, and chain
+    segments by segment text, so a long chain with one new segment costs one
+    segment parse. Cached ParsedCommand objects are shared between callers
+    and must not be mutated.
     """
 
+    _cache = LRUCache(maxsize=2048)
+    _segment_cache = LRUCache(maxsize=4096)
+    limits = CommandLimits()
+    grammar: Optional[GrammarTable] = None
+
+    @classmethod
+    def configure_limits(cls, limits: CommandLimits) -> None:
+        """Set the complexity limits, dropping results parsed under the old ones."""
+        cls.limits = limits
+        cls._cache.clear()
+        cls._segment_cache.clear()
+
+    @classmethod
+    def configure_grammar(cls, grammar: GrammarTable) -> None:
+        """Set the command grammars, dropping results parsed under the old ones."""
+        cls.grammar = grammar
+        cls._cache.clear()
+        cls._segment_cache.clear()
+
     @classmethod
     def parse(cls, command: str) -> ParsedCommand:
         """Parse a bash command string into structured components.
@@ -79,13 +202,152 @@ class BashCommandParser:
             ParsedCommand with extracted components
 
         Raises:
-            ParseError: If command is too complex or invalid syntax
+            CommandTooComplex: If the command exceeds the complexity limits
+            ParseError: If command is unsupported or invalid syntax
         """
         if not command or not command.strip():
             raise ParseError("Empty command")
 
+        # Checked before the cache so oversized commands are never stored
+        if len(command) > cls.limits.max_length + cls.limits.max_heredoc_bytes:
+            raise CommandTooComplex(
+                f"Command is longer than {cls.limits.max_length} characters",
+                "max_length",
+            )
+
+        return cls._cached_parse(cls._cache, command, cls._parse_uncached)
+
+    @classmethod
+    def _cached_parse(
+        cls,
+        cache: LRUCache,
+        text: str,
+        parse: Callable[[str], ParsedCommand],
+    ) -> ParsedCommand:
+        """Parse text through a cache that also remembers parse failures."""
+        cached = cache.get(text)
+        if isinstance(cached, ParseError):
+            raise type(cached)(*cached.args)
+        if cached is not None:
+            return cached
+
+        # bashlex cannot be interrupted, so the budget is checked up front
+        check_deadline("parser")
+        try:
+            parsed = parse(text)
+        except ParseError as e:
+            # Store a fresh instance so the cache does not pin traceback frames
+            cache.put(text, type(e)(*e.args))
+            raise
+
+        cache.put(text, parsed)
+        return parsed
+
+    @classmethod
+    def _parse_uncached(cls, command: str) -> ParsedCommand:
+        """Parse a non-empty command string, with bashlex unless it is simple."""
+        simple = cls._parse_simple(command)
+        if simple is not None:
+            return simple
+        chain = split_chain(command)
+        if chain is not None:
+            return cls._parse_chain(command, chain)
+        return cls._parse_bashlex(command)
+
+    @classmethod
+    def _parse_segment(cls, segment: str) -> ParsedCommand:
+        """Parse one chain segment (a command without top-level operators)."""
+        simple = cls._parse_simple(segment)
+        if simple is not None:
+            return simple
+        return cls._parse_bashlex(segment)
+
+    @classmethod
+    def _parse_chain(cls, command: str, chain: CommandChain) -> ParsedCommand:
+        """Parse a split chain segment by segment and join the results.
+
+        The joined tree has the same shape bashlex produces for the whole
+        command: each pipeline's head holds the rest of the pipeline in
+        `pipes`, and the root holds the following pipelines in `chained`.
+        """
+        cls._check_shape(Skeleton(command))
+
+        heads = []
+        unsupported = []
+        first_error: Optional[ParseError] = None
+        for spans in chain.pipelines:
+            commands = []
+            for start, end in spans:
+                try:
+                    segment = cls._cached_parse(
+                        cls._segment_cache, command[start:end], cls._parse_segment
+                    )
+                except CommandTooComplex:
+                    raise
+                except ParseError as e:
+                    unsupported.append(command[start:end])
+                    first_error = first_error or e
+                    continue
+                parsed = cls._relocate(segment, start, command)
+                parsed.pos = (start, end)
+                commands.append(parsed)
+
+            if commands:
+                head = commands[0]
+                head.pipes = commands[1:]
+                if chain.is_list:
+                    head.pos = (spans[0][0], spans[-1][1])
+                heads.append(head)
+
+        if not heads:
+            raise type(first_error)(*first_error.args)
+
+        root = heads[0]
+        root.chained = heads[1:]
+        root.unsupported = unsupported
+        budget = _ParseBudget(cls.limits)
+        for _ in cls._iter_tree(root):
+            budget.add_segment()
+        return root
+
+    @classmethod
+    def _relocate(
+        cls, parsed: ParsedCommand, offset: int, original: str
+    ) -> ParsedCommand:
+        """Copy a segment's tree, pointing it at the full command text."""
+        return replace(
+            parsed,
+            original=original,
+            pos=(
+                None
+                if parsed.pos is None
+                else (parsed.pos[0] + offset, parsed.pos[1] + offset)
+            ),
+            pipes=[cls._relocate(p, offset, original) for p in parsed.pipes],
+            chained=[cls._relocate(c, offset, original) for c in parsed.chained],
+            process_substitutions=[
+                cls._relocate(p, offset, original) for p in parsed.process_substitutions
+            ],
+        )
+
+    @classmethod
+    def _iter_tree(cls, parsed: ParsedCommand) -> Iterator[ParsedCommand]:
+        """Yield every command in the tree (chained, piped and substituted)."""
+        yield parsed
+        for child in parsed.chained + parsed.pipes + parsed.process_substitutions:
+            yield from cls._iter_tree(child)
+
+    @classmethod
+    def _parse_bashlex(cls, command: str) -> ParsedCommand:
+        """Parse a non-empty command string with bashlex."""
         try:
-            parts = bashlex.parse(command)
+            skeleton = split_heredocs(command)
+        except HeredocError as e:
+            raise ParseError(f"Incomplete heredoc: {e}")
+
+        cls._check_shape(skeleton)
+        try:
+            parts = bashlex.parse(skeleton.text)
         except (bashlex.errors.ParsingError, Exception) as e:
             raise ParseError(f"Command too complex for policy validation: {e}")
 
@@ -93,11 +355,99 @@ class BashCommandParser:
             raise ParseError("No parseable command found")
 
         node = parts[0]
-        return cls._parse_node(node, command)
+        parsed = cls._parse_node(node, skeleton.text, _ParseBudget(cls.limits))
+        if skeleton.heredocs:
+            cls._restore_heredocs(parsed, skeleton, command)
+        return parsed
+
+    @classmethod
+    def _parse_simple(cls, command: str) -> Optional[ParsedCommand]:
+        """Parse a command of plain words without bashlex.
+
+        Returns:
+            ParsedCommand identical to the bashlex result, or None if the
+            command uses any shell syntax beyond blank-separated words
+        """
+        stripped = command.strip(" \t")
+        if len(stripped) > cls.limits.max_length or cls.limits.max_segments < 1:
+            return None
+        if not _SIMPLE_COMMAND.fullmatch(stripped):
+            return None
+
+        words = stripped.split()
+        # NAME=value before the executable is an assignment, not a word
+        if "=" in words[0] or words[0] in _RESERVED_WORDS:
+            return None
+        return cls._build_command(words, [], [], command)
+
+    @classmethod
+    def _restore_heredocs(
+        cls, parsed: ParsedCommand, skeleton: Skeleton, command: str
+    ) -> None:
+        """Point a tree parsed from a skeleton back at the original command.
+
+        Placeholder redirects become heredoc redirects carrying their body,
+        and positions are mapped from the skeleton to the original text.
+        """
+        redirects = []
+        for redirect in parsed.redirects:
+            heredoc = skeleton.heredocs.get(redirect.target)
+            if heredoc is None:
+                redirects.append(redirect)
+            else:
+                redirects.append(Redirect(heredoc.operator, heredoc.word, heredoc.body))
+        parsed.redirects = redirects
+        parsed.original = command
+        if parsed.pos is not None:
+            parsed.pos = (
+                skeleton.to_original(parsed.pos[0]),
+                skeleton.to_original(parsed.pos[1]),
+            )
+        for child in parsed.pipes + parsed.chained + parsed.process_substitutions:
+            cls._restore_heredocs(child, skeleton, command)
+
+    @classmethod
+    def _check_shape(cls, skeleton: Skeleton) -> None:
+        """Reject commands whose unparsed shape already exceeds the limits."""
+        limits = cls.limits
+        if len(skeleton.text) > limits.max_length:
+            raise CommandTooComplex(
+                f"Command is longer than {limits.max_length} characters",
+                "max_length",
+            )
+        if skeleton.heredoc_bytes > limits.max_heredoc_bytes:
+            raise CommandTooComplex(
+                f"Heredoc is larger than {limits.max_heredoc_bytes} characters",
+                "max_heredoc_bytes",
+            )
+        shape = scan_shape(skeleton.text)
+        if shape.separators + 1 > limits.max_segments:
+            raise CommandTooComplex(
+                f"Command has more than {limits.max_segments} segments",
+                "max_segments",
+            )
+        if shape.depth > limits.max_depth:
+            raise CommandTooComplex(
+                f"Command nests deeper than {limits.max_depth} levels",
+                "max_depth",
+            )
 
     @classmethod
-    def _parse_node(cls, node, original: str) -> ParsedCommand:
-        """Parse a bashlex AST node into ParsedCommand."""
+    def _parse_node(
+        cls,
+        node,
+        original: str,
+        budget: Optional[_ParseBudget] = None,
+        depth: int = 0,
+    ) -> ParsedCommand:
+        """Parse a bashlex AST node into ParsedCommand.
+
+        Args:
+            node: bashlex AST node
+            original: Full command text
+            budget: Segment budget shared by the whole tree (None = unlimited)
+            depth: Process substitution nesting depth of this node
+        """
 
         if node.kind == "compound":
             raise ParseError("Compound commands (if/for/while) not supported")
@@ -109,7 +459,7 @@ class BashCommandParser:
             commands = []
             for part_node in node.parts:
                 if part_node.kind == "command":
-                    parsed = cls._parse_command_node(part_node, original)
+                    parsed = cls._parse_command_node(part_node, original, budget, depth)
                     parsed.pos = part_node.pos
                     commands.append(parsed)
 
@@ -126,7 +476,7 @@ class BashCommandParser:
             commands = []
             for part_node in node.parts:
                 if part_node.kind in ("command", "pipeline"):
-                    parsed = cls._parse_node(part_node, original)
+                    parsed = cls._parse_node(part_node, original, budget, depth)
                     parsed.pos = part_node.pos
                     parsed.original = original
                     commands.append(parsed)
@@ -139,13 +489,22 @@ class BashCommandParser:
             return result
 
         if node.kind == "command":
-            return cls._parse_command_node(node, original)
+            return cls._parse_command_node(node, original, budget, depth)
 
         raise ParseError(f"Unsupported node kind: {node.kind}")
 
     @classmethod
-    def _parse_command_node(cls, node, original: str) -> ParsedCommand:
+    def _parse_command_node(
+        cls,
+        node,
+        original: str,
+        budget: Optional[_ParseBudget] = None,
+        depth: int = 0,
+    ) -> ParsedCommand:
         """Parse a command node into ParsedCommand."""
+        if budget is not None:
+            budget.add_segment()
+            budget.check_depth(depth)
 
         parts = []
         redirects = []
@@ -160,7 +519,7 @@ class BashCommandParser:
                         elif subpart.kind == "processsubstitution":
                             if hasattr(subpart, "command"):
                                 parsed_subst = cls._parse_node(
-                                    subpart.command, original
+                                    subpart.command, original, budget, depth + 1
                                 )
                                 process_substitutions.append(parsed_subst)
 
@@ -171,17 +530,29 @@ class BashCommandParser:
                 # Handle both word nodes (with .pos) and file descriptors (int)
                 if hasattr(part.output, "pos"):
                     redirect_target = original[part.output.pos[0] : part.output.pos[1]]
-                    redirects.append((redirect_op, redirect_target))
-                # Else: heredoc or file descriptor - skip for now (TODO: extract heredoc content)
+                    redirects.append(Redirect(redirect_op, redirect_target))
+                # Else: file descriptor duplication (2>&1) - not a file target
 
         if not parts:
             raise ParseError("No executable found in command")
 
+        return cls._build_command(parts, redirects, process_substitutions, original)
+
+    @classmethod
+    def _build_command(
+        cls,
+        parts: List[str],
+        redirects: List[Redirect],
+        process_substitutions: List[ParsedCommand],
+        original: str,
+    ) -> ParsedCommand:
+        """Classify a command's words into executable, subcommand and arguments."""
         # First part is the executable
         executable = parts[0]
         remaining = parts[1:]
 
         # Determine subcommand, arguments, flags, options
+        grammar = cls._grammar().get(executable)
         subcommand = None
         arguments: list[str] = []
         flags = []
@@ -191,6 +562,13 @@ class BashCommandParser:
         while i < len(remaining):
             part = remaining[i]
 
+            # Past the positional arity, the words belong to another command
+            if grammar is not None:
+                limit = grammar.positional_limit(subcommand)
+                if limit is not None and len(arguments) >= limit:
+                    arguments.extend(remaining[i:])
+                    break
+
             # Check if it's a flag or option
             if part.startswith("-"):
                 # Check if it's an option with value (--key=value)
@@ -198,7 +576,9 @@ class BashCommandParser:
                     key, value = part.split("=", 1)
                     options[key] = value
                 # Check if next part is the value for this option
-                elif i + 1 < len(remaining) and not remaining[i + 1].startswith("-"):
+                elif i + 1 < len(remaining) and cls._takes_value(
+                    grammar, part, subcommand, remaining[i + 1]
+                ):
                     options[part] = remaining[i + 1]
                     i += 1  # Skip next part
                 else:
@@ -210,7 +590,8 @@ class BashCommandParser:
                 if (
                     not subcommand
                     and not arguments
-                    and cls._is_likely_subcommand(executable, part)
+                    and grammar is not None
+                    and grammar.is_subcommand(part)
                 ):
                     subcommand = part
                 else:
@@ -229,6 +610,13 @@ class BashCommandParser:
             original=original,
         )
 
+    @classmethod
+    def _grammar(cls) -> GrammarTable:
+        """Return the configured grammars, loading the shipped ones if none are."""
+        if cls.grammar is None:
+            cls.grammar = load_grammar(DEFAULT_GRAMMAR_DIR)
+        return cls.grammar
+
     @staticmethod
     def _get_redirect_operator(redirect_node) -> str:
         """Extract redirect operator from redirect node."""
@@ -238,38 +626,19 @@ class BashCommandParser:
         return ">"
 
     @staticmethod
-    def _is_likely_subcommand(executable: str, word: str) -> bool:
-        """Heuristic to determine if word is a subcommand.
-
-        Commands like git, docker, kubectl, terraform commonly have subcommands.
+    def _takes_value(
+        grammar: Optional[CommandGrammar],
+        flag: str,
+        subcommand: Optional[str],
+        following: str,
+    ) -> bool:
+        """Decide whether a flag consumes the following word as its value.
+
+        The executable's grammar decides for declared flags; undeclared flags
+        take the following word unless it looks like another flag.
         """
-        # Commands known to use subcommands
-        subcommand_executables = {
-            "git",
-            "docker",
-            "podman",
-            "kubectl",
-            "terraform",
-            "terragrunt",
-            "gh",
-            "az",
-            "gcloud",
-            "aws",
-            "npm",
-            "pip",
-            "uv",
-            "cargo",
-            "ruff",
-            "mypy",
-            "black",
-            "pytest",
-            "vale",
-        }
-
-        # If executable is known to use subcommands and word doesn't look like a path/file
-        if executable in subcommand_executables:
-            # Subcommands typically don't have path separators or extensions
-            if "/" not in word and "." not in word:
-                return True
-
-        return False
+        if grammar is not None:
+            declared = grammar.takes_value(flag, subcommand)
+            if declared is not None:
+                return declared
+        return not following.startswith("-")
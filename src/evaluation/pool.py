@@ -0,0 +1,70 @@
+"""Pool of Rego interpreters for concurrent policy queries.
+
+A regopy Interpreter holds mutable input state, so a single instance cannot
+serve overlapping queries. The pool hands out interpreters one at a time and
+creates new ones on demand up to a fixed size; callers that find the pool
+exhausted wait until an interpreter is returned.
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from regopy import Interpreter
+
+
+class InterpreterPool:
+    """Bounded pool of lazily created interpreters.
+
+    Attributes:
+        size: Maximum number of interpreters the pool creates
+    """
+
+    def __init__(self, factory: Callable[[], Interpreter], size: int = 1):
+        """Create an empty pool.
+
+        Args:
+            factory: Callable creating a ready-to-query interpreter
+            size: Maximum number of interpreters (at least 1)
+        """
+        self.size = max(1, size)
+        self._factory = factory
+        self._idle: "queue.LifoQueue[Interpreter]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def add(self, interpreter: Interpreter) -> None:
+        """Seed the pool with an already initialized interpreter."""
+        with self._lock:
+            self._created += 1
+        self._idle.put(interpreter)
+
+    @contextmanager
+    def borrow(self) -> Iterator[Interpreter]:
+        """Check out an interpreter for the duration of the with-block."""
+        interpreter = self._acquire()
+        try:
+            yield interpreter
+        finally:
+            self._idle.put(interpreter)
+
+    def _acquire(self) -> Interpreter:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+
+        if can_create:
+            try:
+                return self._factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
@@ -0,0 +1,147 @@
+"""Process-pool backend for Rego evaluation.
+
+Rego queries are CPU-bound and regopy holds the GIL while evaluating, so a
+single server process evaluates on one core. This backend keeps a pool of
+worker processes, each with its own compiled RegoEvaluator, and sends them
+fully built input documents.
+
+Input documents are built in the parent, so session flags, enrichment and
+result caches all stay in the server process. Workers only run queries and
+never see or mutate shared state.
+"""
+
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Evaluator owned by a worker process, created by the pool initializer
+_worker_evaluator = None
+
+
+def _init_worker(policy_dir: str) -> None:
+    """Load and compile policies once per worker process."""
+    global _worker_evaluator
+    from src.evaluation.rego import RegoEvaluator
+
+    _worker_evaluator = RegoEvaluator(policy_dir=policy_dir, decision_cache_size=0)
+
+
+def _run_queries(
+    method_name: str, input_docs: Sequence[Dict[str, Any]], bundles: List[str]
+) -> List[List[Any]]:
+    """Evaluate input documents against bundles inside a worker process.
+
+    Exceptions are returned as RuntimeError so they always pickle back to the
+    parent, whatever type the interpreter raised.
+    """
+    evaluate_fn = getattr(_worker_evaluator, method_name)
+    results = _worker_evaluator._run_local_queries(evaluate_fn, input_docs, bundles)
+    return [
+        [
+            RuntimeError(str(result)) if isinstance(result, Exception) else result
+            for result in row
+        ]
+        for row in results
+    ]
+
+
+class ProcessPoolBackend:
+    """Runs bundle queries in a pool of worker processes.
+
+    Workers are started on first use with the spawn start method, since the
+    server process runs threads and forking it is unsafe.
+
+    Attributes:
+        policy_dir: Policy directory loaded by every worker
+        workers: Number of worker processes
+    """
+
+    def __init__(self, policy_dir: str, workers: int):
+        """Create a backend; no processes are started until first use.
+
+        Args:
+            policy_dir: Policy directory loaded by every worker
+            workers: Number of worker processes
+        """
+        self.policy_dir = policy_dir
+        self.workers = max(1, workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.policy_dir,),
+            )
+            logger.info(f"Started Rego process pool with {self.workers} workers")
+        return self._executor
+
+    def run(
+        self,
+        method_name: str,
+        input_docs: Sequence[Dict[str, Any]],
+        bundles: List[str],
+        split: bool = False,
+        timeout: Optional[float] = None,
+    ) -> List[List[Any]]:
+        """Evaluate input documents against bundles in worker processes.
+
+        Args:
+            method_name: RegoEvaluator per-bundle method to run (e.g. "_evaluate_bundle")
+            input_docs: Rego input documents, one per command segment
+            bundles: List of policy bundles to evaluate
+            split: Spread the documents across all workers instead of sending
+                them to a single worker
+            timeout: Seconds to wait for all results (None = no limit)
+
+        Returns:
+            Results indexed as [input_doc_index][bundle_index]
+
+        Raises:
+            BrokenProcessPool: If a worker died; the pool is reset for the next call
+            TimeoutError: If the results are not ready within `timeout`
+        """
+        chunks = 1
+        if split:
+            chunks = min(self.workers, len(input_docs))
+        size = -(-len(input_docs) // max(chunks, 1))
+
+        executor = self._get_executor()
+        futures: List[Future] = [
+            executor.submit(
+                _run_queries, method_name, list(input_docs[i : i + size]), bundles
+            )
+            for i in range(0, len(input_docs), max(size, 1))
+        ]
+
+        try:
+            results: List[List[Any]] = []
+            expires_at = None if timeout is None else time.monotonic() + timeout
+            for future in futures:
+                remaining = (
+                    None
+                    if expires_at is None
+                    else max(0.0, expires_at - time.monotonic())
+                )
+                results.extend(future.result(timeout=remaining))
+            return results
+        except TimeoutError:
+            for future in futures:
+                future.cancel()
+            raise
+        except BrokenProcessPool:
+            self.shutdown()
+            raise
+
+    def shutdown(self) -> None:
+        """Stop all worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
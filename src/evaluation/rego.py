@@ -10,12 +10,24 @@ This module provides the bridge between Python and Rego policies:
 
 import json
 import logging
+import re
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import (
+    List,
+    Dict,
+    Any,
+    Callable,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import httpx
-from regopy import Interpreter, NodeKind
+from regopy import Bundle, Interpreter, NodeKind, Output
 from src.server.models import (
     ToolUseEvent,
     PostFileEditEvent,
@@ -23,27 +35,99 @@ from src.server.models import (
     PolicyGuidance,
     PolicyAction,
 )
+from src.server.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    check_deadline,
+    current_deadline,
+    remaining_time,
+)
 from src.server.session import get_all_flags
 
-from src.evaluation.parser import ParsedCommand
+from src.evaluation.cache import LRUCache
+from src.evaluation.dependencies import (
+    ActivationPaths,
+    FlagDependencies,
+    raw_command_packages,
+)
+from src.evaluation.normalize import canonical_key
+from src.evaluation.parser import ParsedCommand, Redirect
+from src.evaluation.pool import InterpreterPool
+from src.evaluation.process_pool import ProcessPoolBackend
 
 logger = logging.getLogger(__name__)
 
+# Commands whose input is enriched with live external data; never cached
+_ENRICHED_COMMANDS = {("uv", "add"), ("pip", "install")}
+
+# Rules queried per bundle; compiled as bundle entrypoints at startup
+_QUERIED_RULES = ("decisions", "guidances", "guidance_activations")
+
+_PACKAGE_RE = re.compile(r"^package\s+([\w.]+)", re.MULTILINE)
+
+# Interpreters kept for requests evaluating at the same time
+_INTERPRETERS = 8
+
+# Guidance activations kept per (bundles, path class, flags); see ActivationPaths
+_ACTIVATION_CACHE_SIZE = 256
+
 
 class RegoEvaluator:
     """Evaluates policies using regopy (embedded Rego interpreter).
 
-    Policies are loaded once at initialization for fast per-request evaluation.
+    Policies are loaded and compiled into a bundle once at initialization for
+    fast per-request evaluation. Bash command results are cached by canonical
+    command key, so equivalent spellings of a command are evaluated once.
+
+    Each command segment is queried against each enabled bundle. Concurrent
+    requests each borrow an interpreter from a pool sharing the compiled
+    bundle, since an interpreter holds the input of its current query.
+    regopy holds the GIL while evaluating, so the queries of one request run
+    serially in this process.
+
+    With `process_workers` set, queries run in worker processes instead, so
+    evaluation scales across CPU cores; requests with at least
+    `parallel_threshold` segment x bundle queries are split across workers.
+    Input documents (including the session flag snapshot) are still built in
+    this process.
     """
 
-    def __init__(self, policy_dir: str = "policies"):
+    def __init__(
+        self,
+        policy_dir: str = "policies",
+        decision_cache_size: int = 1024,
+        parallel_threshold: int = 8,
+        process_workers: int = 0,
+    ):
         """Initialize Rego interpreter and load all policies.
 
         Args:
             policy_dir: Directory containing .rego policy files
+            decision_cache_size: Maximum number of cached bash command results
+            parallel_threshold: Minimum segment x bundle queries in a request
+                before splitting it across worker processes
+            process_workers: Number of worker processes to evaluate in
+                (0 evaluates in this process)
         """
         self.policy_dir = Path(policy_dir)
         self.interpreter = Interpreter()
+        self.decision_cache = LRUCache(maxsize=decision_cache_size)
+        self.flag_dependencies = FlagDependencies({})
+        self.activation_paths = ActivationPaths({})
+        self.raw_command_packages: FrozenSet[str] = frozenset()
+        self.activation_cache = LRUCache(maxsize=_ACTIVATION_CACHE_SIZE)
+        self.parallel_threshold = parallel_threshold
+
+        self._modules: List[tuple] = []
+        self._bundle: Optional[Bundle] = None
+        self._entrypoints: set = set()
+        self._interpreters = InterpreterPool(self._new_interpreter, _INTERPRETERS)
+        self._interpreters.add(self.interpreter)
+        self._process_backend: Optional[ProcessPoolBackend] = None
+        if process_workers > 0:
+            self._process_backend = ProcessPoolBackend(
+                str(self.policy_dir.resolve()), process_workers
+            )
 
         if not self.policy_dir.exists():
             logger.warning(
@@ -72,11 +156,157 @@ class RegoEvaluator:
                 policy_content = rego_file.read_text()
                 module_name = str(rego_file.relative_to(self.policy_dir))
                 self.interpreter.add_module(module_name, policy_content)
+                self._modules.append((module_name, policy_content))
                 logger.debug(f"Loaded policy: {rego_file}")
             except Exception as e:
                 logger.error(f"Failed to load policy {rego_file}: {e}")
                 raise
 
+        self.flag_dependencies = FlagDependencies.from_modules(self._modules)
+        self.activation_paths = ActivationPaths.from_modules(self._modules)
+        self.raw_command_packages = raw_command_packages(self._modules)
+        self._compile_bundle()
+
+    def _compile_bundle(self):
+        """Compile every package's queried rules into one reusable bundle.
+
+        Querying a compiled bundle skips per-query compilation of all modules,
+        and any number of interpreters can execute the same bundle. If
+        compilation fails, queries fall back to ad-hoc interpreter queries.
+        """
+        packages = {
+            match.group(1)
+            for _, content in self._modules
+            for match in _PACKAGE_RE.finditer(content)
+        }
+        entrypoints = [
+            f"{package.replace('.', '/')}/{rule}"
+            for package in sorted(packages)
+            for rule in _QUERIED_RULES
+        ]
+
+        try:
+            self._bundle = self.interpreter.build(None, entrypoints)
+            self._entrypoints = set(entrypoints)
+            logger.info(f"Compiled policy bundle with {len(entrypoints)} entrypoints")
+        except Exception as e:
+            logger.warning(
+                f"Policy bundle compilation failed, using ad-hoc queries: {e}"
+            )
+            self._bundle = None
+            self._entrypoints = set()
+
+    def _new_interpreter(self) -> Interpreter:
+        """Create an additional interpreter for the pool."""
+        interpreter = Interpreter()
+        if self._bundle is None:
+            for module_name, policy_content in self._modules:
+                interpreter.add_module(module_name, policy_content)
+        return interpreter
+
+    def _query(
+        self,
+        interpreter: Interpreter,
+        bundle: str,
+        rule: str,
+        input_doc: Dict[str, Any],
+    ) -> Output:
+        """Run `data.<bundle>.<rule>` against input on the given interpreter."""
+        interpreter.set_input(input_doc)
+        entrypoint = f"{bundle.replace('.', '/')}/{rule}"
+        if entrypoint in self._entrypoints:
+            return interpreter.query_bundle_entrypoint(self._bundle, entrypoint)
+        return interpreter.query(f"data.{bundle}.{rule}")
+
+    def close(self) -> None:
+        """Release worker processes."""
+        if self._process_backend is not None:
+            self._process_backend.shutdown()
+
+    def _run_bundle_queries(
+        self,
+        evaluate_fn: Callable[[str, Dict[str, Any], Interpreter], List[Any]],
+        input_docs: Sequence[Dict[str, Any]],
+        bundles: List[str],
+    ) -> List[List[Any]]:
+        """Evaluate every input document against every bundle.
+
+        Dispatches to the process backend when one is configured, falling back
+        to in-process evaluation if the worker pool is broken. Exceptions are
+        returned in place of results so callers can handle them per bundle.
+        Queries stop with DeadlineExceeded once the request's deadline passes.
+
+        Args:
+            evaluate_fn: Per-bundle evaluation method (bundle, input_doc, interpreter)
+            input_docs: Rego input documents, one per command segment
+            bundles: List of policy bundles to evaluate
+
+        Returns:
+            Results indexed as [input_doc_index][bundle_index]
+        """
+        check_deadline("rego")
+        deadline = current_deadline()
+
+        if self._process_backend is not None:
+            split = len(input_docs) * len(bundles) >= self.parallel_threshold
+            try:
+                return self._process_backend.run(
+                    evaluate_fn.__name__,
+                    input_docs,
+                    bundles,
+                    split=split,
+                    timeout=deadline.remaining() if deadline else None,
+                )
+            except TimeoutError:
+                raise DeadlineExceeded("rego")
+            except Exception as e:
+                logger.error(f"Process pool evaluation failed, evaluating locally: {e}")
+
+        results = self._run_local_queries(evaluate_fn, input_docs, bundles, deadline)
+        for segment_results in results:
+            for result in segment_results:
+                if isinstance(result, DeadlineExceeded):
+                    raise result
+        return results
+
+    def _run_local_queries(
+        self,
+        evaluate_fn: Callable[[str, Dict[str, Any], Interpreter], List[Any]],
+        input_docs: Sequence[Dict[str, Any]],
+        bundles: List[str],
+        deadline: Optional[Deadline] = None,
+    ) -> List[List[Any]]:
+        """Evaluate every input document against every bundle in this process.
+
+        Runs serially on one interpreter borrowed from the pool. Exceptions
+        are returned in place of results so callers can handle them per
+        bundle.
+
+        Args:
+            evaluate_fn: Per-bundle evaluation method (bundle, input_doc, interpreter)
+            input_docs: Rego input documents, one per command segment
+            bundles: List of policy bundles to evaluate
+            deadline: Deadline checked before each query (None = no limit)
+
+        Returns:
+            Results indexed as [input_doc_index][bundle_index]
+        """
+        tasks = [(doc, bundle) for doc in input_docs for bundle in bundles]
+
+        def run(task, interpreter):
+            if deadline is not None and deadline.remaining() <= 0:
+                return DeadlineExceeded("rego")
+            try:
+                return evaluate_fn(task[1], task[0], interpreter)
+            except Exception as e:
+                return e
+
+        with self._interpreters.borrow() as interpreter:
+            flat = [run(task, interpreter) for task in tasks]
+
+        width = len(bundles)
+        return [flat[i * width : (i + 1) * width] for i in range(len(input_docs))]
+
     def evaluate(
         self, event: ToolUseEvent, parsed: ParsedCommand, bundles: List[str]
     ) -> List[PolicyDecision]:
@@ -94,52 +324,179 @@ class RegoEvaluator:
         Returns:
             List of PolicyDecision objects from all matching rules across all commands
         """
-        all_decisions = []
+        cache_key = self._command_cache_key("decisions", event, parsed, bundles)
+        if cache_key is not None:
+            cached = self.decision_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
 
-        # Evaluate this command's policies
-        input_doc = self._build_input_document(event, parsed)
-        self._enrich_input(input_doc, parsed)
+        decisions, failed = self._evaluate_command_tree(event, parsed, bundles)
 
-        current_command_decisions = []
-        for bundle in bundles:
-            try:
-                bundle_decisions = self._evaluate_bundle(bundle, input_doc)
-                current_command_decisions.extend(bundle_decisions)
-            except Exception as e:
-                logger.error(f"Error evaluating bundle '{bundle}': {e}")
+        # Bundle errors may be transient; do not replay them from the cache
+        if cache_key is not None and not failed:
+            self.decision_cache.put(cache_key, tuple(decisions))
+        return decisions
+
+    def _evaluate_command_tree(
+        self, event: ToolUseEvent, parsed: ParsedCommand, bundles: List[str]
+    ) -> Tuple[List[PolicyDecision], bool]:
+        """Evaluate decisions for a command and all its chained/piped commands.
+
+        Returns:
+            (decisions, whether any bundle query failed)
+        """
+        all_decisions = []
+        failed = False
+
+        # Chained (&&, ||, ;), piped (|) and substituted commands, depth-first
+        segments = list(self._iter_commands(parsed))
+        input_docs = [self._segment_input_document(event, cmd) for cmd in segments]
+        results = self._run_bundle_queries(self._evaluate_bundle, input_docs, bundles)
+
+        for segment, segment_results in zip(segments, results):
+            current_command_decisions = []
+            for bundle, bundle_decisions in zip(bundles, segment_results):
+                if isinstance(bundle_decisions, Exception):
+                    failed = True
+                    logger.error(
+                        f"Error evaluating bundle '{bundle}': {bundle_decisions}"
+                    )
+                    current_command_decisions.append(
+                        PolicyDecision(
+                            action=PolicyAction.ASK,
+                            reason=f"Policy evaluation error in bundle '{bundle}': {str(bundle_decisions)}",
+                        )
+                    )
+                else:
+                    current_command_decisions.extend(bundle_decisions)
+
+            # If no policies matched this specific command, require user approval
+            if not current_command_decisions:
                 current_command_decisions.append(
                     PolicyDecision(
                         action=PolicyAction.ASK,
-                        reason=f"Policy evaluation error in bundle '{bundle}': {str(e)}",
+                        reason=f"No policy defined for command: {segment.executable}",
                     )
                 )
 
-        # If no policies matched this specific command, require user approval
-        if not current_command_decisions:
-            current_command_decisions.append(
+            all_decisions.extend(current_command_decisions)
+
+        # Chain segments the parser could not read cannot be validated
+        for segment_text in parsed.unsupported:
+            all_decisions.append(
                 PolicyDecision(
                     action=PolicyAction.ASK,
-                    reason=f"No policy defined for command: {parsed.executable}",
+                    reason=f"Command could not be validated: {segment_text}",
                 )
             )
 
-        all_decisions.extend(current_command_decisions)
+        return all_decisions, failed
 
-        # Recursively evaluate all chained commands (&&, ||, ;)
-        for chained_cmd in parsed.chained:
-            chained_decisions = self.evaluate(event, chained_cmd, bundles)
-            all_decisions.extend(chained_decisions)
+    def _segment_input_document(
+        self, event: ToolUseEvent, parsed: ParsedCommand
+    ) -> Dict[str, Any]:
+        """Build and enrich the Rego input for a single command segment."""
+        input_doc = self._build_input_document(event, parsed)
+        self._enrich_input(input_doc, parsed)
+        return input_doc
 
-        # Recursively evaluate all piped commands (|)
-        for piped_cmd in parsed.pipes:
-            piped_decisions = self.evaluate(event, piped_cmd, bundles)
-            all_decisions.extend(piped_decisions)
+    def _command_cache_key(
+        self,
+        kind: str,
+        event: ToolUseEvent,
+        parsed: ParsedCommand,
+        bundles: List[str],
+    ) -> Optional[Hashable]:
+        """Build the result cache key for a bash command, or None if uncacheable.
+
+        The key is built from the canonical command key rather than the raw
+        text, so equivalent spellings share an entry. Bundles with rules
+        that read the command as written (`input.event.command`,
+        `input.parsed.original`) see a difference between spellings, so
+        for them the raw command and tool parameters are part of the key
+        too. Only the session flags
+        that rules applicable to these commands can read are part of the key,
+        so unrelated flag changes do not invalidate entries. The session ID
+        itself is not part of the key.
 
-        for proc_subst in parsed.process_substitutions:
-            proc_subst_decisions = self.evaluate(event, proc_subst, bundles)
-            all_decisions.extend(proc_subst_decisions)
+        Args:
+            kind: Result kind being cached ("decisions" or "guidances")
+            event: The tool use event
+            parsed: Parsed command structure
+            bundles: List of policy bundles being evaluated
 
-        return all_decisions
+        Returns:
+            Hashable cache key, or None when the result must not be cached
+        """
+        if self._needs_enrichment(parsed):
+            return None
+
+        raw = None
+        if not self.raw_command_packages.isdisjoint(bundles):
+            raw = (
+                event.command,
+                json.dumps(event.parameters or {}, sort_keys=True, default=str),
+            )
+
+        return (
+            kind,
+            canonical_key(parsed),
+            raw,
+            tuple(bundles),
+            event.source_client,
+            event.tool_name,
+            self.session_flags_key(
+                event.session_id,
+                bundles,
+                (
+                    (cmd.executable, cmd.subcommand)
+                    for cmd in self._iter_commands(parsed)
+                ),
+            ),
+        )
+
+    def session_flags_key(
+        self,
+        session_id: str,
+        bundles: List[str],
+        commands: Iterable[Tuple[Optional[str], Optional[str]]],
+    ) -> str:
+        """Serialize the session flags that can affect a result, for cache keys.
+
+        Args:
+            session_id: Session whose flags are read
+            bundles: List of policy bundles being evaluated
+            commands: (executable, subcommand) of every command evaluated; use
+                (None, None) for inputs without a parsed command
+
+        Returns:
+            JSON of the readable flags, sorted by name
+        """
+        flags = get_all_flags(session_id)
+        flags_read = self.flag_dependencies.flags_read(bundles, commands)
+        if flags_read is not None:
+            flags = {name: flags[name] for name in flags_read if name in flags}
+        return json.dumps(flags, sort_keys=True, default=str)
+
+    @classmethod
+    def _iter_commands(
+        cls, parsed: ParsedCommand, include_process_substitutions: bool = True
+    ):
+        """Yield every command in the tree (chained, piped and substituted)."""
+        yield parsed
+        children = parsed.chained + parsed.pipes
+        if include_process_substitutions:
+            children = children + parsed.process_substitutions
+        for sub in children:
+            yield from cls._iter_commands(sub, include_process_substitutions)
+
+    @classmethod
+    def _needs_enrichment(cls, parsed: ParsedCommand) -> bool:
+        """Check whether any command in the tree is enriched with external data."""
+        return any(
+            (cmd.executable, cmd.subcommand) in _ENRICHED_COMMANDS
+            for cmd in cls._iter_commands(parsed)
+        )
 
     def evaluate_file_edit_decisions(
         self, event: PostFileEditEvent, bundles: List[str]
@@ -158,15 +515,15 @@ class RegoEvaluator:
         """
         all_decisions = []
         input_doc = self._build_file_edit_input_document(event)
+        results = self._run_bundle_queries(self._evaluate_bundle, [input_doc], bundles)
 
-        for bundle in bundles:
-            try:
-                bundle_decisions = self._evaluate_bundle(bundle, input_doc)
-                all_decisions.extend(bundle_decisions)
-            except Exception as e:
+        for bundle, bundle_decisions in zip(bundles, results[0]):
+            if isinstance(bundle_decisions, Exception):
                 logger.error(
-                    f"Error evaluating file edit decisions for bundle '{bundle}': {e}"
+                    f"Error evaluating file edit decisions for bundle '{bundle}': {bundle_decisions}"
                 )
+            else:
+                all_decisions.extend(bundle_decisions)
 
         return all_decisions
 
@@ -181,24 +538,69 @@ class RegoEvaluator:
 
         Returns:
             List of guidance check names to activate (e.g., ["comment_ratio", "mid_code_import"])
+
+        Activations are cached by the outcome of the path tests the
+        activation rules make, so later edits of files of the same kind
+        (e.g. any `.py` file) skip the queries. Bundles whose activation
+        rules read more than the path and session flags are queried every
+        time.
         """
+        cache_key = self._activation_cache_key(event, bundles)
+        if cache_key is not None:
+            cached = self.activation_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+
         all_activations = []
+        failed = False
 
         # Build input document from file edit event
         input_doc = self._build_file_edit_input_document(event)
+        results = self._run_bundle_queries(
+            self._evaluate_guidance_activations_bundle, [input_doc], bundles
+        )
 
-        for bundle in bundles:
-            try:
-                bundle_activations = self._evaluate_guidance_activations_bundle(
-                    bundle, input_doc
-                )
-                all_activations.extend(bundle_activations)
-            except Exception as e:
+        for bundle, bundle_activations in zip(bundles, results[0]):
+            if isinstance(bundle_activations, Exception):
+                failed = True
                 logger.error(
-                    f"Error evaluating guidance activations for bundle '{bundle}': {e}"
+                    f"Error evaluating guidance activations for bundle '{bundle}': {bundle_activations}"
                 )
+            else:
+                all_activations.extend(bundle_activations)
 
-        return list(set(all_activations))
+        activations = list(set(all_activations))
+        if cache_key is not None and not failed:
+            self.activation_cache.put(cache_key, tuple(activations))
+        return activations
+
+    def _activation_cache_key(
+        self, event: PostFileEditEvent, bundles: List[str]
+    ) -> Optional[Hashable]:
+        """Build the guidance activation cache key, or None if not cacheable."""
+        path_class = self.activation_paths.path_class(bundles, event.file_path)
+        if path_class is None:
+            return None
+        return (
+            tuple(bundles),
+            path_class,
+            self.session_flags_key(event.session_id, bundles, [(None, None)]),
+        )
+
+    @staticmethod
+    def _redirect_document(redirect: Redirect) -> Dict[str, Any]:
+        """Convert a redirect to Rego input.
+
+        File redirects carry a path; heredocs carry their delimiter and body
+        instead, so path rules never treat heredoc content as a file.
+        """
+        if redirect.content is None:
+            return {"op": redirect.op, "path": redirect.target}
+        return {
+            "op": redirect.op,
+            "delimiter": redirect.target,
+            "content": redirect.content,
+        }
 
     def _build_input_document(
         self, event: ToolUseEvent, parsed: ParsedCommand
@@ -218,7 +620,9 @@ class RegoEvaluator:
             "arguments": parsed.arguments,
             "flags": parsed.flags,
             "options": parsed.options,
-            "redirects": [{"op": op, "path": path} for op, path in parsed.redirects],
+            "redirects": [
+                self._redirect_document(redirect) for redirect in parsed.redirects
+            ],
             "original": parsed.original,
         }
 
@@ -260,10 +664,8 @@ class RegoEvaluator:
                     "old_lines": patch.oldLines,
                     "new_start": patch.newStart,
                     "new_lines": patch.newLines,
-                    "lines": [
-                        {"operation": line.operation, "content": line.content}
-                        for line in patch.lines
-                    ],
+                    # Lazy view; line objects are built while regopy encodes them
+                    "lines": patch.lines.documents(),
                 }
                 for patch in (event.structured_patch or [])
             ],
@@ -305,6 +707,7 @@ class RegoEvaluator:
                             break
 
             if package_name:
+                check_deadline("enrichment")
                 metadata = self._fetch_pypi_metadata(package_name)
                 if metadata:
                     input_doc["pypi_metadata"] = metadata
@@ -316,6 +719,7 @@ class RegoEvaluator:
                     (arg for arg in parsed.arguments if not arg.startswith("-")), None
                 )
                 if package_name:
+                    check_deadline("enrichment")
                     metadata = self._fetch_pypi_metadata(package_name)
                     if metadata:
                         input_doc["pypi_metadata"] = metadata
@@ -332,7 +736,7 @@ class RegoEvaluator:
         try:
             response = httpx.get(
                 f"https://pypi.org/pypi/{package_name}/json",
-                timeout=5.0,
+                timeout=remaining_time(5.0),
                 follow_redirects=True,
             )
             response.raise_for_status()
@@ -376,22 +780,20 @@ class RegoEvaluator:
             return None
 
     def _evaluate_bundle(
-        self, bundle: str, input_doc: Dict[str, Any]
+        self, bundle: str, input_doc: Dict[str, Any], interpreter: Interpreter
     ) -> List[PolicyDecision]:
         """Evaluate a specific bundle's policies.
 
         Args:
             bundle: Bundle name (e.g., "universal", "python_uv")
             input_doc: Rego input document
+            interpreter: Interpreter to run the query on
 
         Returns:
             List of PolicyDecision objects from this bundle
         """
-        query = f"data.{bundle}.decisions"
-
         try:
-            self.interpreter.set_input(input_doc)
-            output = self.interpreter.query(query)
+            output = self._query(interpreter, bundle, "decisions", input_doc)
 
             if not output.ok():
                 return []
@@ -408,7 +810,8 @@ class RegoEvaluator:
                 return []
 
             decisions = self._node_to_python(decisions_node)
-            logger.debug(f"Decisions from bundle '{bundle}': {decisions}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Decisions from bundle '{bundle}': {decisions}")
 
             if not decisions:
                 return []
@@ -420,22 +823,20 @@ class RegoEvaluator:
             raise
 
     def _evaluate_guidance_activations_bundle(
-        self, bundle: str, input_doc: Dict[str, Any]
+        self, bundle: str, input_doc: Dict[str, Any], interpreter: Interpreter
     ) -> List[str]:
         """Evaluate a specific bundle's guidance activation rules.
 
         Args:
             bundle: Bundle name (e.g., "universal", "python_uv")
             input_doc: Rego input document
+            interpreter: Interpreter to run the query on
 
         Returns:
             List of guidance check names (e.g., ["comment_ratio", "mid_code_import"])
         """
-        query = f"data.{bundle}.guidance_activations"
-
         try:
-            self.interpreter.set_input(input_doc)
-            output = self.interpreter.query(query)
+            output = self._query(interpreter, bundle, "guidance_activations", input_doc)
 
             if not output.ok():
                 return []
@@ -448,7 +849,10 @@ class RegoEvaluator:
                 return []
 
             activations = self._node_to_python(activations_node)
-            logger.debug(f"Guidance activations from bundle '{bundle}': {activations}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Guidance activations from bundle '{bundle}': {activations}"
+                )
 
             if not activations:
                 return []
@@ -626,28 +1030,49 @@ class RegoEvaluator:
         Returns:
             List of PolicyGuidance objects from all matching rules
         """
-        all_guidances = []
+        cache_key = self._command_cache_key("guidances", event, parsed, bundles)
+        if cache_key is not None:
+            cached = self.decision_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
 
-        input_doc = self._build_input_document(event, parsed)
-        self._enrich_input(input_doc, parsed)
+        guidances, failed = self._evaluate_guidances_tree(event, parsed, bundles)
 
-        for bundle in bundles:
-            try:
-                bundle_guidances = self._evaluate_guidances_bundle(bundle, input_doc)
-                all_guidances.extend(bundle_guidances)
-            except Exception as e:
-                logger.error(f"Error evaluating guidances for bundle '{bundle}': {e}")
+        if cache_key is not None and not failed:
+            self.decision_cache.put(cache_key, tuple(guidances))
+        return guidances
 
-        # Recursively evaluate chained and piped commands
-        for chained_cmd in parsed.chained:
-            chained_guidances = self.evaluate_guidances(event, chained_cmd, bundles)
-            all_guidances.extend(chained_guidances)
+    def _evaluate_guidances_tree(
+        self, event: ToolUseEvent, parsed: ParsedCommand, bundles: List[str]
+    ) -> Tuple[List[PolicyGuidance], bool]:
+        """Evaluate guidances for a command and all its chained/piped commands.
 
-        for piped_cmd in parsed.pipes:
-            piped_guidances = self.evaluate_guidances(event, piped_cmd, bundles)
-            all_guidances.extend(piped_guidances)
+        Returns:
+            (guidances, whether any bundle query failed)
+        """
+        all_guidances = []
+        failed = False
+
+        # Chained and piped commands, depth-first
+        segments = list(
+            self._iter_commands(parsed, include_process_substitutions=False)
+        )
+        input_docs = [self._segment_input_document(event, cmd) for cmd in segments]
+        results = self._run_bundle_queries(
+            self._evaluate_guidances_bundle, input_docs, bundles
+        )
+
+        for segment_results in results:
+            for bundle, bundle_guidances in zip(bundles, segment_results):
+                if isinstance(bundle_guidances, Exception):
+                    failed = True
+                    logger.error(
+                        f"Error evaluating guidances for bundle '{bundle}': {bundle_guidances}"
+                    )
+                else:
+                    all_guidances.extend(bundle_guidances)
 
-        return all_guidances
+        return all_guidances, failed
 
     def evaluate_file_edit_guidances(
         self, event: PostFileEditEvent, bundles: List[str]
@@ -663,35 +1088,35 @@ class RegoEvaluator:
         """
         all_guidances = []
         input_doc = self._build_file_edit_input_document(event)
+        results = self._run_bundle_queries(
+            self._evaluate_guidances_bundle, [input_doc], bundles
+        )
 
-        for bundle in bundles:
-            try:
-                bundle_guidances = self._evaluate_guidances_bundle(bundle, input_doc)
-                all_guidances.extend(bundle_guidances)
-            except Exception as e:
+        for bundle, bundle_guidances in zip(bundles, results[0]):
+            if isinstance(bundle_guidances, Exception):
                 logger.error(
-                    f"Error evaluating file edit guidances for bundle '{bundle}': {e}"
+                    f"Error evaluating file edit guidances for bundle '{bundle}': {bundle_guidances}"
                 )
+            else:
+                all_guidances.extend(bundle_guidances)
 
         return all_guidances
 
     def _evaluate_guidances_bundle(
-        self, bundle: str, input_doc: Dict[str, Any]
+        self, bundle: str, input_doc: Dict[str, Any], interpreter: Interpreter
     ) -> List[PolicyGuidance]:
         """Evaluate a specific bundle's guidances.
 
         Args:
             bundle: Bundle name (e.g., "universal", "demo_guidances")
             input_doc: Rego input document
+            interpreter: Interpreter to run the query on
 
         Returns:
             List of PolicyGuidance objects from this bundle
         """
-        query = f"data.{bundle}.guidances"
-
         try:
-            self.interpreter.set_input(input_doc)
-            output = self.interpreter.query(query)
+            output = self._query(interpreter, bundle, "guidances", input_doc)
 
             if not output.ok():
                 return []
@@ -704,7 +1129,8 @@ class RegoEvaluator:
                 return []
 
             guidances = self._node_to_python(guidances_node)
-            logger.debug(f"Guidances from bundle '{bundle}': {guidances}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Guidances from bundle '{bundle}': {guidances}")
 
             if not guidances:
                 return []
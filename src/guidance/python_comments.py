@@ -1,51 +1,80 @@
 """Python code comment quality guidance."""
 
 import re
+from typing import Optional
+
+from src.guidance.scanner import LineCheck, ScannedLine, run_checks
 from src.server.models import PostFileEditEvent, PolicyGuidance
 
+_KEYWORD_RE = re.compile(r"[a-z]+")
+_INDENTED_COMMENT_RE = re.compile(r"^\s+#")
+_COMMENTED_INDENTED_CODE_RE = re.compile(r"^#\s{2,}")
 
-def comment_ratio_guidance_rule(input_data: PostFileEditEvent):
+COMMENT_OVERLAP_GUIDANCE = (
+    "Ensure comments add value beyond describing what's obvious from the code. "
+    "This comment may be redundant with the code it describes. "
+    "Comments are fine when they add value beyond the code or separate segments of code."
+)
+
+
+class CommentRatioCheck(LineCheck):
     """
     Analyze comment-to-code ratio and provide guidance when comments exceed code.
 
     Calculates the ratio of comment lines to code lines (excluding empty lines).
-    Provides guidance when ratio exceeds 40%.
+    Provides guidance when ratio exceeds 40%. In analyzed Python files, lines
+    inside strings count as code even when they start with "#".
     """
-    if not input_data.structured_patch:
-        return
-
-    comment_count = 0
-    code_count = 0
-
-    for patch in input_data.structured_patch:
-        for patch_line in patch.lines:
-            stripped = patch_line.content.strip()
-
-            if not stripped:
-                continue
-
-            if stripped.startswith("#") and not stripped.startswith("#!"):
-                comment_count += 1
-            else:
-                code_count += 1
-
-    if code_count > 0:
-        ratio = comment_count / (code_count + comment_count)
-        if ratio > 0.4:
-            percentage = round(ratio * 100)
-            yield PolicyGuidance(
-                content=f"Comment-to-code ratio is {percentage}%. "
-                "Write self-explanatory code. Consider removing redundant comments."
-            )
+
+    uses_source = True
+
+    def __init__(self):
+        self.comment_count = 0
+        self.code_count = 0
+
+    def line(self, line: ScannedLine) -> Optional[PolicyGuidance]:
+        stripped = line.stripped
+        if not stripped:
+            return None
+        if line.info is not None:
+            is_comment = line.info.kind == "comment"
+        else:
+            is_comment = stripped.startswith("#")
+        if is_comment and not stripped.startswith("#!"):
+            self.comment_count += 1
+        else:
+            self.code_count += 1
+        return None
+
+    def finish(self) -> Optional[PolicyGuidance]:
+        if self.code_count > 0:
+            ratio = self.comment_count / (self.code_count + self.comment_count)
+            if ratio > 0.4:
+                percentage = round(ratio * 100)
+                return PolicyGuidance(
+                    content=f"Comment-to-code ratio is {percentage}%. "
+                    "Write self-explanatory code. Consider removing redundant comments."
+                )
+        return None
 
 
 def _extract_keywords(text: str) -> set:
     """Extract keywords from text, splitting on underscores and non-word chars."""
-    words = re.findall(r"[a-z]+", text.lower())
+    words = _KEYWORD_RE.findall(text.lower())
     return {w for w in words if len(w) > 2}
 
 
-def comment_overlap_guidance_rule(input_data: PostFileEditEvent):
+def _overlaps(comment: str, code: str) -> bool:
+    """Check whether >= 40% of the comment's keywords appear in the code."""
+    comment_keywords = _extract_keywords(comment)
+    code_keywords = _extract_keywords(code)
+    if not comment_keywords or not code_keywords:
+        return False
+    overlap = comment_keywords & code_keywords
+    return len(overlap) / len(comment_keywords) >= 0.4
+
+
+class CommentOverlapCheck(LineCheck):
     """
     Detect when comments redundantly describe what code already says.
 
@@ -53,63 +82,59 @@ def comment_overlap_guidance_rule(input_data: PostFileEditEvent):
     Checks both standalone comments and inline comments (code # comment).
     Provides guidance when >= 40% of comment words appear in the code.
     """
-    if not input_data.structured_patch:
-        return
-
-    for patch in input_data.structured_patch:
-        for i, patch_line in enumerate(patch.lines):
-            stripped = patch_line.content.strip()
-
-            # Check for inline comments (code # comment)
-            if "#" in stripped and not stripped.startswith("#"):
-                parts = stripped.split("#", 1)
-                code_part = parts[0].strip()
-                comment_part = parts[1].strip()
-
-                if not comment_part or comment_part.startswith("!"):
-                    continue
-
-                comment_keywords = _extract_keywords(comment_part)
-                code_keywords = _extract_keywords(code_part)
-
-                if comment_keywords and code_keywords:
-                    overlap = comment_keywords & code_keywords
-                    overlap_ratio = len(overlap) / len(comment_keywords)
-
-                    if overlap_ratio >= 0.4:
-                        yield PolicyGuidance(
-                            content="Ensure comments add value beyond describing what's obvious from the code. "
-                            "This comment may be redundant with the code it describes. "
-                            "Comments are fine when they add value beyond the code or separate segments of code."
-                        )
-                        return
-
-            # Check for standalone comments
-            if not stripped.startswith("#") or stripped.startswith("#!"):
-                continue
-
-            comment_keywords = _extract_keywords(stripped[1:])
-
-            if i + 1 < len(patch.lines):
-                next_line = patch.lines[i + 1].content.strip()
-
-                if next_line and not next_line.startswith("#"):
-                    code_keywords = _extract_keywords(next_line)
-
-                    if comment_keywords and code_keywords:
-                        overlap = comment_keywords & code_keywords
-                        overlap_ratio = len(overlap) / len(comment_keywords)
-
-                        if overlap_ratio >= 0.4:
-                            yield PolicyGuidance(
-                                content="Ensure comments add value beyond describing what's obvious from the code. "
-                                "This comment may be redundant with the code it describes. "
-                                "Comments are fine when they add value beyond the code or separate segments of code."
-                            )
-                            return
 
-
-def commented_code_guidance_rule(input_data: PostFileEditEvent):
+    uses_source = True
+
+    def line(self, line: ScannedLine) -> Optional[PolicyGuidance]:
+        stripped = line.stripped
+        if "#" not in stripped:
+            return None
+        if line.info is not None:
+            return self._analyzed_line(line)
+
+        # Check for inline comments (code # comment)
+        if not stripped.startswith("#"):
+            code_part, comment_part = stripped.split("#", 1)
+            comment_part = comment_part.strip()
+            if not comment_part or comment_part.startswith("!"):
+                return None
+            if _overlaps(comment_part, code_part.strip()):
+                return PolicyGuidance(content=COMMENT_OVERLAP_GUIDANCE)
+
+        # Check for standalone comments
+        if not stripped.startswith("#") or stripped.startswith("#!"):
+            return None
+
+        return self._standalone(line)
+
+    def _analyzed_line(self, line: ScannedLine) -> Optional[PolicyGuidance]:
+        """Check a line using its tokens; `#` inside strings is not a comment."""
+        comment = line.info.comment
+        if comment is None:
+            return None
+        if line.info.kind == "code" and line.stripped.endswith(comment):
+            comment_part = comment[1:].strip()
+            if not comment_part or comment_part.startswith("!"):
+                return None
+            code_part = line.stripped[: -len(comment)]
+            if _overlaps(comment_part, code_part.strip()):
+                return PolicyGuidance(content=COMMENT_OVERLAP_GUIDANCE)
+            return None
+        if line.info.kind != "comment" or comment.startswith("#!"):
+            return None
+        return self._standalone(line)
+
+    @staticmethod
+    def _standalone(line: ScannedLine) -> Optional[PolicyGuidance]:
+        """Compare a comment-only line with the line after it."""
+        next_line = line.next_stripped
+        if next_line and not next_line.startswith("#"):
+            if _overlaps(line.stripped[1:], next_line):
+                return PolicyGuidance(content=COMMENT_OVERLAP_GUIDANCE)
+        return None
+
+
+class CommentedCodeCheck(LineCheck):
     """
     Detect 2+ consecutive comments with excessive leading whitespace.
 
@@ -120,58 +145,75 @@ def commented_code_guidance_rule(input_data: PostFileEditEvent):
     1. Comments with leading whitespace before # (indented comments)
     2. Comments where the content after # has leading whitespace (commented-out indented code)
     """
-    if not input_data.structured_patch:
-        return
 
-    indented_comment_pattern = re.compile(r"^\s+#")
-    commented_indented_code_pattern = re.compile(r"^#\s{2,}")
+    uses_source = True
+
+    def __init__(self):
+        self.consecutive_commented_code = 0
+
+    def start_patch(self) -> None:
+        self.consecutive_commented_code = 0
+
+    def line(self, line: ScannedLine) -> Optional[PolicyGuidance]:
+        content = line.content
+        is_comment = (
+            line.info.kind == "comment"
+            if line.info is not None
+            else line.stripped.startswith("#")
+        )
+        is_commented_code = is_comment and (
+            _INDENTED_COMMENT_RE.match(content)
+            or _COMMENTED_INDENTED_CODE_RE.match(content)
+        )
+
+        if not is_commented_code:
+            self.consecutive_commented_code = 0
+            return None
+
+        self.consecutive_commented_code += 1
+        if self.consecutive_commented_code >= 2:
+            return PolicyGuidance(
+                content="If a large segment of code was commented out within a Git project, "
+                "it should be removed rather than maintained for historical purposes."
+            )
+        return None
 
-    for patch in input_data.structured_patch:
-        consecutive_commented_code = 0
 
-        for patch_line in patch.lines:
-            line_content = patch_line.content
+class LegacyCodeCheck(LineCheck):
+    """Provide guidance when modifying code that mentions legacy or backwards compatibility.
 
-            is_commented_code = indented_comment_pattern.match(
-                line_content
-            ) or commented_indented_code_pattern.match(line_content)
+    Detects keywords suggesting backwards compatibility concerns and prompts
+    for confirmation that these changes are intentional.
+    """
 
-            if is_commented_code:
-                consecutive_commented_code += 1
+    pattern = (
+        r"\blegacy\b|\bbackwards\s+compatibility\b"
+        r"|\bbackward\s+compatibility\b|\bdeprecated\b"
+    )
+    flags = re.IGNORECASE
 
-                if consecutive_commented_code >= 2:
-                    yield PolicyGuidance(
-                        content="If a large segment of code was commented out within a Git project, "
-                        "it should be removed rather than maintained for historical purposes."
-                    )
-                    return
-            else:
-                consecutive_commented_code = 0
+    def match(self, line: ScannedLine, found: re.Match) -> Optional[PolicyGuidance]:
+        return PolicyGuidance(
+            content="Detected a note on backwards compatibility, legacy, or deprecated code. "
+            "Are you sure about backwards compatibility as a requirement? If not explicitly requested, check with the user first."
+        )
 
 
-def legacy_code_guidance_rule(input_data: PostFileEditEvent):
-    """Provide guidance when modifying code that mentions legacy or backwards compatibility.
+def comment_ratio_guidance_rule(input_data: PostFileEditEvent):
+    """Guidance when comments make up more than 40% of the patch lines."""
+    yield from run_checks(input_data, CommentRatioCheck)
 
-    Detects keywords suggesting backwards compatibility concerns and prompts
-    for confirmation that these changes are intentional.
-    """
-    if not input_data.structured_patch:
-        return
-
-    legacy_patterns = [
-        r"\blegacy\b",
-        r"\bbackwards\s+compatibility\b",
-        r"\bbackward\s+compatibility\b",
-        r"\bdeprecated\b",
-    ]
-
-    for patch in input_data.structured_patch:
-        for patch_line in patch.lines:
-            line = patch_line.content.lower()
-            for pattern in legacy_patterns:
-                if re.search(pattern, line):
-                    yield PolicyGuidance(
-                        content="Detected a note on backwards compatibility, legacy, or deprecated code. "
-                        "Are you sure about backwards compatibility as a requirement? If not explicitly requested, check with the user first."
-                    )
-                    return
+
+def comment_overlap_guidance_rule(input_data: PostFileEditEvent):
+    """Guidance when a comment restates the code next to it."""
+    yield from run_checks(input_data, CommentOverlapCheck)
+
+
+def commented_code_guidance_rule(input_data: PostFileEditEvent):
+    """Guidance when two or more consecutive lines look like commented-out code."""
+    yield from run_checks(input_data, CommentedCodeCheck)
+
+
+def legacy_code_guidance_rule(input_data: PostFileEditEvent):
+    """Guidance when the patch mentions legacy or backwards-compatible code."""
+    yield from run_checks(input_data, LegacyCodeCheck)
@@ -1,10 +1,13 @@
 """Python import placement guidance."""
 
 import re
+from typing import Optional
+
+from src.guidance.scanner import LineCheck, ScannedLine, run_checks
 from src.server.models import PostFileEditEvent, PolicyGuidance
 
 
-def mid_code_import_guidance_rule(input_data: PostFileEditEvent):
+class MidCodeImportCheck(LineCheck):
     """
     Detect when import statements appear indented (mid-code).
 
@@ -17,30 +20,34 @@ def mid_code_import_guidance_rule(input_data: PostFileEditEvent):
     - from x import y
     - # import x (in comments)
 
+    Lines inside strings and docstrings are ignored when the edited file's
+    content is available.
+
     Not allowed:
     - def function():
           import x
     - class Foo:
         from x import y
     """
-    if not input_data.structured_patch:
-        return
-
-    import_pattern = re.compile(r"^\s+(import\s+\S+|from\s+\S+\s+import\s+)")
-
-    for patch in input_data.structured_patch:
-        for patch_line in patch.lines:
-            line_content = patch_line.content
-            stripped = line_content.strip()
-
-            if not stripped or stripped.startswith("#"):
-                continue
-
-            if import_pattern.match(line_content):
-                yield PolicyGuidance(
-                    content="Import statements should be at the top of the file, not nested inside "
-                    "functions, classes, or other blocks. Move imports to the module level "
-                    "unless there's a specific reason for lazy importing (e.g., avoiding "
-                    "circular dependencies or expensive imports)."
-                )
-                return
+
+    pattern = r"^\s+(import\s+\S+|from\s+\S+\s+import\s+)"
+    uses_source = True
+
+    def match(self, line: ScannedLine, found: re.Match) -> Optional[PolicyGuidance]:
+        info = line.info
+        if info is not None and (
+            info.kind != "code" or info.statement not in ("import", "from")
+        ):
+            # Inside a string or docstring, or not the start of a statement
+            return None
+        return PolicyGuidance(
+            content="Import statements should be at the top of the file, not nested inside "
+            "functions, classes, or other blocks. Move imports to the module level "
+            "unless there's a specific reason for lazy importing (e.g., avoiding "
+            "circular dependencies or expensive imports)."
+        )
+
+
+def mid_code_import_guidance_rule(input_data: PostFileEditEvent):
+    """Guidance when an import statement is indented inside a block."""
+    yield from run_checks(input_data, MidCodeImportCheck)
@@ -0,0 +1,382 @@
+"""Token-level analysis of Python files for guidance checks.
+
+Line checks only see patch lines, so a regex cannot tell a comment from a
+`#` inside a string, or an import statement from the word "import" in a
+docstring. This module tokenizes the whole file after the edit (from
+`PostFileEditEvent.content`) and records what each line is.
+
+Results are cached per file path together with the file's lines. When the
+next edit of the same file arrives, only the regions changed by its
+structured patch are re-tokenized: tokenizing restarts at the last line
+before a change that starts a new logical line, and stops at the first
+unchanged line after it where old and new token state agree again. The
+rest of the previous analysis is reused. Edit events without content are
+analyzed by applying their patch to the cached lines.
+
+Lines are tokenized with their indentation stripped. Guidance only needs
+per-line token kinds, and without indentation any line that starts a
+logical line is a valid place to restart the tokenizer.
+"""
+
+import hashlib
+import logging
+import tokenize
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from src.evaluation.cache import LRUCache
+from src.server.deadline import check_deadline
+from src.server.metrics import CollectorSample, counter, register_collector
+from src.server.models import PostFileEditEvent, StructuredPatch
+
+logger = logging.getLogger(__name__)
+
+# Files whose analysis is kept for incremental updates
+SOURCE_CACHE_SIZE = 128
+
+# Lines tokenized between deadline checks
+DEADLINE_INTERVAL = 1024
+
+_SKIPPED_TOKENS = frozenset(
+    (
+        tokenize.NL,
+        tokenize.NEWLINE,
+        tokenize.INDENT,
+        tokenize.DEDENT,
+        tokenize.ENDMARKER,
+    )
+)
+
+_OPENING = frozenset("([{")
+_CLOSING = frozenset(")]}")
+
+
+@dataclass(frozen=True)
+class LineInfo:
+    """What one line of a Python file contains.
+
+    Attributes:
+        kind: "code", "comment" (only a comment), "string" (starts inside a
+            multi-line string) or "blank"
+        indent: Width of the line's leading whitespace
+        statement: First name of the logical line starting here ("import",
+            "def", ...), "" for other logical line starts, None for lines
+            that continue a logical line
+        comment: Text of the comment on this line, including "#"
+        clean: Whether the line starts outside any string, bracket or
+            backslash continuation
+    """
+
+    kind: str
+    indent: int
+    statement: Optional[str]
+    comment: Optional[str]
+    clean: bool
+
+
+@dataclass(frozen=True)
+class SourceAnalysis:
+    """Per-line analysis of one version of a file.
+
+    Attributes:
+        digest: Content hash of the lines
+        lines: File lines without line endings
+        infos: One LineInfo per line, or None if the file does not tokenize
+    """
+
+    digest: bytes
+    lines: List[str]
+    infos: Optional[List[LineInfo]]
+
+
+# Latest analysis per file path
+source_cache = LRUCache(maxsize=SOURCE_CACHE_SIZE)
+
+SOURCE_ANALYSES = counter(
+    "policy_python_source_analyses_total",
+    "Python files tokenized for guidance, by mode (full or incremental)",
+)
+
+
+def _source_cache_metrics() -> List[CollectorSample]:
+    """Export Python source cache size and hit counts."""
+    stats = source_cache.stats()
+    return [
+        (
+            "policy_python_source_cache_hits_total",
+            "counter",
+            "Edits of a file whose previous analysis was cached",
+            stats["hits"],
+        ),
+        (
+            "policy_python_source_cache_misses_total",
+            "counter",
+            "Edits of a file with no cached analysis",
+            stats["misses"],
+        ),
+        (
+            "policy_python_source_cache_entries",
+            "gauge",
+            "Python file analyses currently cached",
+            stats["size"],
+        ),
+    ]
+
+
+register_collector(_source_cache_metrics)
+
+
+def split_lines(content: str) -> List[str]:
+    """Split file content into lines the way structured patches number them."""
+    lines = content.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def _digest(lines: Sequence[str]) -> bytes:
+    return hashlib.blake2b("\n".join(lines).encode("utf-8", "surrogatepass")).digest()
+
+
+def _tokenize(
+    lines: List[str],
+    start: int,
+    stop: Optional[Callable[[int, bool], bool]] = None,
+) -> Tuple[List[LineInfo], int]:
+    """Tokenize lines from a clean line start.
+
+    Args:
+        lines: All file lines
+        start: Index of a line that starts a logical line
+        stop: Called with (line index, clean) at each later line start;
+            returning True ends tokenizing before that line
+
+    Returns:
+        (LineInfo for each tokenized line, index of the first line not
+        tokenized)
+
+    Raises:
+        tokenize.TokenError, SyntaxError: If the lines do not tokenize
+    """
+    total = len(lines)
+    rows = iter(range(start, total))
+
+    def readline() -> str:
+        index = next(rows, None)
+        return "" if index is None else lines[index].lstrip(" \t\f") + "\n"
+
+    count = total - start
+    has_code = [False] * count
+    in_string = [False] * count
+    comments: List[Optional[str]] = [None] * count
+    statements: List[Optional[str]] = [None] * count
+    clean = [False] * count
+    at_logical_start = True
+    depth = 0
+    row = -1  # Last line (relative) whose first token has been seen
+
+    def advance(to_row: int) -> bool:
+        """Record line starts up to to_row; return True to stop."""
+        nonlocal row
+        while row < to_row:
+            row += 1
+            if row % DEADLINE_INTERVAL == 0:
+                check_deadline("guidance")
+            clean[row] = at_logical_start and not in_string[row]
+            if stop is not None and row > 0 and stop(start + row, clean[row]):
+                return True
+        return False
+
+    end = total
+    for token in tokenize.generate_tokens(readline):
+        token_row = token.start[0] - 1
+        if token.type == tokenize.ENDMARKER:
+            break
+        if advance(min(token_row, count - 1)):
+            end = start + row
+            break
+
+        last_row = min(token.end[0] - 1, count - 1)
+        for spanned in range(token_row + 1, last_row + 1):
+            in_string[spanned] = True
+
+        if token.type == tokenize.COMMENT:
+            comments[token_row] = token.string
+        elif token.type == tokenize.NEWLINE:
+            at_logical_start = True
+        elif token.type not in _SKIPPED_TOKENS:
+            if token.type == tokenize.OP and token.string in _OPENING:
+                depth += 1
+            elif token.type == tokenize.OP and token.string in _CLOSING:
+                depth -= 1
+                if depth < 0:
+                    # Newer tokenizers reject this; older ones lose track
+                    raise tokenize.TokenError("unmatched bracket", token.start)
+            has_code[token_row] = True
+            if at_logical_start:
+                statements[token_row] = (
+                    token.string if token.type == tokenize.NAME else ""
+                )
+                at_logical_start = False
+
+    if end == total and advance(count - 1):
+        end = start + row
+
+    infos = []
+    for offset in range(end - start):
+        line = lines[start + offset]
+        if in_string[offset]:
+            kind = "string"
+        elif has_code[offset]:
+            kind = "code"
+        elif comments[offset] is not None:
+            kind = "comment"
+        else:
+            kind = "blank"
+        infos.append(
+            LineInfo(
+                kind=kind,
+                indent=len(line) - len(line.lstrip(" \t\f")),
+                statement=statements[offset],
+                comment=comments[offset],
+                clean=clean[offset],
+            )
+        )
+    return infos, end
+
+
+def _map_patches(
+    old_lines: List[str], patches: Sequence[StructuredPatch]
+) -> Optional[Tuple[List[str], List[Optional[int]]]]:
+    """Apply structured patches to the previous lines.
+
+    Returns:
+        (new lines, old line index of each new line or None for added
+        lines), or None if the patches do not apply to old_lines
+    """
+    new_lines: List[str] = []
+    old_of_new: List[Optional[int]] = []
+    old = 0
+    for patch in sorted(patches, key=lambda p: p.oldStart):
+        # A hunk that removes nothing from an empty range starts after oldStart
+        hunk_start = patch.oldStart if patch.oldLines == 0 else patch.oldStart - 1
+        if hunk_start < old or hunk_start > len(old_lines):
+            return None
+        new_lines.extend(old_lines[old:hunk_start])
+        old_of_new.extend(range(old, hunk_start))
+        old = hunk_start
+        for operation, content in patch.lines.pairs():
+            if operation == "added":
+                new_lines.append(content)
+                old_of_new.append(None)
+                continue
+            if old >= len(old_lines) or old_lines[old] != content:
+                return None
+            if operation == "unchanged":
+                new_lines.append(content)
+                old_of_new.append(old)
+            old += 1
+    new_lines.extend(old_lines[old:])
+    old_of_new.extend(range(old, len(old_lines)))
+    return new_lines, old_of_new
+
+
+def _update(
+    previous: List[LineInfo], lines: List[str], old_of_new: List[Optional[int]]
+) -> List[LineInfo]:
+    """Re-tokenize only the changed regions of a file."""
+    infos: List[LineInfo] = []
+    index = 0
+    synced = -1
+    while index < len(lines):
+        old = old_of_new[index]
+        # An unchanged line keeps its analysis if it follows the same line
+        # as before (nothing was removed in between) or the token state was
+        # just found to agree
+        if old is not None and (
+            index == synced or (old_of_new[index - 1] == old - 1 if index else old == 0)
+        ):
+            infos.append(previous[old])
+            index += 1
+            continue
+
+        # Line `index` may continue the line before it; restart at the last
+        # line known to start a logical line
+        restart = max(index - 1, 0)
+        while restart > 0 and not infos[restart].clean:
+            restart -= 1
+        del infos[restart:]
+
+        changed = index
+
+        def in_sync(line: int, clean: bool) -> bool:
+            old = old_of_new[line]
+            return line > changed and clean and old is not None and previous[old].clean
+
+        tokenized, index = _tokenize(lines, restart, in_sync)
+        infos.extend(tokenized)
+        synced = index
+    return infos
+
+
+def _analyze_lines(
+    lines: List[str],
+    digest: bytes,
+    previous: Optional[SourceAnalysis],
+    old_of_new: Optional[List[Optional[int]]],
+) -> SourceAnalysis:
+    """Tokenize a file, incrementally when the previous version is known."""
+    try:
+        if (
+            previous is not None
+            and previous.infos is not None
+            and old_of_new is not None
+        ):
+            SOURCE_ANALYSES.inc(mode="incremental")
+            infos = _update(previous.infos, lines, old_of_new)
+        else:
+            SOURCE_ANALYSES.inc(mode="full")
+            infos, _ = _tokenize(lines, 0)
+    except (tokenize.TokenError, SyntaxError) as e:
+        logger.debug(f"Python source does not tokenize, using line checks: {e}")
+        infos = None
+    return SourceAnalysis(digest=digest, lines=lines, infos=infos)
+
+
+def analyze_event(event: PostFileEditEvent) -> Optional[SourceAnalysis]:
+    """Analyze the Python file an edit event leaves behind.
+
+    Args:
+        event: File edit event; uses file_path, content and structured_patch
+
+    Returns:
+        SourceAnalysis of the file after the edit, or None when the file is
+        not Python or its content is unknown
+    """
+    path = event.file_path
+    if not path or not path.endswith(".py"):
+        return None
+
+    previous = source_cache.get(path)
+    mapped = None
+    if previous is not None and event.structured_patch:
+        mapped = _map_patches(previous.lines, event.structured_patch)
+
+    if event.content is not None:
+        lines = split_lines(event.content)
+        if mapped is not None and mapped[0] != lines:
+            mapped = None
+    elif mapped is not None:
+        lines = mapped[0]
+    else:
+        return None
+
+    digest = _digest(lines)
+    if previous is not None and previous.digest == digest:
+        return previous
+
+    analysis = _analyze_lines(
+        lines, digest, previous, mapped[1] if mapped is not None else None
+    )
+    source_cache.put(path, analysis)
+    return analysis
@@ -0,0 +1,214 @@
+"""Single-pass guidance scanner for structured patches.
+
+Line-based guidance checks are written as LineCheck subclasses. A scanner
+compiled for a set of checks walks every patch line once, strips each line
+once, and feeds it to every check that has not produced its guidance yet.
+
+Checks that look for a pattern declare it in `pattern`; the scanner joins
+all of them into one alternation, so a line none of them can match costs a
+single regex search no matter how many pattern checks are active. Lines
+that hit the combined pattern are confirmed against each check's own
+precompiled pattern.
+
+compile_scanner() caches compiled scanners by check set, so the patterns are
+compiled once per combination of activated checks.
+
+Checks that set `uses_source` also get each line's token analysis from the
+edited Python file (python_source.analyze_event), so they can tell comments
+and statements from text inside strings.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, Pattern, Sequence, Tuple, Type
+
+from src.guidance.python_source import LineInfo, SourceAnalysis, analyze_event
+from src.server.deadline import check_deadline
+from src.server.models import PolicyGuidance, PostFileEditEvent
+
+# Lines scanned between deadline checks
+DEADLINE_INTERVAL = 1024
+
+
+class ScannedLine(NamedTuple):
+    """A patch line as seen by the checks.
+
+    Attributes:
+        operation: "added", "removed" or "unchanged"
+        content: Line content
+        stripped: Content without surrounding whitespace
+        next_stripped: Stripped content of the next line in the same patch,
+            or None for the last line
+        info: Token analysis of the line in the edited Python file; None
+            for removed lines, other files or when the file is unknown
+    """
+
+    operation: str
+    content: str
+    stripped: str
+    next_stripped: Optional[str]
+    info: Optional[LineInfo] = None
+
+
+class LineCheck:
+    """A guidance check that runs inside the shared line scan.
+
+    A fresh instance is created for each scan, so checks can keep state in
+    attributes. Each check produces at most one guidance; once it does, the
+    scanner stops feeding it.
+
+    Attributes:
+        pattern: Regex (searched, not matched) whose hits are passed to
+            match(); None for checks that only use line()
+        flags: Flags for `pattern`
+        added_only: Only pass added lines to match()
+        uses_source: Needs ScannedLine.info; the scanner then analyzes the
+            edited file (see python_source)
+    """
+
+    pattern: Optional[str] = None
+    flags: int = 0
+    added_only: bool = False
+    uses_source: bool = False
+
+    def start_patch(self) -> None:
+        """Called before the first line of each patch."""
+
+    def line(self, line: ScannedLine) -> Optional[PolicyGuidance]:
+        """Called for every line; return guidance to finish the check."""
+        return None
+
+    def match(self, line: ScannedLine, found: re.Match) -> Optional[PolicyGuidance]:
+        """Called for lines matching `pattern`; return guidance to finish."""
+        return None
+
+    def finish(self) -> Optional[PolicyGuidance]:
+        """Called after the last line if the check has not finished yet."""
+        return None
+
+
+class GuidanceScanner:
+    """Runs a fixed set of LineChecks over structured patches in one pass."""
+
+    def __init__(self, checks: Sequence[Type[LineCheck]]):
+        self.checks = tuple(checks)
+        self._patterns: List[Optional[Pattern]] = [
+            re.compile(check.pattern, check.flags) if check.pattern else None
+            for check in self.checks
+        ]
+        alternatives = [
+            (
+                f"(?:{check.pattern})"
+                if not check.flags
+                else f"(?{_inline_flags(check.flags)}:{check.pattern})"
+            )
+            for check in self.checks
+            if check.pattern
+        ]
+        self._combined: Optional[Pattern] = (
+            re.compile("|".join(alternatives)) if alternatives else None
+        )
+        self.uses_source = any(check.uses_source for check in self.checks)
+
+    def scan(self, event: PostFileEditEvent) -> Iterator[PolicyGuidance]:
+        """Run every check over the event's structured patch.
+
+        Yields:
+            Guidance from each check that fired, in check order
+        """
+        if not event.structured_patch:
+            return
+
+        analysis = analyze_event(event) if self.uses_source else None
+        if analysis is not None and analysis.infos is None:
+            analysis = None
+
+        checks = [check() for check in self.checks]
+        results: List[Optional[PolicyGuidance]] = [None] * len(checks)
+        active = list(range(len(checks)))
+        patterns = self._patterns
+        combined = self._combined
+        scanned = 0
+
+        for patch in event.structured_patch:
+            if not active:
+                break
+            for index in active:
+                checks[index].start_patch()
+
+            new_index = patch.newStart - 1
+            upcoming = patch.lines.pairs()
+            current = next(upcoming, None)
+            next_stripped = current[1].strip() if current is not None else None
+            while current is not None:
+                following = next(upcoming, None)
+                operation, content = current
+                stripped = next_stripped
+                next_stripped = following[1].strip() if following is not None else None
+                current = following
+                info = None
+                if operation != "removed":
+                    if analysis is not None:
+                        info = _line_info(analysis, new_index, content)
+                    new_index += 1
+                line = ScannedLine(operation, content, stripped, next_stripped, info)
+                hit = combined is not None and combined.search(line.content)
+
+                finished = []
+                for index in active:
+                    check = checks[index]
+                    result = check.line(line)
+                    if result is None and hit and patterns[index] is not None:
+                        if not check.added_only or line.operation == "added":
+                            found = patterns[index].search(line.content)
+                            if found:
+                                result = check.match(line, found)
+                    if result is not None:
+                        results[index] = result
+                        finished.append(index)
+                if finished:
+                    active = [index for index in active if index not in finished]
+                    if not active:
+                        break
+
+                scanned += 1
+                if scanned % DEADLINE_INTERVAL == 0:
+                    check_deadline("guidance")
+
+        for index in active:
+            results[index] = checks[index].finish()
+
+        for result in results:
+            if result is not None:
+                yield result
+
+
+def _line_info(
+    analysis: SourceAnalysis, index: int, content: str
+) -> Optional[LineInfo]:
+    """Look up a patch line in the analyzed file, if it is where the patch says."""
+    if 0 <= index < len(analysis.lines) and analysis.lines[index] == content:
+        return analysis.infos[index]
+    return None
+
+
+def _inline_flags(flags: int) -> str:
+    """Convert re flags to inline flag letters for a scoped group."""
+    letters = ""
+    for flag, letter in ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s")):
+        if flags & flag:
+            letters += letter
+    return letters
+
+
+@lru_cache(maxsize=64)
+def compile_scanner(checks: Tuple[Type[LineCheck], ...]) -> GuidanceScanner:
+    """Return the (cached) scanner for a combination of checks."""
+    return GuidanceScanner(checks)
+
+
+def run_checks(
+    event: PostFileEditEvent, *checks: Type[LineCheck]
+) -> Iterator[PolicyGuidance]:
+    """Run line checks over an event's structured patch in one pass."""
+    yield from compile_scanner(checks).scan(event)
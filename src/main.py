@@ -5,8 +5,9 @@ Run the AI Agent Policy Server with all policy handlers registered.
 Sets up policy enforcement handlers and starts the FastAPI server.
 """
 
-import uvicorn
-
+from src.server.config import config
+from src.server.listeners import serve_single
+from src.server.prefork import serve_prefork
 from src.server.server import app, get_registry
 from src.server.models import ToolUseEvent, PostFileEditEvent
 
@@ -31,9 +32,12 @@ def main():
     setup_all_policies()
 
     print("Server ready with policy enforcement active!")
-    print("Starting server on http://localhost:8338")
 
-    uvicorn.run(app, host="0.0.0.0", port=8338, log_level="info")
+    if config.workers > 1:
+        # Policies are already compiled; workers share them copy-on-write
+        serve_prefork(app, config)
+    else:
+        serve_single(app, config)
 
 
 if __name__ == "__main__":
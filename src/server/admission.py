@@ -0,0 +1,243 @@
+"""
+Admission control for policy evaluation.
+
+Routes evaluate events through evaluate() instead of calling
+execute_handlers_generic() directly. Requests from a session over its rate
+limit (see ratelimit.py) are not evaluated. When admission control is
+enabled, at most `max_concurrent` evaluations run at once (in worker
+threads), and up to `max_queue` more wait for a slot for at most
+`queue_timeout` seconds. Anything beyond that is shed.
+
+Rate-limited and shed requests get an Evaluation with no results and a
+`degraded` reason; the route answers with its default response, marked with
+the degraded header (see responses.render_response).
+
+Hooks with a latency budget are evaluated under a deadline (see deadline.py)
+that starts when evaluate() is called, so time spent queued counts against
+it. If the deadline passes, the route answers with its default response plus
+guidance saying that evaluation timed out, marked `timeout`.
+
+With admission control disabled (the default), evaluate() runs the pipeline
+inline on the event loop, as before.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Union
+
+from starlette.concurrency import run_in_threadpool
+
+from . import ratelimit
+from .config import ServerConfig
+from .deadline import Deadline, DeadlineExceeded, deadline_scope
+from .executor import execute_handlers_generic
+from .metrics import counter, gauge, histogram
+from .models import BaseEvent, PolicyDecision, PolicyGuidance
+from .ratelimit import ANY_HOOK
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = gauge(
+    "policy_admission_queue_depth", "Evaluations waiting for an admission slot"
+)
+IN_FLIGHT = gauge("policy_admission_in_flight", "Evaluations currently running")
+WAIT_SECONDS = histogram(
+    "policy_admission_wait_seconds",
+    "Time evaluations waited for an admission slot",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+SHED = counter(
+    "policy_admission_shed_total",
+    "Evaluations shed and answered with the default response",
+)
+DEADLINE_EXCEEDED = counter(
+    "policy_deadline_exceeded_total",
+    "Evaluations stopped by their hook's deadline, by stage",
+)
+
+
+@dataclass
+class Evaluation:
+    """Outcome of evaluating one event.
+
+    Attributes:
+        results: Policy results (empty when not evaluated)
+        degraded: Why the event was not (fully) evaluated ("overloaded",
+            "rate_limited" or "timeout"), or None
+    """
+
+    results: List[Union[PolicyDecision, PolicyGuidance]] = field(default_factory=list)
+    degraded: Optional[str] = None
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, time-limited wait queue."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        """
+        Args:
+            max_concurrent: Evaluations allowed to run at once
+            max_queue: Evaluations allowed to wait for a slot
+            queue_timeout: Seconds an evaluation may wait before it is shed
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def evaluate(
+        self, input_data, deadline: Optional[Deadline] = None
+    ) -> Optional[List[Union[PolicyDecision, PolicyGuidance]]]:
+        """
+        Run the policy pipeline once a slot is free.
+
+        Args:
+            input_data: Generic event to evaluate
+            deadline: Request deadline; also bounds the wait for a slot
+
+        Returns:
+            Policy results, or None if the evaluation was shed
+
+        Raises:
+            DeadlineExceeded: If the deadline passes during evaluation
+        """
+        timeout = self.queue_timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline.remaining())
+        if not await self._acquire(timeout):
+            return None
+        try:
+            return await run_in_threadpool(_execute, input_data, deadline)
+        finally:
+            self._release()
+
+    async def _acquire(self, timeout: float) -> bool:
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self._admit()
+            WAIT_SECONDS.observe(0.0)
+            return True
+
+        if len(self._waiters) >= self.max_queue:
+            self._shed("queue_full")
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        QUEUE_DEPTH.set(len(self._waiters))
+        started = time.perf_counter()
+        try:
+            # A released slot is handed over by resolving the future
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._waiters.remove(waiter)
+                QUEUE_DEPTH.set(len(self._waiters))
+                self._shed("timeout")
+                return False
+            # The slot was handed over as the timeout fired; keep it
+        except asyncio.CancelledError:
+            if waiter.done():
+                self._release()
+            else:
+                self._waiters.remove(waiter)
+                QUEUE_DEPTH.set(len(self._waiters))
+            raise
+        WAIT_SECONDS.observe(time.perf_counter() - started)
+        return True
+
+    def _admit(self) -> None:
+        self.in_flight += 1
+        IN_FLIGHT.set(self.in_flight)
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        IN_FLIGHT.set(self.in_flight)
+        if self._waiters and self.in_flight < self.max_concurrent:
+            waiter = self._waiters.popleft()
+            QUEUE_DEPTH.set(len(self._waiters))
+            self._admit()
+            waiter.set_result(None)
+
+    def _shed(self, reason: str) -> None:
+        SHED.inc(reason=reason)
+        logger.warning(
+            f"Shedding policy evaluation ({reason})",
+            extra={
+                "reason": reason,
+                "in_flight": self.in_flight,
+                "queued": len(self._waiters),
+            },
+        )
+
+
+def _execute(input_data, deadline: Optional[Deadline]):
+    """Run the pipeline with the request's deadline as the current deadline."""
+    with deadline_scope(deadline):
+        return execute_handlers_generic(input_data)
+
+
+_controller: Optional[AdmissionController] = None
+_deadlines_ms: Dict[str, float] = {}
+
+
+def configure_admission(config: ServerConfig) -> None:
+    """Set hook deadlines and enable admission control if a limit is configured."""
+    global _controller
+    _deadlines_ms.clear()
+    _deadlines_ms.update(config.hook_deadlines_ms)
+    if config.max_concurrent_evaluations <= 0:
+        _controller = None
+        return
+    _controller = AdmissionController(
+        config.max_concurrent_evaluations,
+        config.admission_queue_size,
+        config.admission_queue_timeout_ms / 1000,
+    )
+
+
+async def evaluate(input_data, hook: str) -> Evaluation:
+    """
+    Evaluate an event under rate limits and admission control.
+
+    Args:
+        input_data: Generic event to evaluate
+        hook: Hook name, used to look up rate limits and deadlines
+            (e.g. "PreToolUse")
+
+    Returns:
+        Evaluation with the policy results, or a degraded reason if the event
+        was not (fully) evaluated
+    """
+    if isinstance(input_data, BaseEvent) and not ratelimit.rate_limiter.allow(
+        input_data.session_id, hook
+    ):
+        return Evaluation(degraded="rate_limited")
+
+    budget_ms = _deadlines_ms.get(hook, _deadlines_ms.get(ANY_HOOK))
+    deadline = Deadline.after(budget_ms / 1000) if budget_ms else None
+
+    try:
+        if _controller is None:
+            return Evaluation(_execute(input_data, deadline))
+        results = await _controller.evaluate(input_data, deadline)
+    except DeadlineExceeded as e:
+        DEADLINE_EXCEEDED.inc(hook=hook, stage=e.stage)
+        logger.warning(
+            f"{hook} evaluation exceeded its {budget_ms:g} ms deadline at {e.stage}",
+            extra={"hook": hook, "stage": e.stage, "deadline_ms": budget_ms},
+        )
+        guidance = PolicyGuidance(
+            content=(
+                f"Policy evaluation timed out after {budget_ms:g} ms; "
+                "the default decision was applied."
+            )
+        )
+        return Evaluation([guidance], degraded="timeout")
+
+    if results is None:
+        return Evaluation(degraded="overloaded")
+    return Evaluation(results)
@@ -0,0 +1,335 @@
+"""
+Append-only audit log of policy decisions.
+
+Every evaluated hook event is recorded as one JSON line holding the
+original request (replayable against the matching route), the mapped event
+type, the decisions and guidances returned, and the evaluation time.
+
+Recording only appends a reference to a bounded in-memory queue; a
+background writer thread serializes and writes records in batches. When the
+queue is full, records are dropped rather than blocking requests, and the
+number dropped is written to the log as a `dropped` record.
+
+Files rotate by size and/or age, and rotated files can be gzip-compressed.
+"""
+
+import atexit
+import dataclasses
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, TextIO
+
+from pydantic import BaseModel
+
+from .config import ServerConfig
+from .metrics import CollectorSample, register_collector
+from .models import BaseEvent, PolicyDecision, PolicyGuidance
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class _PendingRecord:
+    """Audit entry captured on the request path, serialized by the writer."""
+
+    timestamp: float
+    event: BaseEvent
+    results: List[Any]
+    duration: float
+
+
+def _to_json(value: Any) -> Any:
+    """Convert request and result objects into JSON-compatible data."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            field.name: _to_json(getattr(value, field.name))
+            for field in dataclasses.fields(value)
+        }
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    return value
+
+
+def _serialize(record: _PendingRecord) -> Dict[str, Any]:
+    """Build the JSON line for one audit record."""
+    event = record.event
+    return {
+        "type": "decision",
+        "time": datetime.fromtimestamp(record.timestamp, timezone.utc).isoformat(),
+        "source_client": event.source_client,
+        "session_id": event.session_id,
+        "event_type": type(event).__name__,
+        "request": {
+            "bundles": event.enabled_bundles,
+            "event": _to_json(event.source_event),
+        },
+        "decisions": [
+            _to_json(result)
+            for result in record.results
+            if isinstance(result, PolicyDecision)
+        ],
+        "guidances": [
+            _to_json(result)
+            for result in record.results
+            if isinstance(result, PolicyGuidance)
+        ],
+        "timings": {"evaluation_ms": round(record.duration * 1000, 3)},
+    }
+
+
+class AuditSink:
+    """Buffered JSONL audit writer with rotation.
+
+    Attributes:
+        path: Audit log file path
+        written: Number of records written
+        dropped: Number of records dropped because the buffer was full
+    """
+
+    def __init__(
+        self,
+        path: str,
+        buffer_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_bytes: int = 100 * 1024 * 1024,
+        rotate_seconds: float = 0,
+        compress: bool = False,
+    ):
+        """Create a sink; the writer thread starts with the first record.
+
+        Args:
+            path: Audit log file path
+            buffer_size: Maximum records waiting to be written
+            batch_size: Maximum records written per batch
+            flush_interval: Seconds between flushes when records trickle in
+            max_bytes: Rotate when the file reaches this size (0 = never)
+            rotate_seconds: Rotate when the file is this old (0 = never)
+            compress: Gzip rotated files
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+
+        self.written = 0
+        self.dropped = 0
+        self._reported_dropped = 0
+
+        self._queue: "queue.Queue[Optional[_PendingRecord]]" = queue.Queue(
+            maxsize=buffer_size
+        )
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._file: Optional[TextIO] = None
+        self._opened_at = 0.0
+
+    def record(self, event: BaseEvent, results: List[Any], duration: float) -> bool:
+        """
+        Queue an evaluated event for writing without blocking.
+
+        Args:
+            event: The evaluated event
+            results: Decisions and guidances returned for it
+            duration: Evaluation time in seconds
+
+        Returns:
+            False if the record was dropped because the buffer is full
+        """
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(
+                _PendingRecord(time.time(), event, list(results), duration)
+            )
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        """Return queued, written and dropped record counts."""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write all queued records and stop the writer."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            if os.getpid() != self._pid:
+                # Forked worker: keep a file per process so appends never interleave
+                self.path = f"{self.path}.{os.getpid()}"
+                self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="audit-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[_PendingRecord] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+                stopping = item is None
+            except queue.Empty:
+                pass
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Failed to write audit records: {e}")
+
+        self._close_file()
+
+    def _write_batch(self, batch: List[_PendingRecord]) -> None:
+        with self._lock:
+            dropped = self.dropped - self._reported_dropped
+            self._reported_dropped = self.dropped
+
+        if not batch and not dropped:
+            return
+
+        lines = [json.dumps(_serialize(record), default=str) for record in batch]
+        if dropped:
+            logger.warning(f"Audit buffer full, dropped {dropped} records")
+            lines.append(
+                json.dumps(
+                    {
+                        "type": "dropped",
+                        "time": datetime.now(timezone.utc).isoformat(),
+                        "count": dropped,
+                    }
+                )
+            )
+
+        audit_file = self._open_file()
+        audit_file.write("\n".join(lines) + "\n")
+        audit_file.flush()
+        self.written += len(batch)
+
+    def _open_file(self) -> TextIO:
+        if self._file is not None and self._should_rotate():
+            self._rotate()
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._opened_at = time.time()
+        return self._file
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            return True
+        if self.rotate_seconds and time.time() - self._opened_at >= self.rotate_seconds:
+            return True
+        return False
+
+    def _rotate(self) -> None:
+        self._close_file()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        rotated = f"{self.path}.{stamp}"
+        os.replace(self.path, rotated)
+        if self.compress:
+            with (
+                open(rotated, "rb") as source,
+                gzip.open(rotated + ".gz", "wb") as target,
+            ):
+                shutil.copyfileobj(source, target)
+            os.remove(rotated)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+audit_sink: Optional[AuditSink] = None
+
+
+def configure_audit(config: ServerConfig) -> None:
+    """Create the global audit sink if an audit path is configured."""
+    global audit_sink
+    if not config.audit_path:
+        audit_sink = None
+        return
+    audit_sink = AuditSink(
+        config.audit_path,
+        buffer_size=config.audit_buffer_size,
+        max_bytes=config.audit_max_bytes,
+        rotate_seconds=config.audit_rotate_seconds,
+        compress=config.audit_compress,
+    )
+    logger.info(f"Writing decision audit log to {config.audit_path}")
+
+
+def _close_audit() -> None:
+    """Write queued audit records at interpreter exit."""
+    if audit_sink is not None:
+        audit_sink.close()
+
+
+atexit.register(_close_audit)
+
+
+def _audit_metrics() -> List[CollectorSample]:
+    """Export the global sink's record counts."""
+    if audit_sink is None:
+        return []
+    stats = audit_sink.stats()
+    return [
+        (
+            "policy_audit_records_written_total",
+            "counter",
+            "Audit records written",
+            stats["written"],
+        ),
+        (
+            "policy_audit_records_dropped_total",
+            "counter",
+            "Audit records dropped because the buffer was full",
+            stats["dropped"],
+        ),
+        (
+            "policy_audit_queue_depth",
+            "gauge",
+            "Audit records waiting to be written",
+            stats["queued"],
+        ),
+    ]
+
+
+register_collector(_audit_metrics)
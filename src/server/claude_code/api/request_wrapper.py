@@ -1,12 +1,18 @@
 """Generic request wrapper for bundle-aware hook processing."""
 
-from typing import Any, Dict, List
+from typing import Generic, List, TypeVar
 
 from pydantic import BaseModel
 
+InputT = TypeVar("InputT", bound=BaseModel)
 
-class RequestWrapper(BaseModel):
-    """Wrapper for hook requests that includes bundle filtering."""
+
+class HookRequest(BaseModel, Generic[InputT]):
+    """Wrapper for hook requests with the event decoded as its typed hook input.
+
+    Validating this model from raw JSON decodes the request body straight into
+    the hook-specific model in a single pass, with no intermediate dict.
+    """
 
     bundles: List[str]
-    event: Dict[str, Any]
+    event: InputT
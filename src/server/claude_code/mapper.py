@@ -2,10 +2,10 @@
 Mappers to convert Claude Code hook inputs/outputs to/from generic models.
 """
 
-from typing import List, Literal, TypeVar, Union
+from typing import List, TypeVar, Union
 
 from ..enums import SourceClient
-from .api.request_wrapper import RequestWrapper
+from .api.request_wrapper import HookRequest
 from ..mapper_utils import (
     separate_results,
     find_highest_priority_decision,
@@ -13,7 +13,7 @@ from ..mapper_utils import (
 from ..models import (
     FileEditEvent,
     HookEvent,
-    PatchLine,
+    PatchLines,
     PolicyAction,
     PolicyDecision,
     PolicyGuidance,
@@ -52,37 +52,18 @@ from .api.pre_tool_use import (
 # ============================================================================
 
 
-def _parse_patch_lines(raw_lines: List[str]) -> List[PatchLine]:
+def _parse_patch_lines(raw_lines: List[str]) -> PatchLines:
     """
-    Parse raw patch lines (with +/- prefixes) into PatchLine objects.
+    Parse raw patch lines (with +/- prefixes) into a compact PatchLines sequence.
 
     Args:
         raw_lines: List of diff lines (e.g., ["+# comment", " code", "-old_code"])
 
     Returns:
-        List of PatchLine objects with operation and content separated
+        PatchLines with operation and content separated; the raw lines are
+        kept as-is and content is sliced off its prefix only when read
     """
-    parsed_lines = []
-    for line in raw_lines:
-        if not line:
-            parsed_lines.append(PatchLine(operation="unchanged", content=""))
-            continue
-
-        # Check first character for operation type
-        operation: Literal["added", "removed", "unchanged"]
-        if line[0] == "+":
-            operation = "added"
-            content = line[1:]
-        elif line[0] == "-":
-            operation = "removed"
-            content = line[1:]
-        else:  # space or anything else
-            operation = "unchanged"
-            content = line[1:] if len(line) > 0 and line[0] == " " else line
-
-        parsed_lines.append(PatchLine(operation=operation, content=content))
-
-    return parsed_lines
+    return PatchLines.from_diff(raw_lines)
 
 
 # ============================================================================
@@ -91,7 +72,7 @@ def _parse_patch_lines(raw_lines: List[str]) -> List[PatchLine]:
 
 
 def map_pre_tool_use_input(
-    wrapper: RequestWrapper, input_data: PreToolUseInput
+    wrapper: HookRequest, input_data: PreToolUseInput
 ) -> Union[ToolUseEvent, FileEditEvent]:
     """Map PreToolUse to appropriate event type"""
     tool_name_str = (
@@ -128,7 +109,12 @@ def map_pre_tool_use_input(
         if isinstance(tool_input, dict) and "command" in tool_input:
             command = tool_input["command"]
     else:
-        parameters = input_data.model_dump(exclude={"session_id", "tool_name"})
+        # Shallow field iteration; the decoded values are already plain data
+        parameters = {
+            name: value
+            for name, value in input_data
+            if name not in ("session_id", "tool_name")
+        }
 
     return ToolUseEvent(
         session_id=input_data.session_id,
@@ -145,7 +131,7 @@ def map_pre_tool_use_input(
 
 
 def map_post_tool_use_input(
-    wrapper: RequestWrapper, input_data: PostToolUseInput
+    wrapper: HookRequest, input_data: PostToolUseInput
 ) -> Union[PostFileEditEvent, PostToolUseEvent]:
     """Map PostToolUse to appropriate post-event type"""
     tool_name_str = (
@@ -176,7 +162,7 @@ def map_post_tool_use_input(
         if raw_patches:
             structured_patch = []
             for patch in raw_patches:
-                # Parse the raw lines into PatchLine objects
+                # Parse the raw lines into a compact PatchLines sequence
                 raw_lines = patch.get("lines", [])
                 parsed_lines = _parse_patch_lines(raw_lines)
 
@@ -212,7 +198,12 @@ def map_post_tool_use_input(
     if tool_is_bash and hasattr(input_data, "command"):
         command = input_data.command
     else:
-        parameters = input_data.model_dump(exclude={"session_id", "tool_name"})
+        # Shallow field iteration; the decoded values are already plain data
+        parameters = {
+            name: value
+            for name, value in input_data
+            if name not in ("session_id", "tool_name")
+        }
 
     return PostToolUseEvent(
         session_id=input_data.session_id,
@@ -229,7 +220,7 @@ def map_post_tool_use_input(
 
 
 def map_user_prompt_submit_input(
-    wrapper: RequestWrapper, input_data: UserPromptSubmitInput
+    wrapper: HookRequest, input_data: UserPromptSubmitInput
 ) -> PromptSubmitEvent:
     """Map UserPromptSubmit to PromptSubmitEvent"""
     return PromptSubmitEvent(
@@ -242,7 +233,7 @@ def map_user_prompt_submit_input(
     )
 
 
-def map_stop_input(wrapper: RequestWrapper, input_data: StopInput) -> StopEvent:
+def map_stop_input(wrapper: HookRequest, input_data: StopInput) -> StopEvent:
     """Map Stop to StopEvent"""
     return StopEvent(
         session_id=input_data.session_id,
@@ -255,7 +246,7 @@ def map_stop_input(wrapper: RequestWrapper, input_data: StopInput) -> StopEvent:
 
 
 def map_subagent_stop_input(
-    wrapper: RequestWrapper, input_data: SubagentStopInput
+    wrapper: HookRequest, input_data: SubagentStopInput
 ) -> StopEvent:
     """Map SubagentStop to StopEvent"""
     return StopEvent(
@@ -269,7 +260,7 @@ def map_subagent_stop_input(
 
 
 def map_notification_input(
-    wrapper: RequestWrapper, input_data: NotificationInput
+    wrapper: HookRequest, input_data: NotificationInput
 ) -> HookEvent:
     """Map Notification to HookEvent"""
     return HookEvent(
@@ -283,7 +274,7 @@ def map_notification_input(
 
 
 def map_pre_compact_input(
-    wrapper: RequestWrapper, input_data: PreCompactInput
+    wrapper: HookRequest, input_data: PreCompactInput
 ) -> HookEvent:
     """Map PreCompact to HookEvent"""
     return HookEvent(
@@ -297,7 +288,7 @@ def map_pre_compact_input(
 
 
 def map_session_start_input(
-    wrapper: RequestWrapper, input_data: SessionStartInput
+    wrapper: HookRequest, input_data: SessionStartInput
 ) -> HookEvent:
     """Map SessionStart to HookEvent"""
     return HookEvent(
@@ -311,7 +302,7 @@ def map_session_start_input(
 
 
 def map_session_end_input(
-    wrapper: RequestWrapper, input_data: SessionEndInput
+    wrapper: HookRequest, input_data: SessionEndInput
 ) -> HookEvent:
     """Map SessionEnd to HookEvent"""
     return HookEvent(
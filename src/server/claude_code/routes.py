@@ -1,8 +1,12 @@
+import json
 import logging
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
-from ..executor import execute_handlers_generic
+from ..decoding import decoded_body
+from ..admission import evaluate
+from ..logs import log_hook
+from ..responses import register_template, render_response
 from . import mapper
 from .api.enums import PermissionDecision, ToolName
 from .api.hooks import (
@@ -28,53 +32,70 @@ from .api.pre_tool_use import (
     PreToolUseInput,
     PreToolUseOutput,
 )
-from .api.request_wrapper import RequestWrapper
+from .api.request_wrapper import HookRequest
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/policy/claude-code")
 
-
-def _log_pretool_use_outcome(input_data: PreToolUseInput, result: PreToolUseOutput):
-    """Log the outcome of a PreToolUse hook with response body."""
-    continue_status = "CONTINUE" if result.continue_ else "BLOCK"
-    response_body = (
-        result.model_dump(exclude_none=True)
-        if hasattr(result, "model_dump")
-        else result
+# Plain decisions without messages are the most common PreToolUse responses
+for _decision in PermissionDecision:
+    register_template(
+        PreToolUseOutput(
+            continue_=True,
+            hookSpecificOutput=PreToolUseHookSpecificOutput(
+                permissionDecision=_decision
+            ),
+        )
     )
 
-    logger.info(f"PreToolUse: {continue_status} | Response: {response_body}")
+
+def _log_received(hook_name: str, input_data, **fields):
+    """Log receipt of a hook event at debug level."""
+    log_hook(
+        logger,
+        hook_name,
+        input_data.session_id,
+        "Hook received",
+        lambda: fields,
+        level=logging.DEBUG,
+    )
 
 
-def _log_generic_hook_outcome(hook_name: str, input_data, result):
-    """Log the outcome of a generic hook with response body."""
-    outcome = "CONTINUE" if result.continue_ else "BLOCK"
-    response_body = (
-        result.model_dump(exclude_none=True)
-        if hasattr(result, "model_dump")
-        else result
+def _log_outcome(hook_name: str, input_data, result, body: bytes, **fields):
+    """Log the outcome of a hook with its response body."""
+    log_hook(
+        logger,
+        hook_name,
+        input_data.session_id,
+        "Hook outcome",
+        lambda: {
+            "outcome": "CONTINUE" if result.continue_ else "BLOCK",
+            "response": json.loads(body),
+            **fields,
+        },
     )
-    logger.info(f"{hook_name}: {outcome} | Response: {response_body}")
 
 
 @router.post(
     "/PreToolUse", response_model=PreToolUseOutput, response_model_exclude_none=True
 )
-async def pre_tool_use_hook(wrapper: RequestWrapper) -> PreToolUseOutput:
+async def pre_tool_use_hook(
+    wrapper: HookRequest[PreToolUseInput] = decoded_body(HookRequest[PreToolUseInput]),
+) -> Response:
     """Handle PreToolUse hook events."""
-    input_data = PreToolUseInput(**wrapper.event)
+    input_data = wrapper.event
 
     tool_name_str = (
         input_data.tool_name.value
         if hasattr(input_data.tool_name, "value")
         else str(input_data.tool_name)
     )
-    logger.info(f"PreToolUse hook: {tool_name_str} in session {input_data.session_id}")
+    _log_received("PreToolUse", input_data, tool_name=tool_name_str)
 
     generic_input = mapper.map_pre_tool_use_input(wrapper, input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "PreToolUse")
 
     # Default to ASK for Bash and WebFetch
     if input_data.tool_name in [ToolName.BASH, ToolName.WEB_FETCH]:
@@ -89,30 +110,36 @@ async def pre_tool_use_hook(wrapper: RequestWrapper) -> PreToolUseOutput:
         ),
     )
 
-    result = mapper.map_to_pre_tool_use_output(results, default)
-    _log_pretool_use_outcome(input_data, result)
-    return result
+    result = mapper.map_to_pre_tool_use_output(evaluation.results, default)
+    response = render_response(result, degraded=evaluation.degraded)
+    _log_outcome(
+        "PreToolUse", input_data, result, response.body, tool_name=tool_name_str
+    )
+    return response
 
 
 @router.post(
     "/PostToolUse", response_model=PostToolUseOutput, response_model_exclude_none=True
 )
-async def post_tool_use_hook(wrapper: RequestWrapper) -> PostToolUseOutput:
+async def post_tool_use_hook(
+    wrapper: HookRequest[PostToolUseInput] = decoded_body(
+        HookRequest[PostToolUseInput]
+    ),
+) -> Response:
     """Handle PostToolUse hook events."""
-    input_data = PostToolUseInput(**wrapper.event)
+    input_data = wrapper.event
 
-    logger.info(
-        f"PostToolUse hook: {input_data.tool_name} in session {input_data.session_id}"
-    )
+    _log_received("PostToolUse", input_data, tool_name=str(input_data.tool_name))
 
     generic_input = mapper.map_post_tool_use_input(wrapper, input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "PostToolUse")
 
     default = PostToolUseOutput(continue_=True)
-    result = mapper.map_to_post_tool_use_output(results, default)
-    _log_generic_hook_outcome("PostToolUse", input_data, result)
-    return result
+    result = mapper.map_to_post_tool_use_output(evaluation.results, default)
+    response = render_response(result, degraded=evaluation.degraded)
+    _log_outcome("PostToolUse", input_data, result, response.body)
+    return response
 
 
 @router.post(
@@ -120,124 +147,153 @@ async def post_tool_use_hook(wrapper: RequestWrapper) -> PostToolUseOutput:
     response_model=UserPromptSubmitOutput,
     response_model_exclude_none=True,
 )
-async def user_prompt_submit_hook(wrapper: RequestWrapper) -> UserPromptSubmitOutput:
+async def user_prompt_submit_hook(
+    wrapper: HookRequest[UserPromptSubmitInput] = decoded_body(
+        HookRequest[UserPromptSubmitInput]
+    ),
+) -> Response:
     """Handle UserPromptSubmit hook events."""
-    input_data = UserPromptSubmitInput(**wrapper.event)
-    logger.info(f"UserPromptSubmit hook: session {input_data.session_id}")
+    input_data = wrapper.event
+    _log_received("UserPromptSubmit", input_data)
 
     generic_input = mapper.map_user_prompt_submit_input(wrapper, input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "UserPromptSubmit")
 
     default = UserPromptSubmitOutput(continue_=True)
-    result = mapper.map_to_default_output(results, default)
-    _log_generic_hook_outcome("UserPromptSubmit", input_data, result)
-    return result
+    result = mapper.map_to_default_output(evaluation.results, default)
+    response = render_response(result, degraded=evaluation.degraded)
+    _log_outcome("UserPromptSubmit", input_data, result, response.body)
+    return response
 
 
 @router.post("/Stop", response_model=StopOutput, response_model_exclude_none=True)
-async def stop_hook(wrapper: RequestWrapper) -> StopOutput:
+async def stop_hook(
+    wrapper: HookRequest[StopInput] = decoded_body(HookRequest[StopInput]),
+) -> Response:
     """Handle Stop hook events."""
-    input_data = StopInput(**wrapper.event)
-    logger.info(f"Stop hook: session {input_data.session_id}")
+    input_data = wrapper.event
+    _log_received("Stop", input_data)
 
     generic_input = mapper.map_stop_input(wrapper, input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "Stop")
 
     default = StopOutput(continue_=True)
-    result = mapper.map_to_default_output(results, default)
-    _log_generic_hook_outcome("Stop", input_data, result)
-    return result
+    result = mapper.map_to_default_output(evaluation.results, default)
+    response = render_response(result, degraded=evaluation.degraded)
+    _log_outcome("Stop", input_data, result, response.body)
+    return response
 
 
 @router.post(
     "/SubagentStop", response_model=SubagentStopOutput, response_model_exclude_none=True
 )
-async def subagent_stop_hook(wrapper: RequestWrapper) -> SubagentStopOutput:
+async def subagent_stop_hook(
+    wrapper: HookRequest[SubagentStopInput] = decoded_body(
+        HookRequest[SubagentStopInput]
+    ),
+) -> Response:
     """Handle SubagentStop hook events."""
-    input_data = SubagentStopInput(**wrapper.event)
-    logger.info(f"SubagentStop hook: session {input_data.session_id}")
+    input_data = wrapper.event
+    _log_received("SubagentStop", input_data)
 
     generic_input = mapper.map_subagent_stop_input(wrapper, input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "SubagentStop")
 
     default = SubagentStopOutput(continue_=True)
-    result = mapper.map_to_default_output(results, default)
-    _log_generic_hook_outcome("SubagentStop", input_data, result)
-    return result
+    result = mapper.map_to_default_output(evaluation.results, default)
+    response = render_response(result, degraded=evaluation.degraded)
+    _log_outcome("SubagentStop", input_data, result, response.body)
+    return response
 
 
 @router.post(
     "/Notification", response_model=NotificationOutput, response_model_exclude_none=True
 )
-async def notification_hook(wrapper: RequestWrapper) -> NotificationOutput:
+async def notification_hook(
+    wrapper: HookRequest[NotificationInput] = decoded_body(
+        HookRequest[NotificationInput]
+    ),
+) -> Response:
     """Handle Notification hook events."""
-    input_data = NotificationInput(**wrapper.event)
-    logger.info(f"Notification hook: session {input_data.session_id}")
+    input_data = wrapper.event
+    _log_received("Notification", input_data)
 
     generic_input = mapper.map_notification_input(wrapper, input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "Notification")
 
     default = NotificationOutput(continue_=True)
-    result = mapper.map_to_default_output(results, default)
-    _log_generic_hook_outcome("Notification", input_data, result)
-    return result
+    result = mapper.map_to_default_output(evaluation.results, default)
+    response = render_response(result, degraded=evaluation.degraded)
+    _log_outcome("Notification", input_data, result, response.body)
+    return response
 
 
 @router.post(
     "/PreCompact", response_model=PreCompactOutput, response_model_exclude_none=True
 )
-async def pre_compact_hook(wrapper: RequestWrapper) -> PreCompactOutput:
+async def pre_compact_hook(
+    wrapper: HookRequest[PreCompactInput] = decoded_body(HookRequest[PreCompactInput]),
+) -> Response:
     """Handle PreCompact hook events."""
-    input_data = PreCompactInput(**wrapper.event)
-    logger.info(f"PreCompact hook: session {input_data.session_id}")
+    input_data = wrapper.event
+    _log_received("PreCompact", input_data)
 
     generic_input = mapper.map_pre_compact_input(wrapper, input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "PreCompact")
 
     default = PreCompactOutput(continue_=True)
-    result = mapper.map_to_default_output(results, default)
-    _log_generic_hook_outcome("PreCompact", input_data, result)
-    return result
+    result = mapper.map_to_default_output(evaluation.results, default)
+    response = render_response(result, degraded=evaluation.degraded)
+    _log_outcome("PreCompact", input_data, result, response.body)
+    return response
 
 
 @router.post(
     "/SessionStart", response_model=SessionStartOutput, response_model_exclude_none=True
 )
-async def session_start_hook(wrapper: RequestWrapper) -> SessionStartOutput:
+async def session_start_hook(
+    wrapper: HookRequest[SessionStartInput] = decoded_body(
+        HookRequest[SessionStartInput]
+    ),
+) -> Response:
     """Handle SessionStart hook events."""
-    input_data = SessionStartInput(**wrapper.event)
-    logger.info(f"SessionStart hook: session {input_data.session_id}")
+    input_data = wrapper.event
+    _log_received("SessionStart", input_data)
 
     generic_input = mapper.map_session_start_input(wrapper, input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "SessionStart")
 
     default = SessionStartOutput(
         continue_=True, hookSpecificOutput=SessionStartHookSpecificOutput()
     )
-    result = mapper.map_to_session_start_output(results, default)
-    _log_generic_hook_outcome("SessionStart", input_data, result)
-    return result
+    result = mapper.map_to_session_start_output(evaluation.results, default)
+    response = render_response(result, degraded=evaluation.degraded)
+    _log_outcome("SessionStart", input_data, result, response.body)
+    return response
 
 
 @router.post(
     "/SessionEnd", response_model=SessionEndOutput, response_model_exclude_none=True
 )
-async def session_end_hook(wrapper: RequestWrapper) -> SessionEndOutput:
+async def session_end_hook(
+    wrapper: HookRequest[SessionEndInput] = decoded_body(HookRequest[SessionEndInput]),
+) -> Response:
     """Handle SessionEnd hook events."""
-    input_data = SessionEndInput(**wrapper.event)
-    logger.info(f"SessionEnd hook: session {input_data.session_id}")
+    input_data = wrapper.event
+    _log_received("SessionEnd", input_data)
 
     generic_input = mapper.map_session_end_input(wrapper, input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "SessionEnd")
 
     default = SessionEndOutput(continue_=True)
-    result = mapper.map_to_default_output(results, default)
-    _log_generic_hook_outcome("SessionEnd", input_data, result)
-    return result
+    result = mapper.map_to_default_output(evaluation.results, default)
+    response = render_response(result, degraded=evaluation.degraded)
+    _log_outcome("SessionEnd", input_data, result, response.body)
+    return response
@@ -0,0 +1,244 @@
+"""
+Server configuration loaded from environment variables.
+
+All settings have defaults matching a single-process server on port 8338,
+so the server runs unconfigured. Variables use the POLICY_SERVER_ prefix.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple
+
+ENV_PREFIX = "POLICY_SERVER_"
+
+
+def _get_int(env: Mapping[str, str], name: str, default: int, base: int = 10) -> int:
+    """Read an integer setting, failing loudly on malformed values."""
+    raw = env.get(ENV_PREFIX + name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return int(raw, base)
+    except ValueError:
+        raise ValueError(f"{ENV_PREFIX}{name} must be an integer, got {raw!r}")
+
+
+def _get_bool(env: Mapping[str, str], name: str, default: bool) -> bool:
+    """Read a boolean setting (1/0, true/false, yes/no, on/off)."""
+    raw = env.get(ENV_PREFIX + name)
+    if raw is None or raw.strip() == "":
+        return default
+    value = raw.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"{ENV_PREFIX}{name} must be a boolean, got {raw!r}")
+
+
+def _get_choice(
+    env: Mapping[str, str], name: str, default: str, choices: Tuple[str, ...]
+) -> str:
+    """Read a setting that must be one of a fixed set of values."""
+    raw = env.get(ENV_PREFIX + name)
+    if raw is None or raw.strip() == "":
+        return default
+    value = raw.strip().lower()
+    if value not in choices:
+        raise ValueError(
+            f"{ENV_PREFIX}{name} must be one of {', '.join(choices)}, got {raw!r}"
+        )
+    return value
+
+
+def _get_list(env: Mapping[str, str], name: str) -> FrozenSet[str]:
+    """Read a comma-separated list setting."""
+    raw = env.get(ENV_PREFIX + name) or ""
+    return frozenset(item.strip() for item in raw.split(",") if item.strip())
+
+
+def _get_rates(env: Mapping[str, str], name: str) -> Dict[str, float]:
+    """Read a comma-separated list of key=rate pairs (rates between 0 and 1)."""
+    rates = {}
+    for item in _get_list(env, name):
+        key, sep, raw_rate = item.partition("=")
+        try:
+            rate = float(raw_rate)
+        except ValueError:
+            rate = -1.0
+        if not sep or not 0.0 <= rate <= 1.0:
+            raise ValueError(
+                f"{ENV_PREFIX}{name} entries must look like Hook=0.25, got {item!r}"
+            )
+        rates[key.strip()] = rate
+    return rates
+
+
+def _get_limits(env: Mapping[str, str], name: str) -> Dict[str, Tuple[float, float]]:
+    """Read a comma-separated list of key=rate[:burst] pairs (burst defaults to rate)."""
+    limits = {}
+    for item in _get_list(env, name):
+        key, sep, raw_limit = item.partition("=")
+        raw_rate, _, raw_burst = raw_limit.partition(":")
+        try:
+            rate = float(raw_rate)
+            burst = float(raw_burst) if raw_burst else rate
+        except ValueError:
+            rate = burst = -1.0
+        if not sep or rate <= 0 or burst < 1:
+            raise ValueError(
+                f"{ENV_PREFIX}{name} entries must look like Hook=20:40, got {item!r}"
+            )
+        limits[key.strip()] = (rate, burst)
+    return limits
+
+
+def _get_durations(env: Mapping[str, str], name: str) -> Dict[str, float]:
+    """Read a comma-separated list of key=milliseconds pairs."""
+    durations = {}
+    for item in _get_list(env, name):
+        key, sep, raw_ms = item.partition("=")
+        try:
+            milliseconds = float(raw_ms)
+        except ValueError:
+            milliseconds = -1.0
+        if not sep or milliseconds <= 0:
+            raise ValueError(
+                f"{ENV_PREFIX}{name} entries must look like Hook=200, got {item!r}"
+            )
+        durations[key.strip()] = milliseconds
+    return durations
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Settings for serving and policy evaluation."""
+
+    host: str = "0.0.0.0"
+    port: int = 8338
+    tcp: bool = True  # Listen on host:port
+    uds_path: Optional[str] = None  # Unix domain socket path (None = disabled)
+    uds_mode: int = 0o660  # Unix socket file permissions
+    workers: int = 1  # Pre-forked server processes
+
+    rego_parallel_threshold: int = 8  # Minimum queries to split across processes
+    rego_process_workers: int = 0  # Rego worker processes per server process
+
+    max_concurrent_evaluations: int = 0  # Admission limit (0 = unlimited, inline)
+    admission_queue_size: int = 64  # Evaluations waiting for a slot before shedding
+    admission_queue_timeout_ms: int = 250  # Longest wait for a slot before shedding
+
+    # Per-session limits by hook name ("*" = any hook): (requests per second, burst)
+    rate_limits: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    max_command_length: int = 16384  # Characters in a bash command
+    max_command_segments: int = 64  # Chained, piped and substituted commands
+    max_command_depth: int = 8  # Process substitution / subshell nesting
+    max_heredoc_bytes: int = 65536  # Characters in heredoc bodies
+    command_limit_action: str = "ask"  # Decision for commands over a limit
+
+    guidance_cache_size: int = 1024  # Cached file edit guidance results (0 = off)
+    guidance_process_workers: int = 0  # Sandboxed guidance workers (0 = inline)
+    guidance_check_timeout_ms: int = 500  # Time limit per sandboxed check
+    guidance_check_memory_mb: int = (
+        256  # Data size limit per guidance worker (0 = none)
+    )
+
+    # Evaluation budget per hook name in milliseconds ("*" = any hook)
+    hook_deadlines_ms: Dict[str, float] = field(default_factory=dict)
+
+    log_level: str = "INFO"
+    log_format: str = "json"  # "json" or "text"
+    log_sample_rates: Dict[str, float] = field(default_factory=dict)  # Per hook
+    debug_sessions: FrozenSet[str] = frozenset()  # Always logged at every level
+
+    audit_path: Optional[str] = None  # Decision audit JSONL file (None = disabled)
+    audit_buffer_size: int = 10000  # Records queued before new ones are dropped
+    audit_max_bytes: int = 100 * 1024 * 1024  # Rotate at this size (0 = never)
+    audit_rotate_seconds: int = 0  # Rotate at this age (0 = never)
+    audit_compress: bool = False  # Gzip rotated audit files
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "ServerConfig":
+        """
+        Build configuration from environment variables.
+
+        Args:
+            env: Mapping to read from (defaults to os.environ)
+
+        Returns:
+            ServerConfig with defaults for unset variables
+        """
+        env = os.environ if env is None else env
+        defaults = cls()
+        return cls(
+            host=env.get(ENV_PREFIX + "HOST", defaults.host),
+            port=_get_int(env, "PORT", defaults.port),
+            tcp=_get_bool(env, "TCP", defaults.tcp),
+            uds_path=env.get(ENV_PREFIX + "UDS") or defaults.uds_path,
+            uds_mode=_get_int(env, "UDS_MODE", defaults.uds_mode, base=8),
+            workers=max(1, _get_int(env, "WORKERS", defaults.workers)),
+            rego_parallel_threshold=_get_int(
+                env, "REGO_PARALLEL_THRESHOLD", defaults.rego_parallel_threshold
+            ),
+            rego_process_workers=_get_int(
+                env, "REGO_PROCESS_WORKERS", defaults.rego_process_workers
+            ),
+            max_concurrent_evaluations=_get_int(
+                env, "MAX_CONCURRENT_EVALUATIONS", defaults.max_concurrent_evaluations
+            ),
+            admission_queue_size=_get_int(
+                env, "ADMISSION_QUEUE_SIZE", defaults.admission_queue_size
+            ),
+            admission_queue_timeout_ms=_get_int(
+                env, "ADMISSION_QUEUE_TIMEOUT_MS", defaults.admission_queue_timeout_ms
+            ),
+            rate_limits=_get_limits(env, "RATE_LIMITS"),
+            max_command_length=_get_int(
+                env, "MAX_COMMAND_LENGTH", defaults.max_command_length
+            ),
+            max_command_segments=_get_int(
+                env, "MAX_COMMAND_SEGMENTS", defaults.max_command_segments
+            ),
+            max_command_depth=_get_int(
+                env, "MAX_COMMAND_DEPTH", defaults.max_command_depth
+            ),
+            max_heredoc_bytes=_get_int(
+                env, "MAX_HEREDOC_BYTES", defaults.max_heredoc_bytes
+            ),
+            command_limit_action=_get_choice(
+                env,
+                "COMMAND_LIMIT_ACTION",
+                defaults.command_limit_action,
+                ("ask", "deny"),
+            ),
+            guidance_cache_size=_get_int(
+                env, "GUIDANCE_CACHE_SIZE", defaults.guidance_cache_size
+            ),
+            guidance_process_workers=_get_int(
+                env, "GUIDANCE_PROCESS_WORKERS", defaults.guidance_process_workers
+            ),
+            guidance_check_timeout_ms=_get_int(
+                env, "GUIDANCE_CHECK_TIMEOUT_MS", defaults.guidance_check_timeout_ms
+            ),
+            guidance_check_memory_mb=_get_int(
+                env, "GUIDANCE_CHECK_MEMORY_MB", defaults.guidance_check_memory_mb
+            ),
+            hook_deadlines_ms=_get_durations(env, "HOOK_DEADLINES_MS"),
+            log_level=env.get(ENV_PREFIX + "LOG_LEVEL", defaults.log_level).upper(),
+            log_format=env.get(ENV_PREFIX + "LOG_FORMAT", defaults.log_format).lower(),
+            log_sample_rates=_get_rates(env, "LOG_SAMPLE_RATES"),
+            debug_sessions=_get_list(env, "DEBUG_SESSIONS"),
+            audit_path=env.get(ENV_PREFIX + "AUDIT_PATH") or defaults.audit_path,
+            audit_buffer_size=max(
+                1, _get_int(env, "AUDIT_BUFFER_SIZE", defaults.audit_buffer_size)
+            ),
+            audit_max_bytes=_get_int(env, "AUDIT_MAX_BYTES", defaults.audit_max_bytes),
+            audit_rotate_seconds=_get_int(
+                env, "AUDIT_ROTATE_SECONDS", defaults.audit_rotate_seconds
+            ),
+            audit_compress=_get_bool(env, "AUDIT_COMPRESS", defaults.audit_compress),
+        )
+
+
+config = ServerConfig.from_env()
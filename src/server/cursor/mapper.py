@@ -164,7 +164,9 @@ def map_to_cursor_output(
         CursorOutputType,
         output_type(
             permission=(
-                permission_map.get(final_decision.action) if final_decision else None
+                permission_map.get(final_decision.action)
+                if final_decision
+                else getattr(default_output, "permission", None)
             ),
             userMessage="\n".join(user_messages) if user_messages else None,
             agentMessage="\n".join(agent_messages) if agent_messages else None,
@@ -4,9 +4,11 @@ Cursor hook routes.
 
 import logging
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
-from ..executor import execute_handlers_generic
+from ..admission import evaluate
+from ..logs import log_hook
+from ..responses import register_template, render_response
 from . import mapper
 from .api.after_file_edit import AfterFileEditInput, AfterFileEditOutput
 from .api.before_mcp_execution import BeforeMCPExecutionInput, BeforeMCPExecutionOutput
@@ -24,6 +26,34 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/policy/cursor")
 
 
+def _log_received(hook_name: str, input_data, **fields):
+    """Log receipt of a hook event at debug level."""
+    log_hook(
+        logger,
+        hook_name,
+        input_data.conversation_id,
+        "Hook received",
+        lambda: fields,
+        level=logging.DEBUG,
+    )
+
+
+def _log_outcome(hook_name: str, input_data, result):
+    """Log the permission returned for a hook."""
+    log_hook(
+        logger,
+        hook_name,
+        input_data.conversation_id,
+        "Hook outcome",
+        lambda: {"permission": result.permission},
+    )
+
+
+# Plain permissions without messages are the most common shell responses
+for _permission in Permission:
+    register_template(BeforeShellExecutionOutput(permission=_permission))
+
+
 @router.post(
     "/beforeShellExecution",
     response_model=BeforeShellExecutionOutput,
@@ -31,21 +61,19 @@ router = APIRouter(prefix="/policy/cursor")
 )
 async def before_shell_execution_hook(
     input_data: BeforeShellExecutionInput,
-) -> BeforeShellExecutionOutput:
+) -> Response:
     """Handle beforeShellExecution hook events."""
-    logger.info(
-        f"beforeShellExecution hook: '{input_data.command}' in conversation {input_data.conversation_id}"
-    )
+    _log_received("beforeShellExecution", input_data, command=input_data.command)
 
     generic_input = mapper.map_before_shell_execution_input(input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "beforeShellExecution")
 
     default = BeforeShellExecutionOutput(permission=Permission.ASK)
-    result = mapper.map_to_cursor_output(results, default)
+    result = mapper.map_to_cursor_output(evaluation.results, default)
 
-    logger.info(f"beforeShellExecution result: {result.permission}")
-    return result
+    _log_outcome("beforeShellExecution", input_data, result)
+    return render_response(result, degraded=evaluation.degraded)
 
 
 @router.post(
@@ -55,21 +83,19 @@ async def before_shell_execution_hook(
 )
 async def before_mcp_execution_hook(
     input_data: BeforeMCPExecutionInput,
-) -> BeforeMCPExecutionOutput:
+) -> Response:
     """Handle beforeMCPExecution hook events."""
-    logger.info(
-        f"beforeMCPExecution hook: {input_data.tool_name} in conversation {input_data.conversation_id}"
-    )
+    _log_received("beforeMCPExecution", input_data, tool_name=input_data.tool_name)
 
     generic_input = mapper.map_before_mcp_execution_input(input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "beforeMCPExecution")
 
     default = BeforeMCPExecutionOutput(permission=Permission.ASK)
-    result = mapper.map_to_cursor_output(results, default)
+    result = mapper.map_to_cursor_output(evaluation.results, default)
 
-    logger.info(f"beforeMCPExecution result: {result.permission}")
-    return result
+    _log_outcome("beforeMCPExecution", input_data, result)
+    return render_response(result, degraded=evaluation.degraded)
 
 
 @router.post(
@@ -77,20 +103,18 @@ async def before_mcp_execution_hook(
     response_model=AfterFileEditOutput,
     response_model_exclude_none=True,
 )
-async def after_file_edit_hook(input_data: AfterFileEditInput) -> AfterFileEditOutput:
+async def after_file_edit_hook(input_data: AfterFileEditInput) -> Response:
     """Handle afterFileEdit hook events (observation only, cannot prevent)."""
-    logger.info(
-        f"afterFileEdit hook: {input_data.file_path} in conversation {input_data.conversation_id}"
-    )
+    _log_received("afterFileEdit", input_data, file_path=input_data.file_path)
 
     generic_input = mapper.map_after_file_edit_input(input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "afterFileEdit")
 
     default = AfterFileEditOutput()
-    result = mapper.map_to_cursor_output(results, default)
+    result = mapper.map_to_cursor_output(evaluation.results, default)
 
-    return result
+    return render_response(result, degraded=evaluation.degraded)
 
 
 @router.post(
@@ -100,21 +124,19 @@ async def after_file_edit_hook(input_data: AfterFileEditInput) -> AfterFileEditO
 )
 async def before_read_file_hook(
     input_data: BeforeReadFileInput,
-) -> BeforeReadFileOutput:
+) -> Response:
     """Handle beforeReadFile hook events."""
-    logger.info(
-        f"beforeReadFile hook: {input_data.file_path} in conversation {input_data.conversation_id}"
-    )
+    _log_received("beforeReadFile", input_data, file_path=input_data.file_path)
 
     generic_input = mapper.map_before_read_file_input(input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "beforeReadFile")
 
     default = BeforeReadFileOutput(permission=Permission.ALLOW)
-    result = mapper.map_to_cursor_output(results, default)
+    result = mapper.map_to_cursor_output(evaluation.results, default)
 
-    logger.info(f"beforeReadFile result: {result.permission}")
-    return result
+    _log_outcome("beforeReadFile", input_data, result)
+    return render_response(result, degraded=evaluation.degraded)
 
 
 @router.post(
@@ -124,31 +146,31 @@ async def before_read_file_hook(
 )
 async def before_submit_prompt_hook(
     input_data: BeforeSubmitPromptInput,
-) -> BeforeSubmitPromptOutput:
+) -> Response:
     """Handle beforeSubmitPrompt hook events."""
-    logger.info(f"beforeSubmitPrompt hook in conversation {input_data.conversation_id}")
+    _log_received("beforeSubmitPrompt", input_data)
 
     generic_input = mapper.map_before_submit_prompt_input(input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "beforeSubmitPrompt")
 
     default = BeforeSubmitPromptOutput(permission=Permission.ALLOW)
-    result = mapper.map_to_cursor_output(results, default)
+    result = mapper.map_to_cursor_output(evaluation.results, default)
 
-    logger.info(f"beforeSubmitPrompt result: {result.permission}")
-    return result
+    _log_outcome("beforeSubmitPrompt", input_data, result)
+    return render_response(result, degraded=evaluation.degraded)
 
 
 @router.post("/stop", response_model=StopOutput, response_model_exclude_none=True)
-async def stop_hook(input_data: StopInput) -> StopOutput:
+async def stop_hook(input_data: StopInput) -> Response:
     """Handle stop hook events."""
-    logger.info(f"stop hook in conversation {input_data.conversation_id}")
+    _log_received("stop", input_data)
 
     generic_input = mapper.map_stop_input(input_data)
 
-    results = execute_handlers_generic(generic_input)
+    evaluation = await evaluate(generic_input, "stop")
 
     default = StopOutput()
-    result = mapper.map_to_cursor_output(results, default)
+    result = mapper.map_to_cursor_output(evaluation.results, default)
 
-    return result
+    return render_response(result, degraded=evaluation.degraded)
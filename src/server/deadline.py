@@ -0,0 +1,81 @@
+"""
+Per-request evaluation deadlines.
+
+A hook with a latency budget evaluates inside deadline_scope(). Each
+pipeline stage (executor, parser, enrichment, Rego, guidance) calls
+check_deadline() before starting work and sizes its own timeouts with
+remaining_time(), so an expired budget stops the request at the next stage
+boundary with DeadlineExceeded instead of running to completion.
+
+The deadline travels in a context variable, so stages need no extra
+parameters. Code that hands work to another thread pool captures
+current_deadline() and checks the Deadline object directly.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage starts after the request's deadline has passed."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Evaluation deadline exceeded before {stage}")
+        self.stage = stage
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """Point in time (monotonic clock) by which evaluation must finish."""
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """Create a deadline `seconds` from now."""
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self, stage: str) -> None:
+        """Raise DeadlineExceeded if the deadline has passed."""
+        if time.monotonic() >= self.expires_at:
+            raise DeadlineExceeded(stage)
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[None]:
+    """Make `deadline` the current deadline (None = no deadline) for the block."""
+    token = _current.set(deadline)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the current request's deadline, if any."""
+    return _current.get()
+
+
+def check_deadline(stage: str) -> None:
+    """Raise DeadlineExceeded if the current request's deadline has passed."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def remaining_time(default: float) -> float:
+    """Return the time left in the current deadline, capped at `default`."""
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    return min(default, deadline.remaining())
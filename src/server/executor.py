@@ -1,6 +1,9 @@
 import logging
+import time
 from typing import List, Union
 
+from . import audit
+from .deadline import DeadlineExceeded, check_deadline
 from .models import PolicyDecision, PolicyGuidance, BaseEvent
 from .registry import registry
 from .session import cleanup_expired_flags, decrement_invocation_flags, set_flag
@@ -22,9 +25,15 @@ def execute_handlers_generic(input_data) -> List[Union[PolicyDecision, PolicyGui
     Args:
         input_data: The input event data (bundles read from input_data.enabled_bundles)
 
+    Raises:
+        DeadlineExceeded: If the current deadline (see deadline.py) passes
+            before all handlers have run
+
     Aggregation of results is done by the mapper layer for each editor.
     Bundle filtering is done by Rego policies, not by the Python registry.
     """
+    started = time.perf_counter()
+
     # Cleanup and decrement flags before policy execution
     if isinstance(input_data, BaseEvent):
         cleanup_expired_flags(input_data.session_id)
@@ -34,16 +43,20 @@ def execute_handlers_generic(input_data) -> List[Union[PolicyDecision, PolicyGui
     all_results = []
 
     for handler in handlers:
+        check_deadline("executor")
         try:
             yielded_results = list(handler(input_data))
             all_results.extend(yielded_results)
-            logger.debug(
-                f"Handler {handler.__name__} yielded {len(yielded_results)} results",
-                extra={
-                    "handler": handler.__name__,
-                    "result_count": len(yielded_results),
-                },
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Handler {handler.__name__} yielded {len(yielded_results)} results",
+                    extra={
+                        "handler": handler.__name__,
+                        "result_count": len(yielded_results),
+                    },
+                )
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(
                 f"Error in handler {handler.__name__}: {e}",
@@ -62,10 +75,11 @@ def execute_handlers_generic(input_data) -> List[Union[PolicyDecision, PolicyGui
                 for flag_spec in result.flags:
                     try:
                         set_flag(input_data.session_id, flag_spec)
-                        logger.debug(
-                            f"Set flag '{flag_spec.get('name')}' for session {input_data.session_id}",
-                            extra={"flag": flag_spec},
-                        )
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(
+                                f"Set flag '{flag_spec.get('name')}' for session {input_data.session_id}",
+                                extra={"flag": flag_spec},
+                            )
                     except Exception as e:
                         logger.error(
                             f"Error setting flag: {e}",
@@ -73,4 +87,8 @@ def execute_handlers_generic(input_data) -> List[Union[PolicyDecision, PolicyGui
                             exc_info=True,
                         )
 
+    sink = audit.audit_sink
+    if sink is not None and isinstance(input_data, BaseEvent):
+        sink.record(input_data, all_results, time.perf_counter() - started)
+
     return all_results
@@ -0,0 +1,121 @@
+"""
+Listening sockets for the policy server.
+
+The server can listen on TCP, on a Unix domain socket, or both. Hook clients
+on the same host can use the Unix socket to skip the TCP loopback stack.
+Sockets are bound up front so a pre-forking master can share them with its
+workers.
+"""
+
+import logging
+import os
+import signal
+import socket
+import stat
+import sys
+from typing import List
+
+import uvicorn
+from fastapi import FastAPI
+
+from .config import ServerConfig
+
+logger = logging.getLogger(__name__)
+
+_BACKLOG = 2048
+
+
+def _bind_tcp(host: str, port: int) -> socket.socket:
+    """Bind a TCP listening socket."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    # An explicit protocol lets asyncio recognise the socket as TCP and enable
+    # TCP_NODELAY on accepted connections; without it responses stall on
+    # Nagle's algorithm and delayed ACKs for ~40 ms on keep-alive connections
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def _bind_unix(path: str, mode: int) -> socket.socket:
+    """Bind a Unix domain socket, replacing a stale socket file."""
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise FileExistsError(f"{path} exists and is not a socket")
+        os.unlink(path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Bind under a restrictive umask so the socket is never briefly
+    # accessible with looser permissions than requested
+    old_umask = os.umask(0o777 & ~mode)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(old_umask)
+    os.chmod(path, mode)
+    return sock
+
+
+def bind_sockets(config: ServerConfig) -> List[socket.socket]:
+    """
+    Bind all configured listening sockets.
+
+    Args:
+        config: Server configuration
+
+    Returns:
+        Listening sockets, inheritable by forked workers
+
+    Raises:
+        ValueError: If neither TCP nor a Unix socket is configured
+    """
+    if not config.tcp and not config.uds_path:
+        raise ValueError("No listener configured: enable TCP or set a Unix socket")
+
+    sockets = []
+    if config.tcp:
+        sockets.append(_bind_tcp(config.host, config.port))
+        logger.info(f"Listening on http://{config.host}:{config.port}")
+    if config.uds_path:
+        sockets.append(_bind_unix(config.uds_path, config.uds_mode))
+        logger.info(
+            f"Listening on unix:{config.uds_path} (mode {oct(config.uds_mode)})"
+        )
+
+    for sock in sockets:
+        sock.listen(_BACKLOG)
+        sock.set_inheritable(True)
+    return sockets
+
+
+def close_sockets(sockets: List[socket.socket], config: ServerConfig) -> None:
+    """Close listening sockets and remove the Unix socket file."""
+    for sock in sockets:
+        sock.close()
+    if config.uds_path and os.path.exists(config.uds_path):
+        os.unlink(config.uds_path)
+
+
+def serve(app: FastAPI, sockets: List[socket.socket]) -> None:
+    """Serve the app on already bound sockets in this process."""
+    server = uvicorn.Server(uvicorn.Config(app, log_level="info"))
+    server.run(sockets=sockets)
+
+
+def serve_single(app: FastAPI, config: ServerConfig) -> None:
+    """
+    Bind the configured listeners and serve from this process.
+
+    uvicorn re-raises SIGTERM after a graceful shutdown; it is turned into
+    SystemExit here so the Unix socket file is removed on the way out.
+
+    Args:
+        app: Fully initialized FastAPI application
+        config: Server configuration
+    """
+    sockets = bind_sockets(config)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        serve(app, sockets)
+    finally:
+        close_sockets(sockets, config)
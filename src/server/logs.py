@@ -0,0 +1,200 @@
+"""
+Structured, asynchronous logging for the policy server.
+
+Log records are handed to a queue on the request path and formatted and
+written by a background listener thread, so request handling never waits
+on string formatting or I/O. Records are rendered as JSON objects, with any
+`extra` fields as top-level keys.
+
+Forked server workers inherit the queue handler but not the listener
+thread, so each child starts its own listener and queue after fork.
+
+Per-request hook logs go through log_hook(), which:
+- builds the structured payload only when the record will be emitted
+- samples each hook at its configured rate
+- always emits for sessions with debug logging enabled, at any level
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Mapping, Optional, Set
+
+from .config import ServerConfig
+
+# Attributes every LogRecord has; anything else came from `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_sample_rates: Dict[str, float] = {}
+_debug_sessions: Set[str] = set()
+_debug_sessions_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves all formatting to the listener thread.
+
+    The stock QueueHandler formats the message on the calling thread before
+    enqueueing. Records here are queued as-is; they are only read in-process,
+    so nothing needs to be pickled.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(config: ServerConfig) -> None:
+    """
+    Route all logging through a background queue listener.
+
+    Args:
+        config: Server configuration (log level, format, sampling, debug sessions)
+    """
+    global _listener
+
+    if config.log_format == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(levelname)s:%(name)s:%(message)s")
+    output = logging.StreamHandler()
+    output.setFormatter(formatter)
+
+    if _listener is not None:
+        _listener.stop()
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _DeferredQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    root.setLevel(config.log_level)
+
+    set_sample_rates(config.log_sample_rates)
+    for session_id in config.debug_sessions:
+        enable_session_debug(session_id)
+
+
+def _stop_listener() -> None:
+    """Flush queued records at interpreter exit."""
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
+
+
+def _restart_listener_in_child() -> None:
+    """Give a forked process its own listener thread and queue.
+
+    Threads do not survive fork, so without this the child's records would
+    queue up forever. Records still queued at fork time belong to the
+    parent, whose listener writes them, so the child starts a new queue.
+    """
+    global _listener
+    if _listener is None:
+        return
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _listener = QueueListener(
+        log_queue, *_listener.handlers, respect_handler_level=True
+    )
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, _DeferredQueueHandler):
+            handler.queue = log_queue
+    _listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+def set_sample_rates(rates: Mapping[str, float]) -> None:
+    """
+    Set per-hook sampling rates.
+
+    Args:
+        rates: Mapping of hook name to the fraction of its logs to emit (0-1);
+            hooks not listed are always logged
+    """
+    _sample_rates.clear()
+    _sample_rates.update(rates)
+
+
+def enable_session_debug(session_id: str) -> None:
+    """Log every hook of a session, at every level, unsampled."""
+    with _debug_sessions_lock:
+        _debug_sessions.add(session_id)
+
+
+def disable_session_debug(session_id: str) -> None:
+    """Return a session to the normal log level and sampling."""
+    with _debug_sessions_lock:
+        _debug_sessions.discard(session_id)
+
+
+def session_debug_enabled(session_id: str) -> bool:
+    """Check whether debug logging is enabled for a session."""
+    return session_id in _debug_sessions
+
+
+def log_hook(
+    logger: logging.Logger,
+    hook: str,
+    session_id: str,
+    message: str,
+    fields: Optional[Callable[[], Dict[str, Any]]] = None,
+    level: int = logging.INFO,
+) -> None:
+    """
+    Log a hook event with structured fields, subject to sampling.
+
+    Args:
+        logger: Logger to emit on
+        hook: Hook name, used for sampling (e.g. "PreToolUse")
+        session_id: Session or conversation ID
+        message: Static log message
+        fields: Callable building extra structured fields; only called when
+            the record is emitted
+        level: Log level
+    """
+    if session_id not in _debug_sessions:
+        if not logger.isEnabledFor(level):
+            return
+        rate = _sample_rates.get(hook, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return
+
+    extra = {"hook": hook, "session_id": session_id}
+    if fields is not None:
+        extra.update(fields())
+
+    # Logger.handle skips the level check, which debug sessions bypass
+    record = logger.makeRecord(
+        logger.name, level, "(hook)", 0, message, (), None, extra=extra
+    )
+    logger.handle(record)
@@ -0,0 +1,168 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Components create their metrics at import time with counter(), gauge() or
+histogram(), and values that already live elsewhere (such as audit sink
+counts) are exported through register_collector(). GET /metrics renders
+everything with render_metrics().
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[Tuple[str, str], ...]
+
+# A collector yields (name, type, help, value) samples when metrics are rendered
+CollectorSample = Tuple[str, str, str, float]
+
+_metrics: List["_Metric"] = []
+_collectors: List[Callable[[], Iterable[CollectorSample]]] = []
+
+
+def _format_labels(labels: LabelValues) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    """Named metric with per-label-set values."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def value(self, **labels: str) -> float:
+        """Return the current value for a label set."""
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def _add(self, amount: float, labels: Dict[str, str]) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        self._add(amount, labels)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self._add(-amount, labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        super().__init__(name, help_text)
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def observe(self, value: float) -> None:
+        index = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound),
+            len(self.buckets),
+        )
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip([*self.buckets, float("inf")], counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _format_value(bound)
+            lines.append(f'{self.name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format_value(total)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+def counter(name: str, help_text: str) -> Counter:
+    """Create and register a counter."""
+    metric = Counter(name, help_text)
+    _metrics.append(metric)
+    return metric
+
+
+def gauge(name: str, help_text: str) -> Gauge:
+    """Create and register a gauge."""
+    metric = Gauge(name, help_text)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(name: str, help_text: str, buckets: Sequence[float]) -> Histogram:
+    """Create and register a histogram."""
+    metric = Histogram(name, help_text, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(collector: Callable[[], Iterable[CollectorSample]]) -> None:
+    """Export values computed at render time (e.g. counts kept by another object)."""
+    _collectors.append(collector)
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text format."""
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        for name, kind, help_text, value in collector():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
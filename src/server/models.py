@@ -1,8 +1,11 @@
+import hashlib
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Literal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Literal, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_serializer, field_validator
 
 from .enums import SourceClient
 
@@ -79,14 +82,175 @@ class PatchLine(BaseModel):
     content: str  # The actual line content (without the +/- prefix)
 
 
+# Operation codes stored by PatchLines, indexed by code
+PATCH_OPERATIONS: Tuple[str, ...] = ("unchanged", "added", "removed")
+_OPERATION_CODES = {name: code for code, name in enumerate(PATCH_OPERATIONS)}
+_PREFIX_CODES = {"+": 1, "-": 2}
+
+
+class PatchLines(Sequence):
+    """Compact, read-only sequence of patch lines.
+
+    Stores one operation code per line in a bytearray and keeps the diff
+    lines as received, with the length of each line's +/-/space prefix. Line
+    content is sliced only when read, so a large Write costs two bytes per
+    line on top of the decoded strings instead of a validated PatchLine each.
+
+    Indexing and iteration return PatchLine objects for compatibility; hot
+    paths should use pairs(), operation(), content() or documents().
+    """
+
+    __slots__ = ("_raw", "_codes", "_prefixes")
+
+    def __init__(self, raw: List[str], codes: bytearray, prefixes: bytearray):
+        self._raw = raw
+        self._codes = codes
+        self._prefixes = prefixes
+
+    @classmethod
+    def from_diff(cls, raw_lines: List[str]) -> "PatchLines":
+        """Build from raw diff lines (e.g. ["+# comment", " code", "-old"]).
+
+        Lines starting with "+" are added, "-" removed and anything else
+        unchanged; a leading space is stripped from unchanged lines.
+        """
+        codes = bytearray(len(raw_lines))
+        prefixes = bytearray(len(raw_lines))
+        prefix_codes = _PREFIX_CODES
+        for index, line in enumerate(raw_lines):
+            if not line:
+                continue
+            first = line[0]
+            code = prefix_codes.get(first)
+            if code is not None:
+                codes[index] = code
+                prefixes[index] = 1
+            elif first == " ":
+                prefixes[index] = 1
+        return cls(raw_lines, codes, prefixes)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[Any]) -> "PatchLines":
+        """Build from PatchLine objects, dicts or (operation, content) pairs."""
+        raw: List[str] = []
+        codes = bytearray()
+        for line in lines:
+            if isinstance(line, PatchLine):
+                operation, content = line.operation, line.content
+            elif isinstance(line, dict):
+                operation, content = line["operation"], line["content"]
+            else:
+                operation, content = line
+            if operation not in _OPERATION_CODES or not isinstance(content, str):
+                raise ValueError(f"Invalid patch line: {line!r}")
+            codes.append(_OPERATION_CODES[operation])
+            raw.append(content)
+        return cls(raw, codes, bytearray(len(raw)))
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return PatchLine.model_construct(
+            operation=PATCH_OPERATIONS[self._codes[index]],
+            content=self.content(index),
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, PatchLines):
+            return list(self.pairs()) == list(other.pairs())
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PatchLines({len(self)} lines)"
+
+    def operation(self, index: int) -> str:
+        """Operation of the line at index."""
+        return PATCH_OPERATIONS[self._codes[index]]
+
+    def content(self, index: int) -> str:
+        """Content of the line at index, without its diff prefix."""
+        prefix = self._prefixes[index]
+        line = self._raw[index]
+        return line[1:] if prefix else line
+
+    def pairs(self) -> Iterator[Tuple[str, str]]:
+        """Iterate (operation, content) tuples without building PatchLines."""
+        operations = PATCH_OPERATIONS
+        for line, code, prefix in zip(self._raw, self._codes, self._prefixes):
+            yield operations[code], line[1:] if prefix else line
+
+    def count_operation(self, operation: str) -> int:
+        """Number of lines with the given operation."""
+        return self._codes.count(_OPERATION_CODES[operation])
+
+    def digest(self) -> bytes:
+        """Content hash of the lines, for use in cache keys."""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(self._codes)
+        hasher.update(self._prefixes)
+        hasher.update(array("Q", map(len, self._raw)).tobytes())
+        hasher.update("".join(self._raw).encode("utf-8", "surrogatepass"))
+        return hasher.digest()
+
+    def documents(self) -> "PatchLineDocuments":
+        """Lazy view of the lines as Rego input objects."""
+        return PatchLineDocuments(self)
+
+
+class PatchLineDocuments(Sequence):
+    """Sequence view yielding {"operation", "content"} dicts on access.
+
+    The Rego input encoder walks any Sequence, so passing this view builds
+    each line's object only while it is being encoded.
+    """
+
+    __slots__ = ("_lines",)
+
+    def __init__(self, lines: PatchLines):
+        self._lines = lines
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return {
+            "operation": self._lines.operation(index),
+            "content": self._lines.content(index),
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for operation, content in self._lines.pairs():
+            yield {"operation": operation, "content": content}
+
+
 class StructuredPatch(BaseModel):
     """Represents a single patch in a structured diff"""
 
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     oldStart: int  # Line number where old content starts
     oldLines: int  # Number of lines in old content
     newStart: int  # Line number where new content starts
     newLines: int  # Number of lines in new content
-    lines: List[PatchLine]  # Parsed diff lines with operation and content separated
+    lines: PatchLines  # Parsed diff lines with operation and content separated
+
+    @field_validator("lines", mode="before")
+    @classmethod
+    def _compact_lines(cls, value: Any) -> PatchLines:
+        if isinstance(value, PatchLines):
+            return value
+        return PatchLines.from_lines(value)
+
+    @field_serializer("lines")
+    def _serialize_lines(self, lines: PatchLines) -> List[Dict[str, str]]:
+        return list(lines.documents())
 
 
 @dataclass
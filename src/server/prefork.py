@@ -0,0 +1,125 @@
+"""
+Pre-fork multi-worker serving.
+
+The master process imports the app (which loads and compiles all policies),
+binds the listening sockets, freezes the garbage-collected heap and then forks
+the workers. Workers inherit the compiled policy state copy-on-write instead
+of each recompiling it, and gc.freeze() keeps collections in the workers from
+touching (and so copying) the shared pages.
+
+Session flags and rate limits would otherwise live in each worker's own
+memory, so a policy gating on flags would decide differently depending on
+which worker took the request, and each worker would allow a session the
+full rate. The master therefore switches both to an SQLite database in a
+private temporary directory before forking, and every worker reads and
+writes the same state.
+"""
+
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from typing import Dict, List
+
+from fastapi import FastAPI
+
+from .config import ServerConfig
+from .listeners import bind_sockets, close_sockets, serve
+from . import ratelimit, session
+
+logger = logging.getLogger(__name__)
+
+
+def _run_worker(app: FastAPI, sockets: List[socket.socket]) -> None:
+    """Serve requests from the inherited sockets until told to stop."""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    serve(app, sockets)
+
+
+def _spawn(app: FastAPI, sockets: List[socket.socket]) -> int:
+    """Fork a worker process and return its PID in the master."""
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 0
+        try:
+            _run_worker(app, sockets)
+        except BaseException:
+            logger.exception("Worker crashed")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+    return pid
+
+
+def serve_prefork(app: FastAPI, config: ServerConfig) -> None:
+    """
+    Serve the app from pre-forked worker processes.
+
+    Must be called after all policies are loaded and handlers registered.
+    Workers that exit unexpectedly are replaced; SIGINT/SIGTERM stop all
+    workers and return.
+
+    Args:
+        app: Fully initialized FastAPI application
+        config: Server configuration (listeners and worker count)
+    """
+    sockets = bind_sockets(config)
+    state_dir = tempfile.mkdtemp(prefix="policy-server-state-")
+    database = os.path.join(state_dir, "shared.sqlite3")
+    session.use_shared_store(database)
+    ratelimit.use_shared_store(database)
+
+    # Move everything allocated so far out of the collector's reach so
+    # worker collections do not write to the shared pages
+    gc.collect()
+    gc.freeze()
+
+    workers: Dict[int, int] = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for index in range(config.workers):
+        workers[_spawn(app, sockets)] = index
+    logger.info(f"Started {config.workers} workers")
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        index = workers.pop(pid, None)
+        if index is None or stopping:
+            continue
+
+        logger.warning(
+            f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting"
+        )
+        # Avoid a tight fork loop when workers crash on startup
+        time.sleep(1)
+        if not stopping:
+            workers[_spawn(app, sockets)] = index
+
+    close_sockets(sockets, config)
+    session.use_shared_store(None)
+    ratelimit.use_shared_store(None)
+    shutil.rmtree(state_dir, ignore_errors=True)
+    logger.info("All workers stopped")
@@ -0,0 +1,293 @@
+"""
+Per-session rate limiting.
+
+Each (session, hook) pair gets a token bucket refilled at the hook's
+configured rate. A request that finds its bucket empty is not evaluated: the
+route answers with its default response, marked as rate limited. This keeps
+one agent stuck in a loop from starving every other session.
+
+Request counters are kept per session and hook and are served by the admin
+endpoints in server.py.
+
+Buckets and counters are kept in process memory by default. Pre-forked
+workers would each get their own, multiplying the effective limit by the
+worker count, so the master calls use_shared_store() before forking and all
+workers then share one SQLite database (see shared_store.py).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from .config import ServerConfig
+from .metrics import counter
+from .shared_store import SharedDatabase
+
+# Hook name used for limits that apply to every hook without its own limit
+ANY_HOOK = "*"
+
+RATE_LIMITED = counter(
+    "policy_rate_limited_total",
+    "Requests answered with the default response because their session was over its rate limit",
+)
+
+
+@dataclass
+class TokenBucket:
+    """Tokens refilled continuously at `rate` per second, up to `burst`."""
+
+    rate: float
+    burst: float
+    tokens: float
+    updated: float
+
+    def take(self, now: float) -> bool:
+        """Take one token if available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclass
+class _SessionState:
+    buckets: Dict[str, TokenBucket] = field(default_factory=dict)
+    allowed: Dict[str, int] = field(default_factory=dict)
+    limited: Dict[str, int] = field(default_factory=dict)
+    last_seen: float = 0.0
+
+
+class SessionRateLimiter:
+    """Token-bucket limits per session and hook.
+
+    Attributes:
+        limits: Mapping of hook name (or ANY_HOOK) to (rate per second, burst)
+        max_sessions: Sessions tracked before the least recently seen is dropped
+    """
+
+    def __init__(
+        self, limits: Dict[str, Tuple[float, float]], max_sessions: int = 10000
+    ):
+        self.limits = dict(limits)
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, _SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, session_id: str, hook: str) -> bool:
+        """
+        Count a request and check it against the session's limit for the hook.
+
+        Args:
+            session_id: Session or conversation ID
+            hook: Hook name (e.g. "PreToolUse")
+
+        Returns:
+            False if the request is over the limit and should not be evaluated
+        """
+        limit = self.limits.get(hook, self.limits.get(ANY_HOOK))
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = self._sessions[session_id] = _SessionState()
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            state.last_seen = now
+
+            allowed = True
+            if limit is not None:
+                bucket = state.buckets.get(hook)
+                if bucket is None:
+                    rate, burst = limit
+                    bucket = state.buckets[hook] = TokenBucket(rate, burst, burst, now)
+                allowed = bucket.take(now)
+
+            counts = state.allowed if allowed else state.limited
+            counts[hook] = counts.get(hook, 0) + 1
+
+        if not allowed:
+            RATE_LIMITED.inc(hook=hook)
+        return allowed
+
+    def session_stats(self, session_id: str) -> Optional[Dict[str, Dict[str, int]]]:
+        """Return allowed and limited request counts per hook for a session."""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return None
+            return {"allowed": dict(state.allowed), "limited": dict(state.limited)}
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Return request counts for every tracked session."""
+        with self._lock:
+            session_ids = list(self._sessions)
+        return {
+            session_id: stats
+            for session_id in session_ids
+            if (stats := self.session_stats(session_id)) is not None
+        }
+
+
+class SharedSessionRateLimiter(SessionRateLimiter):
+    """SessionRateLimiter whose state lives in an SQLite database.
+
+    Every process using the same database file enforces one shared limit per
+    session and hook and reports the same counts.
+
+    Attributes:
+        limits: Mapping of hook name (or ANY_HOOK) to (rate per second, burst)
+        max_sessions: Sessions tracked before the least recently seen is dropped
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, float]],
+        path: str,
+        max_sessions: int = 10000,
+    ):
+        super().__init__(limits, max_sessions)
+        self._db = SharedDatabase(
+            path,
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "session_id TEXT NOT NULL, hook TEXT NOT NULL, tokens REAL, updated REAL, "
+            "allowed INTEGER NOT NULL, limited INTEGER NOT NULL, last_seen REAL NOT NULL, "
+            "PRIMARY KEY (session_id, hook));"
+            "CREATE INDEX IF NOT EXISTS rate_limits_session_last_seen "
+            "ON rate_limits (session_id, last_seen);",
+        )
+
+    def allow(self, session_id: str, hook: str) -> bool:
+        limit = self.limits.get(hook, self.limits.get(ANY_HOOK))
+        # CLOCK_MONOTONIC is system-wide, so all workers agree on it
+        now = time.monotonic()
+
+        with self._lock, self._db.transaction() as conn:
+            row = conn.execute(
+                "SELECT tokens, updated FROM rate_limits "
+                "WHERE session_id = ? AND hook = ?",
+                (session_id, hook),
+            ).fetchone()
+            new_session = (
+                row is None
+                and conn.execute(
+                    "SELECT 1 FROM rate_limits WHERE session_id = ? LIMIT 1",
+                    (session_id,),
+                ).fetchone()
+                is None
+            )
+
+            allowed = True
+            tokens = updated = None
+            if limit is not None:
+                rate, burst = limit
+                if row is None or row[0] is None:
+                    bucket = TokenBucket(rate, burst, burst, now)
+                else:
+                    bucket = TokenBucket(rate, burst, row[0], row[1])
+                allowed = bucket.take(now)
+                tokens, updated = bucket.tokens, bucket.updated
+
+            conn.execute(
+                "INSERT INTO rate_limits VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (session_id, hook) DO UPDATE SET "
+                "tokens = excluded.tokens, updated = excluded.updated, "
+                "allowed = allowed + excluded.allowed, "
+                "limited = limited + excluded.limited, last_seen = excluded.last_seen",
+                (
+                    session_id,
+                    hook,
+                    tokens,
+                    updated,
+                    int(allowed),
+                    int(not allowed),
+                    now,
+                ),
+            )
+            if new_session:
+                conn.execute(
+                    "DELETE FROM rate_limits WHERE session_id IN ("
+                    "SELECT session_id FROM rate_limits GROUP BY session_id "
+                    "ORDER BY MAX(last_seen) DESC LIMIT -1 OFFSET ?)",
+                    (self.max_sessions,),
+                )
+
+        if not allowed:
+            RATE_LIMITED.inc(hook=hook)
+        return allowed
+
+    def session_stats(self, session_id: str) -> Optional[Dict[str, Dict[str, int]]]:
+        with self._lock:
+            rows = (
+                self._db.connection()
+                .execute(
+                    "SELECT hook, allowed, limited FROM rate_limits WHERE session_id = ?",
+                    (session_id,),
+                )
+                .fetchall()
+            )
+        if not rows:
+            return None
+        return {
+            "allowed": {hook: allowed for hook, allowed, _ in rows if allowed},
+            "limited": {hook: limited for hook, _, limited in rows if limited},
+        }
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        with self._lock:
+            rows = (
+                self._db.connection()
+                .execute(
+                    "SELECT session_id, hook, allowed, limited FROM rate_limits "
+                    "ORDER BY last_seen"
+                )
+                .fetchall()
+            )
+        sessions: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for session_id, hook, allowed, limited in rows:
+            stats = sessions.setdefault(session_id, {"allowed": {}, "limited": {}})
+            if allowed:
+                stats["allowed"][hook] = allowed
+            if limited:
+                stats["limited"][hook] = limited
+        return sessions
+
+
+# Set by use_shared_store(); None keeps limiter state in process memory
+_shared_path: Optional[str] = None
+
+rate_limiter = SessionRateLimiter({})
+
+
+def _limiter(limits: Dict[str, Tuple[float, float]]) -> SessionRateLimiter:
+    if _shared_path is not None:
+        return SharedSessionRateLimiter(limits, _shared_path)
+    return SessionRateLimiter(limits)
+
+
+def configure_rate_limits(config: ServerConfig) -> None:
+    """Replace the global limiter with one using the configured limits."""
+    global rate_limiter
+    rate_limiter = _limiter(config.rate_limits)
+
+
+def use_shared_store(path: Optional[str]) -> None:
+    """
+    Keep limiter state in an SQLite database that other processes can share.
+
+    Call before forking workers so each one inherits the limiter. The
+    current limits are kept; earlier counts are not carried over.
+
+    Args:
+        path: Database file, created if missing; None returns to the
+            in-memory limiter
+    """
+    global rate_limiter, _shared_path
+    _shared_path = path
+    rate_limiter = _limiter(rate_limiter.limits)
@@ -0,0 +1,66 @@
+"""
+Fast JSON rendering of hook responses.
+
+Routes return their output models through render_response() instead of
+letting FastAPI validate the model against response_model and serialize it
+again. Models are serialized once with pydantic-core's JSON serializer, and
+the most common fixed-shape responses (a plain allow/deny/ask with no
+messages) are served from byte templates the route modules register at
+import time.
+"""
+
+from typing import Dict, List, Optional, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+# Set on default responses served without evaluation, with the reason as value
+DEGRADED_HEADER = "X-Policy-Degraded"
+
+_templates: Dict[Type[BaseModel], List[Tuple[BaseModel, bytes]]] = {}
+
+
+def serialize(model: BaseModel) -> bytes:
+    """Serialize a model the way FastAPI would (by alias, without None fields)."""
+    return model.__pydantic_serializer__.to_json(
+        model, by_alias=True, exclude_none=True
+    )
+
+
+def register_template(model: BaseModel) -> None:
+    """Pre-render a response so equal responses are served from bytes."""
+    _templates.setdefault(type(model), []).append((model, serialize(model)))
+
+
+def render(model: BaseModel) -> bytes:
+    """
+    Render a response model to JSON bytes.
+
+    Args:
+        model: Hook output model
+
+    Returns:
+        JSON body, from a template when the model equals a registered one
+    """
+    for template, body in _templates.get(type(model), ()):
+        if model == template:
+            return body
+    return serialize(model)
+
+
+def render_response(model: BaseModel, degraded: Optional[str] = None) -> Response:
+    """
+    Wrap a rendered model in a JSON response.
+
+    Args:
+        model: Hook output model
+        degraded: Why the model is a default served without evaluating
+            policies ("overloaded", "rate_limited" or "timeout"), if it is
+
+    Returns:
+        JSON response, marked with DEGRADED_HEADER when degraded
+    """
+    response = Response(content=render(model), media_type="application/json")
+    if degraded:
+        response.headers[DEGRADED_HEADER] = degraded
+    return response
@@ -1,17 +1,33 @@
 import logging
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
+from src.evaluation import handlers
+from src.evaluation.grammar import GrammarError
+
+from . import ratelimit
+from .admission import configure_admission
+from .audit import configure_audit
 from .claude_code import router as claude_code_router
+from .config import config
 from .cursor import router as cursor_router
+from .logs import setup_logging
+from .metrics import render_metrics
 from .registry import registry
+from .stream import router as stream_router
 
-logging.basicConfig(level=logging.INFO)
+setup_logging(config)
+configure_audit(config)
+configure_admission(config)
+ratelimit.configure_rate_limits(config)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="DevLeaps Policy Server", version="1.0.0")
 app.include_router(claude_code_router)
 app.include_router(cursor_router)
+app.include_router(stream_router)
 
 
 @app.get("/")
@@ -41,10 +57,51 @@ async def root():
                 "/policy/cursor/beforeSubmitPrompt",
                 "/policy/cursor/stop",
             ],
+            "stream": ["/policy/stream"],
+            "metrics": ["/metrics"],
+            "admin": [
+                "/admin/sessions",
+                "/admin/sessions/{session_id}",
+                "/admin/reload",
+            ],
         },
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics for admission control and auditing."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/admin/sessions")
+async def session_request_counts():
+    """Allowed and rate-limited request counts per session and hook."""
+    return {
+        "limits": ratelimit.rate_limiter.limits,
+        "sessions": ratelimit.rate_limiter.stats(),
+    }
+
+
+@app.get("/admin/sessions/{session_id}")
+async def session_request_count(session_id: str):
+    """Allowed and rate-limited request counts per hook for one session."""
+    stats = ratelimit.rate_limiter.session_stats(session_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    return stats
+
+
+@app.post("/admin/reload")
+async def reload_policies():
+    """Reload Rego policies and command grammars from disk."""
+    try:
+        await run_in_threadpool(handlers.reload_policies)
+    except GrammarError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "reloaded"}
+
+
 def get_registry():
     """Get the global hook registry for registering handlers."""
     return registry
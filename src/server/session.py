@@ -3,13 +3,22 @@ Session flag management for policy enforcement.
 
 Provides flag setting/checking with invocation count and time-based expiration.
 Thread-safe storage keyed by session ID.
+
+Flags are kept in process memory by default. Pre-forked workers each have
+their own memory, so the master calls use_shared_store() before forking and
+all workers then keep flags in one SQLite database instead. A session then
+sees the same flags and invocation counts whichever worker serves it.
 """
 
+import json
+import sqlite3
 import time
 import threading
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
 
+from .shared_store import SharedDatabase
+
 # Thread lock for flag operations
 _flags_lock = threading.Lock()
 
@@ -64,6 +73,105 @@ class Flag:
             self.invocations_remaining -= 1
 
 
+class _SharedFlagStore:
+    """Flags in an SQLite database shared by several processes.
+
+    Every operation runs in one statement or transaction, so concurrent
+    workers never lose an update or an invocation count.
+    """
+
+    def __init__(self, path: str):
+        self._db = SharedDatabase(
+            path,
+            "CREATE TABLE IF NOT EXISTS flags ("
+            "session_id TEXT NOT NULL, name TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires_after INTEGER, expires_unit TEXT, created_at REAL, "
+            "invocations_remaining INTEGER, PRIMARY KEY (session_id, name))",
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._db.connection()
+
+    def _flags(self, conn: sqlite3.Connection, session_id: str) -> List[Flag]:
+        rows = conn.execute(
+            "SELECT name, value, expires_after, expires_unit, created_at, "
+            "invocations_remaining FROM flags WHERE session_id = ?",
+            (session_id,),
+        )
+        flags = []
+        for name, value, expires_after, expires_unit, created_at, remaining in rows:
+            flag = Flag(
+                name=name,
+                value=json.loads(value),
+                expires_after=expires_after,
+                expires_unit=expires_unit,
+                created_at=created_at,
+            )
+            flag.invocations_remaining = remaining
+            flags.append(flag)
+        return flags
+
+    def set_flag(self, session_id: str, flag: Flag) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO flags VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                session_id,
+                flag.name,
+                json.dumps(flag.value),
+                flag.expires_after,
+                flag.expires_unit,
+                flag.created_at,
+                flag.invocations_remaining,
+            ),
+        )
+
+    def get_flags(self, session_id: str) -> List[Flag]:
+        return self._flags(self._connection(), session_id)
+
+    def cleanup_expired(self, session_id: str) -> None:
+        with self._db.transaction() as conn:
+            conn.executemany(
+                "DELETE FROM flags WHERE session_id = ? AND name = ?",
+                [
+                    (session_id, flag.name)
+                    for flag in self._flags(conn, session_id)
+                    if flag.is_expired()
+                ],
+            )
+
+    def decrement_invocations(self, session_id: str) -> None:
+        self._connection().execute(
+            "UPDATE flags SET invocations_remaining = invocations_remaining - 1 "
+            "WHERE session_id = ? AND expires_unit = 'invocations' "
+            "AND invocations_remaining IS NOT NULL",
+            (session_id,),
+        )
+
+    def clear(self, session_id: str) -> None:
+        self._connection().execute(
+            "DELETE FROM flags WHERE session_id = ?", (session_id,)
+        )
+
+
+# Set by use_shared_store(); None keeps flags in process memory
+_shared_store: Optional[_SharedFlagStore] = None
+
+
+def use_shared_store(path: Optional[str]) -> None:
+    """
+    Keep flags in an SQLite database that other processes can share.
+
+    Call before forking workers so each one inherits the setting.
+
+    Args:
+        path: Database file, created if missing; None returns to the
+            in-memory store
+    """
+    global _shared_store
+    with _flags_lock:
+        _shared_store = _SharedFlagStore(path) if path is not None else None
+
+
 def initialize_flags_storage():
     """Initialize flags storage."""
     # Already initialized as module-level dict
@@ -82,17 +190,21 @@ def set_flag(session_id: str, flag_spec: Dict[str, Any]) -> None:
             - expires_after (optional): Expiration count/duration
             - expires_unit (optional): "invocations" or "seconds"
     """
+    flag = Flag(
+        name=flag_spec["name"],
+        value=flag_spec.get("value", True),
+        expires_after=flag_spec.get("expires_after"),
+        expires_unit=flag_spec.get("expires_unit"),
+    )
+
     with _flags_lock:
+        if _shared_store is not None:
+            _shared_store.set_flag(session_id, flag)
+            return
+
         if session_id not in _session_flags:
             _session_flags[session_id] = {}
 
-        flag = Flag(
-            name=flag_spec["name"],
-            value=flag_spec.get("value", True),
-            expires_after=flag_spec.get("expires_after"),
-            expires_unit=flag_spec.get("expires_unit"),
-        )
-
         _session_flags[session_id][flag_spec["name"]] = flag
 
 
@@ -109,10 +221,14 @@ def get_flag(session_id: str, name: str, value: Any = None) -> bool:
         True if flag exists (and matches value if provided), False otherwise
     """
     with _flags_lock:
-        if session_id not in _session_flags:
+        if _shared_store is not None:
+            flags = {f.name: f for f in _shared_store.get_flags(session_id)}
+        elif session_id in _session_flags:
+            flags = _session_flags[session_id]
+        else:
             return False
 
-        flag = _session_flags[session_id].get(name)
+        flag = flags.get(name)
         if flag is None or flag.is_expired():
             return False
 
@@ -130,6 +246,10 @@ def cleanup_expired_flags(session_id: str) -> None:
         session_id: Session identifier
     """
     with _flags_lock:
+        if _shared_store is not None:
+            _shared_store.cleanup_expired(session_id)
+            return
+
         if session_id not in _session_flags:
             return
 
@@ -151,6 +271,10 @@ def decrement_invocation_flags(session_id: str) -> None:
         session_id: Session identifier
     """
     with _flags_lock:
+        if _shared_store is not None:
+            _shared_store.decrement_invocations(session_id)
+            return
+
         if session_id not in _session_flags:
             return
 
@@ -166,7 +290,9 @@ def clear_flags(session_id: str) -> None:
         session_id: Session identifier
     """
     with _flags_lock:
-        if session_id in _session_flags:
+        if _shared_store is not None:
+            _shared_store.clear(session_id)
+        elif session_id in _session_flags:
             del _session_flags[session_id]
 
 
@@ -181,11 +307,11 @@ def get_all_flags(session_id: str) -> Dict[str, Any]:
         Dict mapping flag names to their values
     """
     with _flags_lock:
-        if session_id not in _session_flags:
+        if _shared_store is not None:
+            flags = _shared_store.get_flags(session_id)
+        elif session_id in _session_flags:
+            flags = list(_session_flags[session_id].values())
+        else:
             return {}
 
-        return {
-            name: flag.value
-            for name, flag in _session_flags[session_id].items()
-            if not flag.is_expired()
-        }
+        return {flag.name: flag.value for flag in flags if not flag.is_expired()}
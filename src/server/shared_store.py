@@ -0,0 +1,74 @@
+"""
+SQLite database shared by pre-forked worker processes.
+
+State that must be the same whichever worker serves a request (session
+flags, rate limit buckets and counters) is kept in process memory by
+default. serve_prefork() creates one database file before forking and
+points those stores at it, so all workers read and write the same state.
+
+The database only lives as long as the server, so it is opened without
+durable commits.
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Seconds to wait for another worker's write to finish
+SHARED_STORE_TIMEOUT = 5.0
+
+
+class SharedDatabase:
+    """One SQLite file, with a connection per process.
+
+    Connections must not cross a fork, so each process opens its own on
+    first use. A connection is shared by the threads of its process; callers
+    serialize access with their own lock.
+    """
+
+    def __init__(self, path: str, schema: str):
+        """Open the database, creating the schema's tables if missing.
+
+        Args:
+            path: Database file
+            schema: SQL statements run once, e.g. CREATE TABLE IF NOT EXISTS
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(schema)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=SHARED_STORE_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA synchronous=OFF")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Return this process's connection (autocommit mode)."""
+        if self._pid != os.getpid():
+            self._conn = self._connect()
+            self._pid = os.getpid()
+        return self._conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction; no other worker writes between them."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
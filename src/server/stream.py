@@ -0,0 +1,130 @@
+"""
+Multiplexed WebSocket channel for hook events.
+
+A client opens one connection per agent session on /policy/stream and sends
+framed hook events instead of one HTTP POST per event:
+
+    {"id": "42", "hook": "claude-code/PreToolUse", "body": {...}}
+
+`hook` names any HTTP hook route below /policy/ and `body` is the request
+body that route accepts. The frame is evaluated by the same route function
+(and so the same execute_handlers_generic pipeline), and the response is
+sent back tagged with the request ID:
+
+    {"id": "42", "status": 200, "body": {...}}
+
+Default responses served without evaluation (overload shedding or session
+rate limits) also carry the reason, e.g. `"degraded": "rate_limited"`. Failed frames get a non-200 status and an `error` instead of a body.
+Frames on one connection are evaluated in the order received, so session
+flags set by one event are visible to the next.
+"""
+
+import inspect
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from fastapi import APIRouter, Response, WebSocket, WebSocketDisconnect
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
+
+from .claude_code import router as claude_code_router
+from .cursor import router as cursor_router
+from .responses import DEGRADED_HEADER
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+_ROUTE_PREFIX = "/policy/"
+
+HookEndpoint = Tuple[Type[BaseModel], Callable[[BaseModel], Awaitable[Response]]]
+
+
+def _build_hook_table() -> Dict[str, HookEndpoint]:
+    """Map hook names (e.g. "cursor/stop") to their body model and route function."""
+    table: Dict[str, HookEndpoint] = {}
+    for hook_router in (claude_code_router, cursor_router):
+        for route in hook_router.routes:
+            if not isinstance(route, APIRoute) or "POST" not in route.methods:
+                continue
+            parameters = list(inspect.signature(route.endpoint).parameters.values())
+            if len(parameters) != 1:
+                continue
+            table[route.path.removeprefix(_ROUTE_PREFIX)] = (
+                parameters[0].annotation,
+                route.endpoint,
+            )
+    return table
+
+
+_HOOKS = _build_hook_table()
+
+
+def _error(request_id: Any, status: int, error: Any) -> str:
+    return json.dumps({"id": request_id, "status": status, "error": error})
+
+
+async def handle_frame(frame: Dict[str, Any]) -> str:
+    """
+    Evaluate one framed hook event.
+
+    Args:
+        frame: Decoded frame with `id`, `hook` and `body`
+
+    Returns:
+        Encoded response frame correlated by the request ID
+    """
+    request_id = frame.get("id")
+    hook = frame.get("hook")
+
+    endpoint = _HOOKS.get(hook) if isinstance(hook, str) else None
+    if endpoint is None:
+        return _error(request_id, 404, f"Unknown hook: {hook}")
+    body_model, handler = endpoint
+
+    try:
+        input_data = body_model.model_validate(frame.get("body"))
+    except ValidationError as e:
+        return _error(request_id, 422, json.loads(e.json()))
+
+    try:
+        # Route functions construct their own editor models from the body
+        response = await handler(input_data)
+    except ValidationError as e:
+        return _error(request_id, 422, json.loads(e.json()))
+    except Exception as e:
+        logger.error(f"Error handling stream frame for {hook}: {e}", exc_info=True)
+        return _error(request_id, 500, "Internal server error")
+
+    # Splice the already rendered route body into the frame
+    reason = response.headers.get(DEGRADED_HEADER)
+    degraded = f',"degraded":{json.dumps(reason)}' if reason else ""
+    return (
+        f'{{"id":{json.dumps(request_id)},"status":200{degraded},'
+        f'"body":{response.body.decode()}}}'
+    )
+
+
+@router.websocket("/policy/stream")
+async def policy_stream(websocket: WebSocket):
+    """Evaluate framed hook events over a persistent WebSocket connection."""
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            frame: Optional[Dict[str, Any]] = None
+            try:
+                frame = json.loads(message)
+            except json.JSONDecodeError:
+                pass
+
+            if not isinstance(frame, dict):
+                await websocket.send_text(
+                    _error(None, 400, "Frame must be a JSON object")
+                )
+                continue
+
+            await websocket.send_text(await handle_frame(frame))
+    except WebSocketDisconnect:
+        logger.debug("Policy stream client disconnected")
@@ -0,0 +1,29 @@
+"""Guidance checks for sandbox tests.
+
+Workers import check functions by reference, so these live in a module of
+their own that imports nothing heavier than the models.
+"""
+
+import os
+import time
+
+from src.server.models import PolicyGuidance
+
+
+def quick_check(event):
+    yield PolicyGuidance(content=f"quick {event.file_path}")
+
+
+def slow_check(event):
+    time.sleep(30)
+    yield PolicyGuidance(content="slow")
+
+
+def memory_check(event):
+    blocks = [bytearray(64 * 1024 * 1024) for _ in range(16)]
+    yield PolicyGuidance(content=f"allocated {len(blocks)}")
+
+
+def crashing_check(event):
+    os._exit(1)
+    yield
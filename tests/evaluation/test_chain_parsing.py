@@ -0,0 +1,155 @@
+"""Tests for splitting command chains and parsing segments independently."""
+
+from dataclasses import asdict
+
+import pytest
+from src.evaluation.chain import split_chain
+from src.evaluation.handlers import evaluate_bash_rules
+from src.evaluation.limits import CommandLimits
+from src.evaluation.parser import BashCommandParser, CommandTooComplex, ParseError
+from src.server.enums import SourceClient
+from src.server.models import PolicyAction, ToolUseEvent
+from tests.evaluation.test_simple_parser import CORPUS
+
+
+def _segments(command):
+    chain = split_chain(command)
+    if chain is None:
+        return None
+    return [[command[start:end] for start, end in spans] for spans in chain.pipelines]
+
+
+@pytest.mark.parametrize(
+    "command,segments",
+    [
+        ("ls && pwd", [["ls"], ["pwd"]]),
+        ("cat a | sort | uniq -c", [["cat a", "sort", "uniq -c"]]),
+        ("a | b && c || d ; e", [["a", "b"], ["c"], ["d"], ["e"]]),
+        ("ls && pwd;", [["ls"], ["pwd"]]),
+        ("echo 'a && b' \"c | d\" && ls", [["echo 'a && b' \"c | d\""], ["ls"]]),
+        ("diff <(ls; pwd) b && ls", [["diff <(ls; pwd) b"], ["ls"]]),
+        ("echo ${a:-x;y} | cat", [["echo ${a:-x;y}", "cat"]]),
+        ("make 2>&1 >&2 &>log && ls", [["make 2>&1 >&2 &>log"], ["ls"]]),
+        ("echo a\\;b ; ls", [["echo a\\;b"], ["ls"]]),
+        ("ls >| out && pwd", [["ls >| out"], ["pwd"]]),
+    ],
+)
+def test_split_chain(command, segments):
+    assert _segments(command) == segments
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        "ls",
+        "ls;",
+        "ls &",
+        "ls & pwd",
+        "ls |& cat",
+        "ls\npwd",
+        "ls # && pwd",
+        "for f in a; do echo $f; done",
+        "(cd a; ls) && pwd",
+        "{ ls; pwd; }",
+        "ls && && pwd",
+        "ls &&",
+        "ls | | cat",
+        'echo "$(ls; pwd)" && ls',
+        "cat <<EOF && ls",
+        "echo 'unterminated && ls",
+    ],
+)
+def test_split_chain_leaves_command_to_bashlex(command):
+    assert split_chain(command) is None
+
+
+CHAINS = [
+    "a | b && c",
+    "a|b|c",
+    "x && y | z || w",
+    "ls; pwd;",
+    "ls > out.txt 2>&1 && cat a | grep 'x y' ; git commit -m \"msg\"",
+    "diff <(sort a) <(sort b) | head -n 5",
+    "echo ${HOME} | cat && git push --force origin main",
+    "  git add .   &&   git commit -m wip  ",
+    "pytest -x tests/ || uv run pytest --lf",
+    "cat < in.txt | sort -u > out.txt; wc -l out.txt",
+]
+
+
+@pytest.mark.parametrize(
+    "command", [c for c in CORPUS if split_chain(c) is not None] + CHAINS
+)
+def test_chain_parse_matches_bashlex(command):
+    try:
+        whole = BashCommandParser._parse_bashlex(command)
+    except ParseError:
+        return
+    split = BashCommandParser._parse_uncached(command)
+    assert split.unsupported == []
+    assert asdict(split) == asdict(whole)
+
+
+def test_unsupported_segment_does_not_fail_chain():
+    parsed = BashCommandParser.parse("git status && echo $(whoami) && ls src")
+
+    assert parsed.executable == "git"
+    assert [c.executable for c in parsed.chained] == ["ls"]
+    assert parsed.unsupported == ["echo $(whoami)"]
+
+
+def test_chain_fails_when_no_segment_parses():
+    with pytest.raises(ParseError, match="Command substitution"):
+        BashCommandParser.parse("echo $(a) && echo $(b)")
+
+
+def test_new_segment_costs_one_parse(monkeypatch):
+    segments = [f"echo step{i}" for i in range(19)]
+    BashCommandParser.parse(" && ".join(segments + ["ls -la"]))
+
+    parsed_segments = []
+    parse_segment = BashCommandParser._parse_segment.__func__
+
+    def spy(cls, segment):
+        parsed_segments.append(segment)
+        return parse_segment(cls, segment)
+
+    monkeypatch.setattr(BashCommandParser, "_parse_segment", classmethod(spy))
+    parsed = BashCommandParser.parse(
+        " && ".join(segments + ["git log -n 3 chain-test"])
+    )
+
+    assert parsed_segments == ["git log -n 3 chain-test"]
+    assert parsed.chained[-1].subcommand == "log"
+    assert parsed.chained[-1].get_command_text() == "git log -n 3 chain-test"
+
+
+def test_segment_limit_applies_to_joined_chain():
+    BashCommandParser.configure_limits(CommandLimits(max_segments=4))
+    try:
+        with pytest.raises(CommandTooComplex):
+            BashCommandParser.parse("diff <(cat a) <(cat b) && comm <(cat c) x")
+    finally:
+        BashCommandParser.configure_limits(CommandLimits())
+
+
+def _decisions(command):
+    event = ToolUseEvent(
+        session_id="chain-session",
+        source_client=SourceClient.CLAUDE_CODE,
+        tool_name="Bash",
+        tool_is_bash=True,
+        command=command,
+    )
+    return list(evaluate_bash_rules(event))
+
+
+def test_unsupported_segment_asks():
+    decisions = _decisions("pwd && echo $(whoami)")
+    asks = [d for d in decisions if d.action == PolicyAction.ASK]
+    assert any("echo $(whoami)" in (d.reason or "") for d in asks)
+
+
+def test_deny_in_chain_with_unsupported_segment_still_denies():
+    decisions = _decisions("echo $(whoami) && sudo rm -rf build")
+    assert any(d.action == PolicyAction.DENY for d in decisions)
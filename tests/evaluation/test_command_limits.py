@@ -0,0 +1,96 @@
+"""Tests for command complexity limits."""
+
+import pytest
+from src.evaluation.handlers import evaluate_bash_rules
+from src.evaluation.limits import CommandLimits, scan_shape
+from src.evaluation.parser import BashCommandParser, CommandTooComplex
+from src.server.enums import SourceClient
+from src.server.models import PolicyAction, ToolUseEvent
+
+SMALL = CommandLimits(max_length=200, max_segments=4, max_depth=2, max_heredoc_bytes=50)
+
+
+@pytest.fixture
+def small_limits():
+    BashCommandParser.configure_limits(SMALL)
+    yield
+    BashCommandParser.configure_limits(CommandLimits())
+
+
+@pytest.mark.parametrize(
+    "command,separators,depth",
+    [
+        ("git status", 0, 0),
+        ("ls && pwd || echo hi; cat a | sort &", 5, 0),
+        ("echo 'a && b | c' \"d ; e\"", 0, 0),
+        ("make 2>&1 &> log >&2", 0, 0),
+        ("diff <(sort <(cat a)) b", 0, 2),
+        ("echo \\; \\| \\(", 0, 0),
+        ("cat <<< 'x' && ls", 1, 0),
+    ],
+)
+def test_scan_shape(command, separators, depth):
+    shape = scan_shape(command)
+    assert (shape.separators, shape.depth) == (separators, depth)
+
+
+def test_heredoc_bodies_do_not_count_towards_shape(small_limits):
+    parsed = BashCommandParser.parse("cat > f <<EOF && ls\n; | ( ) ; | ;\nEOF")
+    assert parsed.redirects[1].content == "; | ( ) ; | ;"
+
+
+def test_heredoc_bodies_do_not_count_towards_length(small_limits):
+    body = "x" * 40
+    parsed = BashCommandParser.parse(f"cat > f <<EOF\n{body}\nEOF\n" + "ls " * 50)
+    assert parsed.redirects[1].content == body
+
+
+@pytest.mark.parametrize(
+    "command,limit",
+    [
+        ("echo " + "a" * 300, "max_length"),
+        ("ls && ls && ls && ls && ls", "max_segments"),
+        ("diff <(diff <(diff <(cat a) b) c) d", "max_depth"),
+        ("cat > f <<EOF\n" + "line\n" * 20 + "EOF", "max_heredoc_bytes"),
+    ],
+)
+def test_commands_over_limits_are_rejected(small_limits, command, limit):
+    with pytest.raises(CommandTooComplex) as exc_info:
+        BashCommandParser.parse(command)
+    assert exc_info.value.limit == limit
+
+
+def test_segment_limit_counts_process_substitutions(small_limits):
+    # Two separators in the text, but five commands once parsed
+    command = "diff <(cat a) <(cat b) && comm <(cat c) <(cat d)"
+    assert scan_shape(command).separators + 1 <= SMALL.max_segments
+    with pytest.raises(CommandTooComplex) as exc_info:
+        BashCommandParser.parse(command)
+    assert exc_info.value.limit == "max_segments"
+
+
+def test_commands_within_limits_parse(small_limits):
+    parsed = BashCommandParser.parse("ls && pwd | sort")
+    assert parsed.executable == "ls"
+
+
+def test_rejection_is_cached_and_rebuilt_intact(small_limits):
+    command = "ls; ls; ls; ls; ls"
+    for _ in range(2):
+        with pytest.raises(CommandTooComplex) as exc_info:
+            BashCommandParser.parse(command)
+        assert exc_info.value.limit == "max_segments"
+        assert str(exc_info.value) == "Command has more than 4 segments"
+
+
+def test_over_limit_command_gets_limit_decision(small_limits):
+    event = ToolUseEvent(
+        session_id="limits-session",
+        source_client=SourceClient.CLAUDE_CODE,
+        tool_name="Bash",
+        tool_is_bash=True,
+        command="ls && ls && ls && ls && ls",
+    )
+    [decision] = list(evaluate_bash_rules(event))
+    assert decision.action == PolicyAction.ASK
+    assert "more than 4 segments" in decision.reason
@@ -0,0 +1,138 @@
+"""Tests for static session flag dependency tracking."""
+
+import pytest
+from src.evaluation.dependencies import FlagDependencies
+from src.evaluation.parser import BashCommandParser
+from src.evaluation.rego import RegoEvaluator
+from src.server.enums import SourceClient
+from src.server.models import ToolUseEvent
+from src.server.session import clear_flags, set_flag
+
+BUNDLES = ["universal", "demo_flags"]
+
+
+@pytest.fixture(scope="module")
+def evaluator():
+    return RegoEvaluator(policy_dir="policies")
+
+
+def _event(command: str, session_id: str) -> ToolUseEvent:
+    return ToolUseEvent(
+        session_id=session_id,
+        source_client=SourceClient.CLAUDE_CODE,
+        tool_name="Bash",
+        tool_is_bash=True,
+        command=command,
+    )
+
+
+def test_universal_bundle_reads_no_flags(evaluator):
+    flags = evaluator.flag_dependencies.flags_read(["universal"], [("git", "status")])
+    assert flags == frozenset()
+
+
+def test_guarded_rules_only_apply_to_their_commands(evaluator):
+    deps = evaluator.flag_dependencies
+    assert "passed_lint" not in deps.flags_read(BUNDLES, [("git", "status")])
+    assert "ran_tests" in deps.flags_read(BUNDLES, [("git", "commit")])
+    assert {"passed_lint", "passed_tests"} <= deps.flags_read(
+        BUNDLES, [("docker", "push")]
+    )
+
+
+def test_dynamic_flag_read_depends_on_all_flags():
+    deps = FlagDependencies.from_modules(
+        [
+            (
+                "dynamic.rego",
+                "package dynamic\n\n"
+                "decisions[decision] if {\n"
+                '\tsome name in ["a", "b"]\n'
+                "\tinput.session_flags[name]\n"
+                '\tdecision := {"action": "deny"}\n'
+                "}\n",
+            )
+        ]
+    )
+    assert deps.flags_read(["dynamic"], [("ls", None)]) is None
+
+
+def test_accessor_with_alias_is_tracked():
+    deps = FlagDependencies.from_modules(
+        [
+            (
+                "aliased.rego",
+                "package aliased\n\n"
+                "import data.helpers.flags as f\n\n"
+                "decisions[decision] if {\n"
+                '\tinput.parsed.executable in {"make", "cmake"}\n'
+                '\tf.is_set("built")\n'
+                '\tdecision := {"action": "allow"}\n'
+                "}\n",
+            )
+        ]
+    )
+    assert deps.flags_read(["aliased"], [("make", None)]) == {"built"}
+    assert deps.flags_read(["aliased"], [("ls", None)]) == frozenset()
+
+
+IMPORT_CHAIN = [
+    (
+        "entry.rego",
+        "package entry\n\n"
+        "import data.middle\n\n"
+        "decisions[decision] if {\n"
+        '\tinput.parsed.executable == "deploy"\n'
+        "\tmiddle.ready\n"
+        '\tdecision := {"action": "allow"}\n'
+        "}\n",
+    ),
+    (
+        "middle.rego",
+        "package middle\n\n" "import data.leaf\n\n" "ready if leaf.tested\n",
+    ),
+    (
+        "leaf.rego",
+        "package leaf\n\n"
+        "import data.helpers.flags\n\n"
+        'tested if flags.is_set("tests_passed")\n',
+    ),
+]
+
+
+@pytest.mark.parametrize("modules", [IMPORT_CHAIN, IMPORT_CHAIN[::-1]])
+def test_flags_read_through_import_chain(modules):
+    deps = FlagDependencies.from_modules(modules)
+    assert deps.flags_read(["entry"], [("deploy", None)]) == {"tests_passed"}
+    assert deps.flags_read(["middle"], [("ls", None)]) == {"tests_passed"}
+
+
+def test_git_status_cache_survives_workflow_flag_changes(evaluator):
+    session_id = "flag-deps-session"
+    clear_flags(session_id)
+    command = "git status"
+    parsed = BashCommandParser.parse(command)
+
+    evaluator.evaluate(_event(command, session_id), parsed, BUNDLES)
+    set_flag(session_id, {"name": "passed_lint", "value": True})
+    set_flag(session_id, {"name": "passed_tests", "value": True})
+    hits_before = evaluator.decision_cache.hits
+    evaluator.evaluate(_event(command, session_id), parsed, BUNDLES)
+
+    assert evaluator.decision_cache.hits == hits_before + 1
+    clear_flags(session_id)
+
+
+def test_relevant_flag_change_invalidates_cache(evaluator):
+    session_id = "flag-deps-session-commit"
+    clear_flags(session_id)
+    command = "git commit -m msg"
+    parsed = BashCommandParser.parse(command)
+
+    denied = evaluator.evaluate(_event(command, session_id), parsed, BUNDLES)
+    set_flag(session_id, {"name": "ran_tests", "value": True})
+    allowed = evaluator.evaluate(_event(command, session_id), parsed, BUNDLES)
+
+    assert "deny" in [d.action for d in denied]
+    assert "deny" not in [d.action for d in allowed]
+    clear_flags(session_id)
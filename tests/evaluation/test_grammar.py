@@ -0,0 +1,203 @@
+"""Tests for per-executable command grammars."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.evaluation import handlers
+from src.evaluation.grammar import GrammarError, compile_grammar, load_grammar
+from src.evaluation.parser import BashCommandParser
+from src.server.enums import SourceClient
+from src.server.models import PolicyAction, ToolUseEvent
+from src.server.server import app
+
+
+@pytest.fixture
+def grammar_dir(tmp_path, monkeypatch):
+    """Point the parser at a temporary grammar directory."""
+    monkeypatch.setattr(handlers, "GRAMMAR_DIR", tmp_path)
+    yield tmp_path
+    BashCommandParser.configure_grammar(load_grammar(handlers.POLICY_DIR / "grammar"))
+
+
+def _use(directory):
+    BashCommandParser.configure_grammar(load_grammar(directory))
+
+
+def test_bundled_grammars_load():
+    grammar = load_grammar(handlers.GRAMMAR_DIR)
+    assert grammar.get("git").is_subcommand("status")
+    assert grammar.get("cat") is None
+
+
+@pytest.mark.parametrize(
+    "command,subcommand,arguments,flags,options",
+    [
+        ("git commit --amend file.py", "commit", ["file.py"], ["--amend"], {}),
+        ("git push --force origin main", "push", ["origin", "main"], ["--force"], {}),
+        ("git -C sub status -s", "status", [], ["-s"], {"-C": "sub"}),
+        ("git commit -m -fix-", "commit", [], [], {"-m": "-fix-"}),
+        ("git log -n 5 --oneline", "log", [], ["--oneline"], {"-n": "5"}),
+        # Undeclared flags keep the "next word is the value" guess
+        ("git branch -D old", "branch", [], [], {"-D": "old"}),
+        ("ls -la src", None, ["src"], ["-la"], {}),
+        (
+            "ls -l --sort size -I __pycache__ src",
+            None,
+            ["src"],
+            ["-l"],
+            {"--sort": "size", "-I": "__pycache__"},
+        ),
+        (
+            "docker run -it --rm ubuntu bash",
+            "run",
+            ["ubuntu", "bash"],
+            ["-it", "--rm"],
+            {},
+        ),
+        (
+            "docker run -e A=1 -v src:/src ubuntu ls -la /src",
+            "run",
+            ["ubuntu", "ls", "-la", "/src"],
+            [],
+            {"-e": "A=1", "-v": "src:/src"},
+        ),
+        (
+            "docker build --no-cache -t app .",
+            "build",
+            ["."],
+            ["--no-cache"],
+            {"-t": "app"},
+        ),
+        (
+            "kubectl exec -it web -- ls -la",
+            "exec",
+            ["web", "--", "ls", "-la"],
+            ["-it"],
+            {},
+        ),
+        ("pip install -U requests", "install", ["requests"], ["-U"], {}),
+    ],
+)
+def test_bundled_grammars_parse(command, subcommand, arguments, flags, options):
+    parsed = BashCommandParser.parse(command)
+    assert parsed.subcommand == subcommand
+    assert parsed.arguments == arguments
+    assert parsed.flags == flags
+    assert parsed.options == options
+
+
+def test_subcommand_list_and_sections(grammar_dir):
+    (grammar_dir / "tool.grammar.toml").write_text(
+        'subcommands = ["run"]\n'
+        'value_flags = ["--config"]\n'
+        "[subcommand.build]\n"
+        'boolean_flags = ["--release"]\n'
+    )
+    _use(grammar_dir)
+
+    run = BashCommandParser.parse("tool --config c.toml run target")
+    assert (run.subcommand, run.options, run.arguments) == (
+        "run",
+        {"--config": "c.toml"},
+        ["target"],
+    )
+    build = BashCommandParser.parse("tool build --release target")
+    assert (build.subcommand, build.flags, build.arguments) == (
+        "build",
+        ["--release"],
+        ["target"],
+    )
+    other = BashCommandParser.parse("tool other --release x")
+    assert (other.subcommand, other.options) == (None, {"--release": "x"})
+
+
+def test_executable_name_override(grammar_dir):
+    (grammar_dir / "anything.grammar.toml").write_text(
+        'executable = "docker-compose"\nsubcommands = "any"\n'
+    )
+    _use(grammar_dir)
+    assert BashCommandParser.parse("docker-compose up").subcommand == "up"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"subcommands": "some"},
+        {"value_flags": "-m"},
+        {"value_flags": ["-m"], "boolean_flags": ["-m"]},
+        {"flags": ["-m"]},
+        {"subcommand": {"run": {"subcommands": ["x"]}}},
+        {"positionals": -1},
+        {"positionals": True},
+        {"subcommands": "any", "positionals": 1},
+        {"subcommand": {"run": {"positionals": "1"}}},
+    ],
+)
+def test_malformed_grammar_rejected(data):
+    with pytest.raises(GrammarError):
+        compile_grammar(data, "test.grammar.toml")
+
+
+def test_short_flag_clusters_and_positional_arity(grammar_dir):
+    (grammar_dir / "tool.grammar.toml").write_text(
+        'boolean_flags = ["-x", "-z", "-v"]\n'
+        'value_flags = ["-f", "-n"]\n'
+        "positionals = 1\n"
+    )
+    _use(grammar_dir)
+
+    def parse(command):
+        parsed = BashCommandParser.parse(command)
+        return parsed.arguments, parsed.flags, parsed.options
+
+    assert parse("tool -xzf out.tgz src") == (["src"], [], {"-xzf": "out.tgz"})
+    assert parse("tool -xv src") == (["src"], ["-xv"], {})
+    assert parse("tool -n5 src") == (["src"], ["-n5"], {})
+    # An undeclared letter falls back to guessing
+    assert parse("tool -xq src") == ([], [], {"-xq": "src"})
+    # Past the positional arity, flags belong to the next command
+    assert parse("tool src -v -f x") == (["src", "-v", "-f", "x"], [], {})
+
+
+@pytest.mark.parametrize(
+    "command,action",
+    [
+        ("ls -la src", PolicyAction.ALLOW),
+        ("ls -la /tmp", PolicyAction.DENY),
+    ],
+)
+def test_ls_flags_do_not_hide_paths(command, action):
+    event = ToolUseEvent(
+        session_id="grammar-session",
+        source_client=SourceClient.CLAUDE_CODE,
+        tool_name="Bash",
+        tool_is_bash=True,
+        command=command,
+    )
+    decisions = list(handlers.evaluate_bash_rules(event))
+    assert [d.action for d in decisions] == [action]
+
+
+def test_parser_loads_shipped_grammar_without_handlers(monkeypatch):
+    monkeypatch.setattr(BashCommandParser, "grammar", None)
+    parsed = BashCommandParser.parse("git commit -m lazily-loaded")
+    assert (parsed.subcommand, parsed.options) == ("commit", {"-m": "lazily-loaded"})
+
+
+def test_reload_swaps_grammar(grammar_dir):
+    (grammar_dir / "tool.grammar.toml").write_text('subcommands = "any"\n')
+    client = TestClient(app)
+
+    assert client.post("/admin/reload").json() == {"status": "reloaded"}
+    assert BashCommandParser.parse("tool run").subcommand == "run"
+
+    (grammar_dir / "tool.grammar.toml").write_text("subcommands = [")
+    assert client.post("/admin/reload").status_code == 400
+    assert BashCommandParser.parse("tool run").subcommand == "run"
+
+
+def test_plain_toml_files_are_not_grammars(grammar_dir):
+    (grammar_dir / "ruff.toml").write_text("line-length = 100\n")
+    (grammar_dir / "tool.grammar.toml").write_text('subcommands = "any"\n')
+
+    assert sorted(load_grammar(grammar_dir).commands) == ["tool"]
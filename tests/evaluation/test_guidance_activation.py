@@ -1,6 +1,7 @@
 """Test the Rego-based guidance activation system."""
 
 import pytest
+from src.evaluation.dependencies import ActivationPaths
 from src.evaluation.rego import RegoEvaluator
 from src.server.models import PostFileEditEvent, PatchLine, StructuredPatch
 from src.server.enums import SourceClient
@@ -151,3 +152,82 @@ def test_guidance_bundle_handles_pyproject_toml(create_file_edit_event):
 
     # Should activate uv_pyproject guidance
     assert isinstance(results, list)
+
+
+@pytest.fixture
+def activation_queries(rego_evaluator, monkeypatch):
+    """Count guidance_activations bundle queries."""
+    queries = []
+    query = rego_evaluator._evaluate_guidance_activations_bundle
+
+    def counting(bundle, input_doc, interpreter):
+        queries.append(bundle)
+        return query(bundle, input_doc, interpreter)
+
+    monkeypatch.setattr(
+        rego_evaluator, "_evaluate_guidance_activations_bundle", counting
+    )
+    return queries
+
+
+def test_activations_are_reused_for_files_of_the_same_kind(
+    rego_evaluator, create_file_edit_event, activation_queries
+):
+    bundles = ["universal", "python_uv"]
+    first = rego_evaluator.evaluate_guidance_activations(
+        create_file_edit_event("src/app.py", "+x = 1", bundles), bundles
+    )
+    second = rego_evaluator.evaluate_guidance_activations(
+        create_file_edit_event("tests/test_other.py", "+y = 2", bundles), bundles
+    )
+    package_init = rego_evaluator.evaluate_guidance_activations(
+        create_file_edit_event("src/__init__.py", "+z = 3", bundles), bundles
+    )
+
+    assert sorted(second) == sorted(first)
+    assert "comment_overlap" in first and "comment_overlap" not in package_init
+    assert activation_queries == bundles * 2
+
+
+def test_activation_cache_is_per_bundle_set(
+    rego_evaluator, create_file_edit_event, activation_queries
+):
+    universal = rego_evaluator.evaluate_guidance_activations(
+        create_file_edit_event("pyproject.toml", "+a = 1"), ["universal"]
+    )
+    uv = rego_evaluator.evaluate_guidance_activations(
+        create_file_edit_event("pyproject.toml", "+a = 1"), ["universal", "python_uv"]
+    )
+
+    assert universal == [] and uv == ["uv_pyproject"]
+    assert len(activation_queries) == 3
+
+
+def test_activation_rules_reading_other_input_are_not_classified():
+    paths = ActivationPaths.from_modules(
+        [
+            (
+                "paths.rego",
+                "package paths\n\n"
+                "guidance_activations[check] if {\n"
+                '\tstartswith(input.file_path, "docs/")\n'
+                '\tnot input.file_path == "docs/index.md"\n'
+                '\tcheck := "docs"\n'
+                "}\n",
+            ),
+            (
+                "content.rego",
+                "package content\n\n"
+                "guidance_activations[check] if {\n"
+                '\tendswith(input.file_path, ".py")\n'
+                '\tcontains(input.content, "TODO")\n'
+                '\tcheck := "todo"\n'
+                "}\n",
+            ),
+        ]
+    )
+
+    assert paths.tests["paths"] == (("==", "docs/index.md"), ("startswith", "docs/"))
+    assert paths.path_class(["paths"], "docs/a.md") == (False, True)
+    assert paths.path_class(["paths"], "docs/index.md") == (True, True)
+    assert paths.path_class(["paths", "content"], "docs/a.md") is None
@@ -0,0 +1,166 @@
+"""Tests for caching file edit guidance by patch content."""
+
+import pytest
+from src.evaluation import handlers
+from src.evaluation.handlers import evaluate_guidance, guidance_cache
+from src.server.metrics import render_metrics
+from src.server.models import PolicyDecision, PolicyGuidance
+
+LINES = [
+    "import os",
+    "def f():",
+    "    import sys",
+    "    return sys.argv",
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_guidance_cache():
+    guidance_cache.clear()
+    yield
+    guidance_cache.clear()
+
+
+@pytest.fixture
+def query_counts(monkeypatch):
+    """Count guidance Rego queries made through the global evaluator."""
+    counts = {"guidances": 0, "activations": 0, "decisions": 0}
+    evaluator = handlers.rego_evaluator
+
+    def counting(name, method):
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            return method(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(
+        evaluator,
+        "evaluate_file_edit_guidances",
+        counting("guidances", evaluator.evaluate_file_edit_guidances),
+    )
+    monkeypatch.setattr(
+        evaluator,
+        "evaluate_guidance_activations",
+        counting("activations", evaluator.evaluate_guidance_activations),
+    )
+    monkeypatch.setattr(
+        evaluator,
+        "evaluate_file_edit_decisions",
+        counting("decisions", evaluator.evaluate_file_edit_decisions),
+    )
+    return counts
+
+
+def _guidance(event):
+    return [
+        r.content for r in evaluate_guidance(event) if isinstance(r, PolicyGuidance)
+    ]
+
+
+def test_identical_patch_skips_rego_and_checks(file_edit_event, query_counts):
+    first = _guidance(file_edit_event("src/app.py", LINES))
+    second = _guidance(file_edit_event("src/app.py", LINES))
+
+    assert first and second == first
+    assert query_counts == {"guidances": 1, "activations": 2, "decisions": 2}
+    assert guidance_cache.hits == 1
+
+
+def test_changed_patch_misses(file_edit_event, query_counts):
+    _guidance(file_edit_event("src/app.py", LINES))
+    _guidance(file_edit_event("src/app.py", LINES + ["x = 1"]))
+
+    assert query_counts["activations"] == 2
+    assert guidance_cache.hits == 0
+
+
+def test_file_path_and_bundles_are_part_of_the_key(file_edit_event):
+    python = _guidance(file_edit_event("src/app.py", LINES))
+    text = _guidance(file_edit_event("notes.txt", LINES))
+    uv = _guidance(
+        file_edit_event("pyproject.toml", LINES, bundles=["universal", "python_uv"])
+    )
+
+    assert python and not text
+    assert any("pyproject.toml" in content for content in uv)
+    assert guidance_cache.hits == 0
+
+
+def _with_content(event):
+    event.content = "\n".join(LINES) + "\n"
+    return event
+
+
+def test_same_edit_of_another_file_in_the_path_class_hits(file_edit_event):
+    first = _guidance(_with_content(file_edit_event("src/app.py", LINES)))
+    second = _guidance(_with_content(file_edit_event("tests/other.py", LINES)))
+
+    assert first and second == first
+    assert guidance_cache.hits == 1
+
+
+def test_edit_without_content_is_keyed_on_the_exact_path(file_edit_event):
+    _guidance(file_edit_event("src/app.py", LINES))
+    _guidance(file_edit_event("tests/other.py", LINES))
+
+    assert guidance_cache.hits == 0
+
+
+def test_activated_checks_are_part_of_the_key(file_edit_event, monkeypatch):
+    _guidance(_with_content(file_edit_event("src/app.py", LINES)))
+    monkeypatch.setattr(
+        handlers.rego_evaluator,
+        "evaluate_guidance_activations",
+        lambda event, bundles: [],
+    )
+
+    assert _guidance(_with_content(file_edit_event("src/app.py", LINES))) == []
+    assert guidance_cache.hits == 0
+
+
+def test_failed_check_is_not_cached(file_edit_event, monkeypatch):
+    calls = []
+
+    def failing(event):
+        calls.append(event)
+        raise RuntimeError("boom")
+        yield
+
+    monkeypatch.setitem(handlers.GUIDANCE_REGISTRY, "failing", failing)
+    monkeypatch.setattr(
+        handlers.rego_evaluator,
+        "evaluate_guidance_activations",
+        lambda event, bundles: ["failing"],
+    )
+
+    _guidance(file_edit_event("src/app.py", LINES))
+    _guidance(file_edit_event("src/app.py", LINES))
+
+    assert len(calls) == 2
+    assert len(guidance_cache) == 0
+
+
+def test_decisions_are_yielded_on_cache_hits(file_edit_event, monkeypatch):
+    decision = PolicyDecision.allow()
+    monkeypatch.setattr(
+        handlers.rego_evaluator,
+        "evaluate_file_edit_decisions",
+        lambda event, bundles: [decision],
+    )
+
+    list(evaluate_guidance(file_edit_event("src/app.py", LINES)))
+    results = list(evaluate_guidance(file_edit_event("src/app.py", LINES)))
+
+    assert results[0] is decision
+    assert guidance_cache.hits == 1
+
+
+def test_hit_rate_is_exported(file_edit_event):
+    _guidance(file_edit_event("src/app.py", LINES))
+    _guidance(file_edit_event("src/app.py", LINES))
+
+    metrics = render_metrics()
+    assert "policy_guidance_cache_hits_total 1" in metrics
+    assert "policy_guidance_cache_misses_total 1" in metrics
+    assert "policy_guidance_cache_hit_ratio 0.5" in metrics
@@ -0,0 +1,129 @@
+"""Tests for running guidance checks in sandboxed worker processes."""
+
+import time
+
+import pytest
+from src.evaluation import handlers
+from src.evaluation.guidance_sandbox import (
+    GUIDANCE_CHECKS,
+    GuidanceJob,
+    GuidanceSandbox,
+)
+from src.server.deadline import Deadline, DeadlineExceeded, deadline_scope
+from src.server.models import PolicyGuidance
+
+from tests.evaluation.sandbox_checks import (
+    crashing_check,
+    memory_check,
+    quick_check,
+    slow_check,
+)
+
+LINES = [
+    "# Configure things",
+    "import os",
+    "def f():",
+    "    import sys",
+    "    # return sys.argv",
+    "    return sys.argv",
+]
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    sandbox = GuidanceSandbox(workers=2, check_timeout=1.0, memory_limit_mb=256)
+    yield sandbox
+    sandbox.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def clear_guidance_cache():
+    handlers.guidance_cache.clear()
+    yield
+    handlers.guidance_cache.clear()
+
+
+def _run(sandbox, event, *jobs):
+    errors = []
+    guidance = [g.content for g in sandbox.run(event, list(jobs), errors)]
+    return guidance, errors
+
+
+def test_sandboxed_guidance_matches_inline(sandbox, file_edit_event, monkeypatch):
+    def guidance():
+        return [
+            r.content
+            for r in handlers.evaluate_guidance(file_edit_event("src/app.py", LINES))
+            if isinstance(r, PolicyGuidance)
+        ]
+
+    inline = guidance()
+    handlers.guidance_cache.clear()
+    monkeypatch.setattr(handlers, "guidance_sandbox", sandbox)
+
+    assert inline
+    assert sorted(guidance()) == sorted(inline)
+
+
+def test_slow_check_is_killed_and_others_still_returned(sandbox, file_edit_event):
+    event = file_edit_event("src/app.py", LINES)
+    killed = GUIDANCE_CHECKS.value(check="slow", outcome="killed")
+    started = time.monotonic()
+
+    guidance, errors = _run(
+        sandbox,
+        event,
+        GuidanceJob("slow", slow_check),
+        GuidanceJob("quick", quick_check),
+    )
+
+    assert time.monotonic() - started < 5
+    assert guidance == ["quick src/app.py"]
+    assert errors == [
+        "Guidance check 'slow' ran past its 1000 ms limit and was stopped"
+    ]
+    assert GUIDANCE_CHECKS.value(check="slow", outcome="killed") == killed + 1
+
+    # The killed worker was replaced
+    assert _run(sandbox, event, *[GuidanceJob("quick", quick_check)] * 3) == (
+        ["quick src/app.py"] * 3,
+        [],
+    )
+
+
+def test_check_over_memory_limit_fails_in_worker(sandbox, file_edit_event):
+    guidance, errors = _run(
+        sandbox,
+        file_edit_event("src/app.py", LINES),
+        GuidanceJob("memory", memory_check),
+    )
+
+    assert guidance == []
+    assert errors == [
+        "Error running guidance check 'memory': exceeded the worker memory limit"
+    ]
+
+
+def test_crashed_worker_is_recorded_and_replaced(sandbox, file_edit_event):
+    event = file_edit_event("src/app.py", LINES)
+
+    guidance, errors = _run(sandbox, event, GuidanceJob("crash", crashing_check))
+
+    assert errors == ["Guidance check 'crash' worker exited"]
+    assert _run(sandbox, event, GuidanceJob("quick", quick_check))[0] == [
+        "quick src/app.py"
+    ]
+
+
+def test_deadline_kills_running_checks(sandbox, file_edit_event):
+    event = file_edit_event("src/app.py", LINES)
+    started = time.monotonic()
+
+    with deadline_scope(Deadline.after(0.3)):
+        with pytest.raises(DeadlineExceeded):
+            _run(sandbox, event, GuidanceJob("slow", slow_check))
+
+    assert time.monotonic() - started < 1
+    assert _run(sandbox, event, GuidanceJob("quick", quick_check))[0] == [
+        "quick src/app.py"
+    ]
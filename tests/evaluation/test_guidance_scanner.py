@@ -0,0 +1,134 @@
+"""Tests for the single-pass guidance scanner."""
+
+import re
+
+import pytest
+from src.evaluation.handlers import LINE_CHECKS
+from src.guidance.documentation import LicenseCheck
+from src.guidance.python_comments import (
+    CommentedCodeCheck,
+    CommentRatioCheck,
+    LegacyCodeCheck,
+)
+from src.guidance.python_imports import MidCodeImportCheck
+from src.guidance.scanner import GuidanceScanner, LineCheck, compile_scanner
+from src.server.enums import SourceClient
+from src.server.models import (
+    PatchLine,
+    PolicyGuidance,
+    PostFileEditEvent,
+    StructuredPatch,
+)
+
+
+def _patch(*lines):
+    parsed = []
+    for line in lines:
+        if line.startswith("+"):
+            parsed.append(PatchLine(operation="added", content=line[1:]))
+        elif line.startswith("-"):
+            parsed.append(PatchLine(operation="removed", content=line[1:]))
+        else:
+            parsed.append(PatchLine(operation="unchanged", content=line))
+    return StructuredPatch(
+        oldStart=1, oldLines=len(parsed), newStart=1, newLines=len(parsed), lines=parsed
+    )
+
+
+def _event(*patches):
+    return PostFileEditEvent(
+        session_id="scanner-session",
+        source_client=SourceClient.CLAUDE_CODE,
+        file_path="src/module.py",
+        structured_patch=list(patches),
+    )
+
+
+def _contents(checks, event):
+    return [g.content for g in compile_scanner(tuple(checks)).scan(event)]
+
+
+ALL_CHECKS = [LINE_CHECKS[name] for name in sorted(LINE_CHECKS)]
+
+PATCHES = [
+    _patch("+import os", "+def f():", "+    import sys", "+    return sys.argv"),
+    _patch("+# set the value", "+value = 1", "+y = 2  # keep y"),
+    _patch("+    # old_call()", "+    # other_call()", "+x = 1"),
+    _patch("+# License: MIT", "-# deprecated helper", " pass"),
+    _patch("+# a", "+# b", "+# c", "+code = 1"),
+    _patch("+x = 1", "+y = 2"),
+]
+
+
+@pytest.mark.parametrize("patch", PATCHES)
+def test_combined_scan_matches_individual_scans(patch):
+    event = _event(patch)
+    individual = []
+    for check in ALL_CHECKS:
+        individual += _contents([check], event)
+
+    assert _contents(ALL_CHECKS, event) == individual
+
+
+def test_each_check_fires():
+    assert _contents([MidCodeImportCheck], _event(PATCHES[0]))
+    assert _contents([CommentedCodeCheck], _event(PATCHES[2]))
+    assert _contents([LicenseCheck], _event(PATCHES[3]))
+    assert _contents([LegacyCodeCheck], _event(PATCHES[3]))
+    assert _contents([CommentRatioCheck], _event(PATCHES[4]))
+    assert _contents(ALL_CHECKS, _event(PATCHES[5])) == []
+
+
+def test_added_only_check_ignores_other_lines():
+    event = _event(_patch("-# License: MIT", " # License: MIT"))
+    assert _contents([LicenseCheck], event) == []
+
+
+def test_commented_code_resets_between_patches():
+    event = _event(_patch("+x = 1", "+    # old_call()"), _patch("+    # other()"))
+    assert _contents([CommentedCodeCheck], event) == []
+
+
+class _CountingCheck(LineCheck):
+    seen = []
+
+    def line(self, line):
+        _CountingCheck.seen.append(line.content)
+        return None
+
+
+class _FirstHit(LineCheck):
+    pattern = r"needle"
+    flags = re.IGNORECASE
+
+    def match(self, line, found):
+        return PolicyGuidance(content=f"found {found.group(0)}")
+
+
+def test_scanner_visits_each_line_once():
+    _CountingCheck.seen = []
+    event = _event(_patch("+a", "+NEEDLE", "+c"), _patch("+d"))
+
+    results = list(GuidanceScanner([_CountingCheck, _FirstHit]).scan(event))
+
+    assert _CountingCheck.seen == ["a", "NEEDLE", "c", "d"]
+    assert [g.content for g in results] == ["found NEEDLE"]
+
+
+def test_finished_checks_stop_scanning():
+    _CountingCheck.seen = []
+
+    class _Stop(_CountingCheck):
+        def line(self, line):
+            super().line(line)
+            return PolicyGuidance(content="stop")
+
+    results = list(GuidanceScanner([_Stop]).scan(_event(_patch("+a", "+b"))))
+
+    assert _CountingCheck.seen == ["a"]
+    assert [g.content for g in results] == ["stop"]
+
+
+def test_compile_scanner_is_cached():
+    checks = (LicenseCheck, LegacyCodeCheck)
+    assert compile_scanner(checks) is compile_scanner(checks)
@@ -1,7 +1,7 @@
 """Test heredoc command parsing."""
 
 import pytest
-from src.evaluation.parser import BashCommandParser, ParseError
+from src.evaluation.parser import BashCommandParser, ParseError, Redirect
 
 
 def test_heredoc_incomplete_raises_error():
@@ -30,3 +30,73 @@ def test_multiple_redirects_with_heredoc():
 
     assert cmd.executable == "sort"
     assert len(cmd.redirects) == 2
+
+
+def test_unquoted_heredoc_content():
+    cmd = BashCommandParser.parse("cat > output.txt <<EOF\nhello $USER\nline 2\nEOF")
+
+    assert cmd.executable == "cat"
+    assert cmd.redirects == [
+        Redirect(">", "output.txt"),
+        Redirect("<<", "EOF", "hello $USER\nline 2"),
+    ]
+    assert cmd.redirects[1].content == "hello $USER\nline 2"
+
+
+@pytest.mark.parametrize("word", ["'EOF'", '"EOF"', "\\EOF", "E'O'F"])
+def test_quoted_heredoc_delimiters(word):
+    cmd = BashCommandParser.parse(f"cat > /tmp/test.py << {word}\nprint('x')\nEOF")
+
+    assert cmd.redirects[1] == ("<<", word, "print('x')")
+
+
+def test_heredoc_strip_tabs():
+    cmd = BashCommandParser.parse("cat <<-EOF\n\tindented\n\tEOF")
+
+    assert cmd.redirects == [("<<-", "EOF", "indented")]
+
+
+def test_heredoc_body_is_not_parsed_as_shell():
+    cmd = BashCommandParser.parse(
+        "cat > f.sh <<'EOF'\nif [ $(id -u) ]; then\n  rm -rf /\nfi\nEOF"
+    )
+
+    assert cmd.executable == "cat"
+    assert not cmd.chained
+    assert "rm -rf /" in cmd.redirects[1].content
+
+
+def test_heredoc_followed_by_chained_command():
+    command = "cat > f.txt <<EOF && git add f.txt\nbody\nEOF"
+    cmd = BashCommandParser.parse(command)
+
+    assert cmd.original == command
+    assert cmd.redirects[1].content == "body"
+    assert cmd.chained[0].executable == "git"
+    assert cmd.chained[0].get_command_text() == "git add f.txt"
+
+
+def test_multiple_heredocs_on_one_line():
+    cmd = BashCommandParser.parse("diff <(cat <<A\n1\nA\n) <(cat <<B\n2\nB\n)")
+
+    bodies = [sub.redirects[0].content for sub in cmd.process_substitutions]
+    assert bodies == ["1", "2"]
+
+
+def test_heredoc_markers_inside_quotes_are_not_heredocs():
+    cmd = BashCommandParser.parse("echo 'a << b' \"<<EOF\" <<< here")
+
+    assert cmd.arguments == ["'a << b'", '"<<EOF"']
+    assert cmd.redirects == [Redirect("<<<", "here")]
+
+
+def test_placeholder_collision():
+    cmd = BashCommandParser.parse("cat __heredoc_0__ <<EOF\nx\nEOF")
+
+    assert cmd.arguments == ["__heredoc_0__"]
+    assert cmd.redirects == [("<<", "EOF", "x")]
+
+
+def test_heredoc_body_without_terminator_raises_error():
+    with pytest.raises(ParseError):
+        BashCommandParser.parse("cat > f <<EOF\nbody\nEOFX")
@@ -0,0 +1,165 @@
+"""Tests for canonical command keys and the caches built on them."""
+
+import pytest
+from src.evaluation import handlers
+from src.evaluation.handlers import evaluate_bash_rules
+from src.evaluation.normalize import canonical_key, canonical_word
+from src.evaluation.parser import BashCommandParser
+from src.evaluation.rego import RegoEvaluator
+from src.server.enums import SourceClient
+from src.server.models import PolicyAction, ToolUseEvent
+
+
+def key(command: str) -> str:
+    return canonical_key(BashCommandParser.parse(command))
+
+
+@pytest.mark.parametrize(
+    "first,second",
+    [
+        ("docker build --tag=myapp .", "docker build --tag myapp ."),
+        ("git commit -m 'msg'", 'git commit -m "msg"'),
+        ("git commit -m 'msg'", "git commit -m msg"),
+        ("ls -l -a", "ls -a -l"),
+        ("git   status", "git status"),
+        ("git commit -m 'a b'", 'git commit -m "a b"'),
+        ("pytest tests/ -v --maxfail=2", "pytest --maxfail 2 tests/ -v"),
+        ("echo hi > out.txt", "echo hi >'out.txt'"),
+        ("cat a | grep b", "cat a  |  grep 'b'"),
+        ("ls && pwd", "ls || pwd"),
+        ("diff <(cat a) <(cat b)", "diff <(cat 'a') <(cat b)"),
+    ],
+)
+def test_equivalent_commands_share_key(first, second):
+    assert key(first) == key(second)
+
+
+@pytest.mark.parametrize(
+    "first,second",
+    [
+        ("cat a b", "cat b a"),
+        ("rm -rf /tmp/x", "rm -rf /tmp/y"),
+        ("echo '$HOME'", "echo $HOME"),
+        ('echo "$HOME"', "echo '$HOME'"),
+        ("ls *.txt", "ls '*.txt'"),
+        ("cat a | grep b", "cat a ; grep b"),
+        ("cat a > out.txt", "cat a >> out.txt"),
+        ("git status", "/usr/bin/git status"),
+        ("diff <(cat a) b", "diff b <(cat a)"),
+    ],
+)
+def test_different_commands_have_different_keys(first, second):
+    assert key(first) != key(second)
+
+
+def test_canonical_word_keeps_partial_quoting():
+    assert canonical_word('--name="x"') == '--name="x"'
+    assert canonical_word("'a b'") == "'a b'"
+    assert canonical_word('"a b"') == "'a b'"
+    assert canonical_word("'plain'") == "plain"
+
+
+def test_parse_cache_returns_same_result():
+    first = BashCommandParser.parse("git log --oneline")
+    second = BashCommandParser.parse("git log --oneline")
+    assert first is second
+
+
+def _event(command: str) -> ToolUseEvent:
+    return ToolUseEvent(
+        session_id="normalize-session",
+        source_client=SourceClient.CLAUDE_CODE,
+        tool_name="Bash",
+        tool_is_bash=True,
+        command=command,
+    )
+
+
+CANONICAL_ONLY_POLICY = """package universal
+
+decisions[decision] if {
+	input.parsed.executable == "git"
+	input.parsed.subcommand == "commit"
+	decision := {"action": "allow"}
+}
+"""
+
+
+def test_decision_cache_hits_for_equivalent_commands(tmp_path):
+    (tmp_path / "commit.rego").write_text(CANONICAL_ONLY_POLICY)
+    evaluator = RegoEvaluator(policy_dir=str(tmp_path))
+
+    first = "git commit -m 'fix' --amend"
+    second = 'git   commit --amend -m "fix"'
+    decisions = evaluator.evaluate(
+        _event(first), BashCommandParser.parse(first), ["universal"]
+    )
+    cached = evaluator.evaluate(
+        _event(second), BashCommandParser.parse(second), ["universal"]
+    )
+
+    assert [d.action for d in cached] == [d.action for d in decisions]
+    assert evaluator.decision_cache.hits == 1
+
+
+def test_bundles_reading_raw_command_key_on_raw_text():
+    evaluator = RegoEvaluator(policy_dir="policies")
+    assert "universal" in evaluator.raw_command_packages
+
+    first = "git commit -m 'fix' --amend"
+    second = 'git   commit --amend -m "fix"'
+    for command in (first, second, first):
+        evaluator.evaluate(
+            _event(command), BashCommandParser.parse(command), ["universal"]
+        )
+
+    assert evaluator.decision_cache.hits == 1
+
+
+SQLITE_SELECT = 'sqlite3 db "SELECT 1"'
+SQLITE_COMMENTED = 'sqlite3 db "SELECT 1" # DROP'
+
+
+@pytest.mark.parametrize(
+    "commands",
+    [(SQLITE_COMMENTED, SQLITE_SELECT), (SQLITE_SELECT, SQLITE_COMMENTED)],
+)
+def test_commands_differing_only_in_raw_text_are_cached_apart(commands):
+    handlers.rego_evaluator.decision_cache.clear()
+    expected = {
+        SQLITE_SELECT: PolicyAction.ALLOW,
+        SQLITE_COMMENTED: PolicyAction.DENY,
+    }
+
+    for command in commands:
+        decisions = list(evaluate_bash_rules(_event(command)))
+        assert [d.action for d in decisions] == [expected[command]], command
+
+
+@pytest.mark.parametrize(
+    "method,query",
+    [
+        ("evaluate", "_evaluate_bundle"),
+        ("evaluate_guidances", "_evaluate_guidances_bundle"),
+    ],
+)
+def test_bundle_errors_are_not_cached(tmp_path, monkeypatch, method, query):
+    (tmp_path / "commit.rego").write_text(CANONICAL_ONLY_POLICY)
+    evaluator = RegoEvaluator(policy_dir=str(tmp_path))
+    command = "git commit -m fix"
+
+    def fail(bundle, input_doc, interpreter):
+        raise RuntimeError("worker lost")
+
+    def run():
+        return getattr(evaluator, method)(
+            _event(command), BashCommandParser.parse(command), ["universal"]
+        )
+
+    with monkeypatch.context() as patched:
+        patched.setattr(evaluator, query, fail)
+        run()
+    assert len(evaluator.decision_cache) == 0
+
+    run()
+    assert len(evaluator.decision_cache) == 1
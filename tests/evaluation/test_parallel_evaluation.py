@@ -0,0 +1,80 @@
+"""Tests for the interpreter pool and the process-pool evaluation backend."""
+
+import pytest
+from src.evaluation.parser import BashCommandParser
+from src.evaluation.pool import InterpreterPool
+from src.evaluation.rego import RegoEvaluator
+from src.server.deadline import Deadline, DeadlineExceeded, deadline_scope
+from src.server.enums import SourceClient
+from src.server.models import ToolUseEvent
+
+BUNDLES = ["universal", "python_pip", "python_uv", "demo_flags"]
+
+COMMAND = (
+    "git status && ls -la | grep foo ; rm -rf /tmp/x && pip list"
+    " ; git commit -m msg && cat a | sort | uniq ; curl http://example.com"
+    " && diff <(cat a) <(cat b)"
+)
+
+
+def _event(command: str) -> ToolUseEvent:
+    return ToolUseEvent(
+        session_id="parallel-session",
+        source_client=SourceClient.CLAUDE_CODE,
+        tool_name="Bash",
+        tool_is_bash=True,
+        command=command,
+    )
+
+
+@pytest.fixture(scope="module")
+def evaluator():
+    return RegoEvaluator(policy_dir="policies", decision_cache_size=0)
+
+
+def test_pool_creates_at_most_size_interpreters():
+    created = []
+
+    def factory():
+        created.append(object())
+        return created[-1]
+
+    pool = InterpreterPool(factory, size=2)
+    with pool.borrow() as first:
+        with pool.borrow() as second:
+            assert first is not second
+    with pool.borrow():
+        pass
+
+    assert len(created) == 2
+
+
+def test_process_backend_matches_in_process(evaluator):
+    backend = RegoEvaluator(
+        policy_dir="policies",
+        decision_cache_size=0,
+        parallel_threshold=2,
+        process_workers=2,
+    )
+    parsed = BashCommandParser.parse(COMMAND)
+
+    try:
+        decisions = backend.evaluate(_event(COMMAND), parsed, BUNDLES)
+        guidances = backend.evaluate_guidances(_event(COMMAND), parsed, BUNDLES)
+    finally:
+        backend.close()
+
+    assert decisions == evaluator.evaluate(_event(COMMAND), parsed, BUNDLES)
+    assert guidances == evaluator.evaluate_guidances(_event(COMMAND), parsed, BUNDLES)
+
+
+def test_expired_deadline_stops_queries(evaluator):
+    parsed = BashCommandParser.parse(COMMAND)
+
+    with deadline_scope(Deadline(expires_at=0.0)), pytest.raises(DeadlineExceeded):
+        evaluator.evaluate(_event(COMMAND), parsed, BUNDLES)
+
+    results = evaluator._run_local_queries(
+        evaluator._evaluate_bundle, [{}], BUNDLES, Deadline(expires_at=0.0)
+    )
+    assert all(isinstance(result, DeadlineExceeded) for result in results[0])
@@ -0,0 +1,233 @@
+"""Tests for token-level Python source analysis used by guidance checks."""
+
+import difflib
+
+import pytest
+from src.guidance import python_source
+from src.guidance.python_comments import (
+    CommentedCodeCheck,
+    CommentOverlapCheck,
+    CommentRatioCheck,
+)
+from src.guidance.python_imports import MidCodeImportCheck
+from src.guidance.python_source import (
+    SOURCE_ANALYSES,
+    analyze_event,
+    split_lines,
+    source_cache,
+)
+from src.guidance.scanner import compile_scanner
+from src.server.enums import SourceClient
+from src.server.models import PatchLines, PostFileEditEvent, StructuredPatch
+
+SOURCE = '''"""Module docstring.
+
+    import os
+# not a comment
+"""
+
+import sys
+
+
+def main():
+    # Run the main loop
+    value = "# also not a comment"
+    import json  # lazy
+    return value
+'''
+
+
+@pytest.fixture(autouse=True)
+def clear_source_cache():
+    source_cache.clear()
+    yield
+    source_cache.clear()
+
+
+@pytest.fixture
+def analyses():
+    """Return the number of analyses of a mode made since the test started."""
+    start = {mode: SOURCE_ANALYSES.value(mode=mode) for mode in ("full", "incremental")}
+    return lambda mode: SOURCE_ANALYSES.value(mode=mode) - start[mode]
+
+
+def _patches(old, new):
+    """Build structured patches the way editors report them."""
+    patches = []
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    for group in matcher.get_grouped_opcodes(3):
+        old_start, old_end = group[0][1], group[-1][2]
+        new_start, new_end = group[0][3], group[-1][4]
+        raw = []
+        for tag, a1, a2, b1, b2 in group:
+            if tag == "equal":
+                raw += [" " + line for line in old[a1:a2]]
+            else:
+                raw += ["-" + line for line in old[a1:a2]]
+                raw += ["+" + line for line in new[b1:b2]]
+        patches.append(
+            StructuredPatch(
+                oldStart=old_start + 1 if old_end > old_start else old_start,
+                oldLines=old_end - old_start,
+                newStart=new_start + 1 if new_end > new_start else new_start,
+                newLines=new_end - new_start,
+                lines=PatchLines.from_diff(raw),
+            )
+        )
+    return patches
+
+
+def _event(new, old=None, content=True, path="/workspace/app.py"):
+    old = old or []
+    return PostFileEditEvent(
+        session_id="source-session",
+        source_client=SourceClient.CLAUDE_CODE,
+        file_path=path,
+        content="\n".join(new) + "\n" if content else None,
+        structured_patch=_patches(old, new),
+    )
+
+
+def _copies(count):
+    """SOURCE repeated, with a distinct line per copy so diffs stay local."""
+    lines = []
+    for index in range(count):
+        lines += [f"COPY = {index}"] + split_lines(SOURCE)
+    return lines
+
+
+def _full(lines):
+    infos, _ = python_source._tokenize(lines, 0)
+    return infos
+
+
+def test_line_kinds():
+    infos = analyze_event(_event(split_lines(SOURCE))).infos
+    kinds = [info.kind for info in infos]
+
+    assert kinds[:5] == ["code", "string", "string", "string", "string"]
+    assert infos[6].statement == "import"
+    assert infos[10] == python_source.LineInfo(
+        kind="comment",
+        indent=4,
+        statement=None,
+        comment="# Run the main loop",
+        clean=True,
+    )
+    assert infos[11].comment is None
+    assert (infos[12].statement, infos[12].comment) == ("import", "# lazy")
+
+
+def test_checks_ignore_text_inside_strings():
+    lines = split_lines(SOURCE)
+    event = _event(lines)
+
+    imports = compile_scanner((MidCodeImportCheck,)).scan(event)
+    assert len(list(imports)) == 1  # Only `import json` inside main()
+
+    docstring_only = _event(lines[:6], path="/workspace/doc.py")
+    assert list(compile_scanner((MidCodeImportCheck,)).scan(docstring_only)) == []
+    assert list(compile_scanner((CommentRatioCheck,)).scan(docstring_only)) == []
+
+
+def test_checks_fall_back_to_lines_without_content():
+    lines = split_lines(SOURCE)[:6]
+    event = _event(lines, content=False)
+
+    assert list(compile_scanner((MidCodeImportCheck,)).scan(event))
+
+
+def test_commented_code_requires_real_comments():
+    lines = ['TEXT = """', "    # first", "    # second", '"""']
+
+    assert list(compile_scanner((CommentedCodeCheck,)).scan(_event(lines))) == []
+    lines = ["def f():", "    # first()", "    # second()", "    pass"]
+    assert list(compile_scanner((CommentedCodeCheck,)).scan(_event(lines)))
+
+
+def test_inline_comment_overlap_uses_comment_token():
+    # Splitting at the first "#" would compare "set the url" with the
+    # code 'url = "http://x' and miss the overlap
+    lines = ['url = "http://x#set"  # set the url']
+
+    guidance = list(compile_scanner((CommentOverlapCheck,)).scan(_event(lines)))
+    assert guidance
+
+
+EDITS = [
+    # Open a docstring that swallows the following lines
+    lambda lines: lines[:8] + ['"""'] + lines[8:],
+    # Close it again by removing the opening quote line of the docstring
+    lambda lines: lines[1:],
+    # Edit inside a bracketed call
+    lambda lines: lines[:3] + ["x = call(", "    1,", ")"] + lines[3:],
+    # Leave a bracket open so later lines become a continuation
+    lambda lines: lines[:3] + ["x = call(", "    1,"] + lines[3:],
+    # Change a line in the middle
+    lambda lines: lines[:9] + ["def main():  # entry"] + lines[10:],
+]
+
+
+@pytest.mark.parametrize("edit", EDITS)
+@pytest.mark.parametrize("content", [True, False])
+def test_incremental_update_matches_full_tokenize(edit, content, analyses):
+    old = _copies(3)
+    analyze_event(_event(old))
+    new = edit(old)
+
+    analysis = analyze_event(_event(new, old, content=content))
+
+    try:
+        expected = _full(new)
+    except Exception:
+        expected = None
+    assert analysis.lines == new
+    assert analysis.infos == expected
+    assert analyses("incremental") == 1
+
+
+def test_incremental_update_retokenizes_only_changed_region(monkeypatch):
+    old = _copies(50)
+    analyze_event(_event(old))
+    new = old[:112] + ["import os  # changed"] + old[113:]
+
+    tokenized = []
+    tokenize = python_source._tokenize
+
+    def spy(lines, start, stop=None):
+        infos, end = tokenize(lines, start, stop)
+        tokenized.append(end - start)
+        return infos, end
+
+    monkeypatch.setattr(python_source, "_tokenize", spy)
+    analysis = analyze_event(_event(new, old))
+
+    assert sum(tokenized) < 5
+    assert analysis.infos == _full(new)
+
+
+def test_unchanged_content_reuses_analysis(analyses):
+    lines = split_lines(SOURCE)
+    first = analyze_event(_event(lines))
+
+    assert analyze_event(_event(lines, lines)) is first
+    assert analyses("full") == 1
+
+
+def test_patch_not_matching_cache_is_analyzed_in_full(analyses):
+    old = split_lines(SOURCE)
+    analyze_event(_event(old))
+    other = ["x = 1"] + old
+
+    analysis = analyze_event(_event(other + ["y = 2"], other))
+
+    assert analysis.infos == _full(other + ["y = 2"])
+    assert analyses("full") == 2
+    assert analyze_event(_event(["z = 3"], ["x = 0"], content=False)) is None
+
+
+def test_untokenizable_file_has_no_infos():
+    analysis = analyze_event(_event(['s = """never closed', "x = 1"]))
+
+    assert analysis.infos is None
+    assert analyze_event(_event(["x = 1"], path="/workspace/notes.txt")) is None
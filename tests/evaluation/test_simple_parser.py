@@ -0,0 +1,94 @@
+"""Differential tests for the parser's simple-command fast path.
+
+Every command literal in the parser and HTTP test suites is parsed by both
+the fast path and bashlex; wherever the fast path accepts a command, the two
+results must be identical.
+"""
+
+import ast
+from dataclasses import asdict
+from pathlib import Path
+from typing import List
+
+import pytest
+from src.evaluation.parser import BashCommandParser, ParseError
+
+TESTS = Path(__file__).resolve().parent.parent
+
+EXTRA_COMMANDS = [
+    "ls",
+    "  git   status  ",
+    "ls\t-la\tsrc/",
+    "git commit -m message --amend",
+    "pytest tests/ -k name -x --maxfail=1",
+    "docker run -it --rm image:latest sh",
+    "uv pip install package==1.0",
+    "ls *.py src/**/x?.txt",
+    "echo a^b c%d e@f g+h",
+    "env FOO=bar python script.py",
+    "npm --version",
+    "kubectl get pods -n default -o wide",
+]
+
+
+def _corpus() -> List[str]:
+    """Collect string literals passed to parse() and check_policy() in the tests."""
+    commands = set(EXTRA_COMMANDS)
+    for path in [*TESTS.glob("evaluation/test_*.py"), *TESTS.glob("http/test_*.py")]:
+        for node in ast.walk(ast.parse(path.read_text())):
+            if not isinstance(node, ast.Call):
+                continue
+            name = getattr(node.func, "attr", getattr(node.func, "id", None))
+            if name == "parse":
+                args = node.args[:1]
+            elif name == "check_policy":
+                args = node.args[2:3]
+            else:
+                continue
+            for arg in args:
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                    commands.add(arg.value)
+    return sorted(commands)
+
+
+CORPUS = _corpus()
+
+
+def test_corpus_covers_simple_commands():
+    simple = [c for c in CORPUS if BashCommandParser._parse_simple(c) is not None]
+    assert len(CORPUS) > 100
+    assert len(simple) > 50
+
+
+@pytest.mark.parametrize("command", CORPUS)
+def test_fast_path_matches_bashlex(command):
+    fast = BashCommandParser._parse_simple(command)
+    if fast is None:
+        return
+    try:
+        slow = BashCommandParser._parse_bashlex(command)
+    except ParseError as e:
+        pytest.fail(f"fast path accepted a command bashlex rejects: {e}")
+    assert asdict(fast) == asdict(slow)
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        "FOO=bar python script.py",
+        "if true",
+        "time ls",
+        "echo 'quoted'",
+        "echo $HOME",
+        "ls ~",
+        "ls [ab].txt",
+        "ls {a,b}",
+        "ls # comment",
+        "ls; pwd",
+        "cat < file",
+        "echo a\\ b",
+        "ls\npwd",
+    ],
+)
+def test_shell_syntax_falls_back_to_bashlex(command):
+    assert BashCommandParser._parse_simple(command) is None
@@ -0,0 +1,37 @@
+"""
+HTTP tests for single-pass typed request decoding
+"""
+
+
+def test_invalid_event_is_rejected_with_422(client, base_event):
+    del base_event["event"]["tool_name"]
+    response = client.post("/policy/claude-code/PreToolUse", json=base_event)
+
+    assert response.status_code == 422
+    locations = [error["loc"] for error in response.json()["detail"]]
+    assert ["body", "event", "tool_name"] in locations
+
+
+def test_wrong_hook_event_name_is_rejected(client, base_event):
+    base_event["event"]["hook_event_name"] = "PostToolUse"
+    response = client.post("/policy/claude-code/PreToolUse", json=base_event)
+
+    assert response.status_code == 422
+
+
+def test_malformed_json_is_rejected(client):
+    response = client.post(
+        "/policy/claude-code/PreToolUse",
+        content=b"{not json",
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 422
+
+
+def test_mcp_parameters_are_passed_through(client, base_event):
+    base_event["event"]["tool_name"] = "mcp__server__tool"
+    base_event["event"]["tool_input"] = {"query": "x"}
+    response = client.post("/policy/claude-code/PreToolUse", json=base_event)
+
+    assert response.status_code == 200
@@ -0,0 +1,65 @@
+"""
+Integration tests for the /policy/stream WebSocket channel
+"""
+
+
+def _frame(request_id, hook, body):
+    return {"id": request_id, "hook": hook, "body": body}
+
+
+def _with_command(base_event, command):
+    base_event["event"]["tool_input"]["command"] = command
+    return base_event
+
+
+def test_stream_response_matches_http(client, base_event):
+    body = _with_command(base_event, "rm -rf /")
+    http_response = client.post("/policy/claude-code/PreToolUse", json=body)
+
+    with client.websocket_connect("/policy/stream") as ws:
+        ws.send_json(_frame("1", "claude-code/PreToolUse", body))
+        response = ws.receive_json()
+
+    assert response["id"] == "1"
+    assert response["status"] == 200
+    assert response["body"] == http_response.json()
+
+
+def test_stream_correlates_multiple_events(client, base_event):
+    cursor_body = {
+        "conversation_id": "conv",
+        "generation_id": "gen",
+        "hook_event_name": "beforeShellExecution",
+        "workspace_roots": ["/workspace"],
+        "command": "sudo ls",
+        "cwd": "/workspace",
+    }
+
+    with client.websocket_connect("/policy/stream") as ws:
+        ws.send_json(
+            _frame("a", "claude-code/PreToolUse", _with_command(base_event, "pwd"))
+        )
+        ws.send_json(_frame("b", "cursor/beforeShellExecution", cursor_body))
+        first, second = ws.receive_json(), ws.receive_json()
+
+    assert first["id"] == "a"
+    assert first["body"]["hookSpecificOutput"]["permissionDecision"] == "allow"
+    assert second["id"] == "b"
+    assert second["body"]["permission"] == "deny"
+
+
+def test_stream_reports_errors_per_frame(client, base_event):
+    with client.websocket_connect("/policy/stream") as ws:
+        ws.send_json(_frame("x", "claude-code/Unknown", {}))
+        unknown = ws.receive_json()
+        ws.send_json(_frame("y", "claude-code/PreToolUse", {"event": {}}))
+        invalid = ws.receive_json()
+        ws.send_text("not json")
+        malformed = ws.receive_json()
+        ws.send_json(_frame("z", "claude-code/PreToolUse", base_event))
+        valid = ws.receive_json()
+
+    assert (unknown["id"], unknown["status"]) == ("x", 404)
+    assert (invalid["id"], invalid["status"]) == ("y", 422)
+    assert (malformed["id"], malformed["status"]) == (None, 400)
+    assert (valid["id"], valid["status"]) == ("z", 200)
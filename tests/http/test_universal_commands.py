@@ -202,6 +202,17 @@ def test_redirect_relative_allowed(client, base_event):
     check_policy(client, base_event, "echo test > output.txt", "allow")
 
 
+def test_quoted_heredoc_to_relative_path_allowed(client, base_event):
+    """Quoted heredoc delimiters parse; the body is not a redirect path"""
+    command = "cat > notes.txt << 'EOF'\nsee /tmp/x and ../y\nEOF"
+    check_policy(client, base_event, command, "allow")
+
+
+def test_heredoc_to_tmp_denied(client, base_event):
+    """Heredoc output redirects are still validated"""
+    check_policy(client, base_event, "cat > /tmp/notes.txt <<EOF\nhi\nEOF", "deny")
+
+
 def test_whoami_allowed(client, base_event):
     """whoami should be allowed"""
     check_policy(client, base_event, "whoami", "allow")
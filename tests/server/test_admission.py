@@ -0,0 +1,134 @@
+"""Tests for admission control, overload shedding and metrics."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from src.server import admission
+from src.server.admission import SHED, AdmissionController
+from src.server.config import ServerConfig
+from src.server.metrics import Counter, Histogram, render_metrics
+from src.server.models import PolicyDecision
+from src.server.responses import DEGRADED_HEADER
+from src.server.server import app
+
+
+@pytest.fixture
+def blocking_pipeline(monkeypatch):
+    """Replace the pipeline with one that blocks until released."""
+    release = threading.Event()
+
+    def pipeline(input_data):
+        release.wait(5)
+        return [PolicyDecision.allow()]
+
+    monkeypatch.setattr(admission, "execute_handlers_generic", pipeline)
+    yield release
+    release.set()
+
+
+def test_sheds_when_queue_is_full(blocking_pipeline):
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+    shed_before = SHED.value(reason="queue_full")
+
+    async def scenario():
+        running = asyncio.ensure_future(controller.evaluate("first"))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(controller.evaluate("second"))
+        await asyncio.sleep(0.05)
+
+        assert await controller.evaluate("third") is None
+
+        blocking_pipeline.set()
+        return await running, await queued
+
+    first, second = asyncio.run(scenario())
+    assert first == second == [PolicyDecision.allow()]
+    assert SHED.value(reason="queue_full") == shed_before + 1
+    assert controller.in_flight == 0
+
+
+def test_sheds_after_queue_timeout(blocking_pipeline):
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.05)
+    shed_before = SHED.value(reason="timeout")
+
+    async def scenario():
+        running = asyncio.ensure_future(controller.evaluate("first"))
+        await asyncio.sleep(0.05)
+        waited = await controller.evaluate("second")
+        blocking_pipeline.set()
+        await running
+        return waited
+
+    assert asyncio.run(scenario()) is None
+    assert SHED.value(reason="timeout") == shed_before + 1
+
+
+def test_released_slot_goes_to_next_waiter(blocking_pipeline):
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5)
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(controller.evaluate(i)) for i in range(3)]
+        await asyncio.sleep(0.05)
+        assert controller.in_flight == 1
+        blocking_pipeline.set()
+        return await asyncio.gather(*tasks)
+
+    assert all(results is not None for results in asyncio.run(scenario()))
+    assert controller.in_flight == 0
+
+
+def test_shed_route_returns_degraded_default():
+    controller = AdmissionController(max_concurrent=0, max_queue=0, queue_timeout=0)
+    admission._controller = controller
+    try:
+        response = TestClient(app).post(
+            "/policy/claude-code/PreToolUse",
+            json={
+                "event": {
+                    "session_id": "overload-session",
+                    "transcript_path": "/tmp/transcript.jsonl",
+                    "cwd": "/workspace",
+                    "hook_event_name": "PreToolUse",
+                    "tool_name": "Bash",
+                    "tool_input": {"command": "rm -rf /"},
+                },
+                "bundles": ["universal"],
+            },
+        )
+    finally:
+        admission.configure_admission(ServerConfig())
+
+    assert response.status_code == 200
+    assert response.headers[DEGRADED_HEADER] == "overloaded"
+    output = response.json()["hookSpecificOutput"]
+    assert output["permissionDecision"] == "ask"
+
+
+def test_metrics_endpoint_exports_admission_metrics():
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert "# TYPE policy_admission_queue_depth gauge" in response.text
+    assert "policy_admission_wait_seconds_count" in response.text
+    assert "# TYPE policy_admission_shed_total counter" in response.text
+
+
+def test_metric_rendering():
+    shed = Counter("test_shed_total", "Shed")
+    shed.inc(reason="timeout")
+    shed.inc(2, reason="timeout")
+    assert shed.render()[-1] == 'test_shed_total{reason="timeout"} 3'
+
+    wait = Histogram("test_wait_seconds", "Wait", buckets=(0.1, 1.0))
+    wait.observe(0.05)
+    wait.observe(0.5)
+    wait.observe(5)
+    assert wait.render()[2:] == [
+        'test_wait_seconds_bucket{le="0.1"} 1',
+        'test_wait_seconds_bucket{le="1"} 2',
+        'test_wait_seconds_bucket{le="+Inf"} 3',
+        "test_wait_seconds_sum 5.55",
+        "test_wait_seconds_count 3",
+    ]
+    assert render_metrics().endswith("\n")
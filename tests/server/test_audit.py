@@ -0,0 +1,104 @@
+"""Tests for the buffered decision audit log."""
+
+import gzip
+import json
+import os
+import threading
+
+from src.server.audit import AuditSink
+from src.server.claude_code.api.pre_tool_use import PreToolUseInput
+from src.server.enums import SourceClient
+from src.server.models import PolicyDecision, PolicyGuidance, ToolUseEvent
+
+
+def _event() -> ToolUseEvent:
+    source = PreToolUseInput(
+        session_id="audit-session",
+        transcript_path="/tmp/transcript.jsonl",
+        cwd="/workspace",
+        hook_event_name="PreToolUse",
+        tool_name="Bash",
+        tool_input={"command": "rm -rf /"},
+    )
+    return ToolUseEvent(
+        session_id="audit-session",
+        source_client=SourceClient.CLAUDE_CODE,
+        source_event=source,
+        tool_name="Bash",
+        tool_is_bash=True,
+        command="rm -rf /",
+        enabled_bundles=["universal"],
+    )
+
+
+def _read_lines(path):
+    with open(path, encoding="utf-8") as audit_file:
+        return [json.loads(line) for line in audit_file]
+
+
+def test_records_request_and_results(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    sink = AuditSink(str(path))
+    results = [PolicyDecision.deny("no"), PolicyGuidance(content="careful")]
+
+    assert sink.record(_event(), results, 0.0025)
+    sink.close()
+
+    [line] = _read_lines(path)
+    assert line["type"] == "decision"
+    assert line["event_type"] == "ToolUseEvent"
+    assert line["session_id"] == "audit-session"
+    assert line["request"]["bundles"] == ["universal"]
+    assert line["request"]["event"]["tool_input"] == {"command": "rm -rf /"}
+    assert line["decisions"] == [{"action": "deny", "reason": "no", "flags": None}]
+    assert line["guidances"][0]["content"] == "careful"
+    assert line["timings"]["evaluation_ms"] == 2.5
+    assert sink.stats()["written"] == 1
+
+
+def test_request_is_replayable(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    sink = AuditSink(str(path))
+    sink.record(_event(), [], 0.0)
+    sink.close()
+
+    [line] = _read_lines(path)
+    replayed = PreToolUseInput.model_validate(line["request"]["event"])
+    assert replayed == _event().source_event
+
+
+def test_rotates_and_compresses(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    sink = AuditSink(str(path), max_bytes=1, compress=True, flush_interval=0.01)
+
+    for count in range(1, 4):
+        sink.record(_event(), [], 0.0)
+        # Wait for each record to be written so every batch hits a full file
+        while sink.stats()["written"] < count:
+            threading.Event().wait(0.01)
+    sink.close()
+
+    rotated = sorted(name for name in os.listdir(tmp_path) if name.endswith(".gz"))
+    assert len(rotated) == 2
+    with gzip.open(tmp_path / rotated[0], "rt", encoding="utf-8") as archived:
+        assert json.loads(archived.readline())["type"] == "decision"
+    assert len(_read_lines(path)) == 1
+
+
+def test_full_buffer_drops_and_reports(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    sink = AuditSink(str(path), buffer_size=2)
+
+    # Keep the writer from starting so nothing drains while the buffer fills
+    sink._ensure_writer = lambda: None
+    accepted = [sink.record(_event(), [], 0.0) for _ in range(5)]
+    assert accepted == [True, True, False, False, False]
+    assert sink.stats()["dropped"] == 3
+
+    del sink._ensure_writer
+    sink._ensure_writer()
+    sink.close()
+
+    lines = _read_lines(path)
+    assert [line["type"] for line in lines] == ["decision", "decision", "dropped"]
+    assert lines[-1]["count"] == 3
@@ -0,0 +1,74 @@
+"""Tests for environment-based server configuration."""
+
+import pytest
+from src.server.config import ServerConfig
+
+
+def test_defaults_match_single_process_server():
+    config = ServerConfig.from_env({})
+    assert (config.host, config.port, config.workers) == ("0.0.0.0", 8338, 1)
+
+
+def test_reads_prefixed_variables():
+    config = ServerConfig.from_env(
+        {
+            "POLICY_SERVER_HOST": "127.0.0.1",
+            "POLICY_SERVER_PORT": "9000",
+            "POLICY_SERVER_WORKERS": "4",
+            "POLICY_SERVER_REGO_PROCESS_WORKERS": "2",
+        }
+    )
+    assert config.host == "127.0.0.1"
+    assert config.port == 9000
+    assert config.workers == 4
+    assert config.rego_process_workers == 2
+
+
+def test_workers_is_at_least_one():
+    assert ServerConfig.from_env({"POLICY_SERVER_WORKERS": "0"}).workers == 1
+
+
+def test_malformed_integer_is_rejected():
+    with pytest.raises(ValueError, match="POLICY_SERVER_PORT"):
+        ServerConfig.from_env({"POLICY_SERVER_PORT": "http"})
+
+
+def test_unix_socket_settings():
+    config = ServerConfig.from_env(
+        {
+            "POLICY_SERVER_TCP": "false",
+            "POLICY_SERVER_UDS": "/run/policy.sock",
+            "POLICY_SERVER_UDS_MODE": "600",
+        }
+    )
+    assert config.tcp is False
+    assert config.uds_path == "/run/policy.sock"
+    assert config.uds_mode == 0o600
+
+
+def test_audit_settings():
+    config = ServerConfig.from_env(
+        {
+            "POLICY_SERVER_AUDIT_PATH": "/var/log/policy/audit.jsonl",
+            "POLICY_SERVER_AUDIT_ROTATE_SECONDS": "3600",
+            "POLICY_SERVER_AUDIT_COMPRESS": "yes",
+        }
+    )
+    assert config.audit_path == "/var/log/policy/audit.jsonl"
+    assert config.audit_rotate_seconds == 3600
+    assert config.audit_compress is True
+    assert ServerConfig().audit_path is None
+
+
+def test_guidance_sandbox_settings():
+    config = ServerConfig.from_env(
+        {
+            "POLICY_SERVER_GUIDANCE_PROCESS_WORKERS": "2",
+            "POLICY_SERVER_GUIDANCE_CHECK_TIMEOUT_MS": "250",
+            "POLICY_SERVER_GUIDANCE_CHECK_MEMORY_MB": "0",
+        }
+    )
+    assert config.guidance_process_workers == 2
+    assert config.guidance_check_timeout_ms == 250
+    assert config.guidance_check_memory_mb == 0
+    assert ServerConfig().guidance_process_workers == 0
@@ -0,0 +1,128 @@
+"""Tests for per-hook evaluation deadlines."""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from src.evaluation.parser import BashCommandParser
+from src.server import admission
+from src.server.config import ServerConfig
+from src.server.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    check_deadline,
+    current_deadline,
+    deadline_scope,
+    remaining_time,
+)
+from src.server.enums import SourceClient
+from src.server.executor import execute_handlers_generic
+from src.server.models import ToolUseEvent
+from src.server.responses import DEGRADED_HEADER
+from src.server.server import app
+
+EXPIRED = Deadline(expires_at=0.0)
+
+
+def test_deadline_scope_sets_and_restores_current_deadline():
+    deadline = Deadline.after(60)
+    assert current_deadline() is None
+    with deadline_scope(deadline):
+        assert current_deadline() is deadline
+        assert 59 < remaining_time(120) <= 60
+        assert remaining_time(5.0) == 5.0
+        check_deadline("executor")
+    assert current_deadline() is None
+    assert remaining_time(5.0) == 5.0
+
+
+def test_expired_deadline_names_the_stage():
+    with deadline_scope(EXPIRED), pytest.raises(DeadlineExceeded) as exc_info:
+        check_deadline("rego")
+    assert exc_info.value.stage == "rego"
+
+
+def test_parser_checks_deadline_before_parsing():
+    command = "echo deadline-parser-check"
+    with deadline_scope(EXPIRED), pytest.raises(DeadlineExceeded):
+        BashCommandParser.parse(command)
+    # Cached results cost nothing and are served even past the deadline
+    parsed = BashCommandParser.parse(command)
+    with deadline_scope(EXPIRED):
+        assert BashCommandParser.parse(command) is parsed
+
+
+def test_executor_propagates_deadline_exceeded():
+    event = ToolUseEvent(
+        session_id="deadline-session",
+        source_client=SourceClient.CLAUDE_CODE,
+        tool_name="Bash",
+        tool_is_bash=True,
+        command="git status",
+    )
+    with deadline_scope(EXPIRED), pytest.raises(DeadlineExceeded):
+        execute_handlers_generic(event)
+
+
+@pytest.fixture
+def slow_pipeline(monkeypatch):
+    def pipeline(input_data):
+        time.sleep(0.05)
+        check_deadline("rego")
+        return []
+
+    monkeypatch.setattr(admission, "execute_handlers_generic", pipeline)
+    admission.configure_admission(
+        ServerConfig(hook_deadlines_ms={"PreToolUse": 10, "*": 10})
+    )
+    yield TestClient(app)
+    admission.configure_admission(ServerConfig())
+
+
+def test_timed_out_hook_returns_default_with_reason(slow_pipeline):
+    response = slow_pipeline.post(
+        "/policy/claude-code/PreToolUse",
+        json={
+            "event": {
+                "session_id": "deadline-session",
+                "transcript_path": "/tmp/transcript.jsonl",
+                "cwd": "/workspace",
+                "hook_event_name": "PreToolUse",
+                "tool_name": "Bash",
+                "tool_input": {"command": "git status"},
+            },
+            "bundles": ["universal"],
+        },
+    )
+
+    assert response.headers[DEGRADED_HEADER] == "timeout"
+    output = response.json()["hookSpecificOutput"]
+    assert output["permissionDecision"] == "ask"
+    assert "timed out after 10 ms" in output["permissionDecisionReason"]
+
+
+def test_timed_out_cursor_hook_keeps_default_permission(slow_pipeline):
+    response = slow_pipeline.post(
+        "/policy/cursor/beforeShellExecution",
+        json={
+            "conversation_id": "deadline-conversation",
+            "generation_id": "gen",
+            "hook_event_name": "beforeShellExecution",
+            "workspace_roots": ["/workspace"],
+            "command": "git status",
+            "cwd": "/workspace",
+        },
+    )
+
+    assert response.headers[DEGRADED_HEADER] == "timeout"
+    assert response.json()["permission"] == "ask"
+    assert "timed out" in response.json()["userMessage"]
+
+
+def test_deadline_settings():
+    config = ServerConfig.from_env(
+        {"POLICY_SERVER_HOOK_DEADLINES_MS": "PreToolUse=200,*=500"}
+    )
+    assert config.hook_deadlines_ms == {"PreToolUse": 200.0, "*": 500.0}
+    with pytest.raises(ValueError, match="HOOK_DEADLINES_MS"):
+        ServerConfig.from_env({"POLICY_SERVER_HOOK_DEADLINES_MS": "PreToolUse=0"})
@@ -0,0 +1,43 @@
+"""Tests for binding the configured listeners."""
+
+import os
+import socket
+import stat
+
+import pytest
+from src.server.config import ServerConfig
+from src.server.listeners import bind_sockets, close_sockets
+
+
+def test_binds_unix_socket_with_permissions(tmp_path):
+    path = str(tmp_path / "policy.sock")
+    config = ServerConfig(tcp=False, uds_path=path, uds_mode=0o600)
+
+    sockets = bind_sockets(config)
+    try:
+        assert [sock.family for sock in sockets] == [socket.AF_UNIX]
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    finally:
+        close_sockets(sockets, config)
+
+    assert not os.path.exists(path)
+
+
+def test_replaces_stale_socket_but_not_regular_files(tmp_path):
+    path = str(tmp_path / "policy.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    config = ServerConfig(tcp=False, uds_path=path)
+
+    close_sockets(bind_sockets(config), config)
+
+    regular = tmp_path / "file"
+    regular.write_text("data")
+    with pytest.raises(FileExistsError):
+        bind_sockets(ServerConfig(tcp=False, uds_path=str(regular)))
+
+
+def test_requires_a_listener():
+    with pytest.raises(ValueError):
+        bind_sockets(ServerConfig(tcp=False))
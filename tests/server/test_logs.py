@@ -0,0 +1,118 @@
+"""Tests for structured, sampled hook logging."""
+
+import json
+import logging
+import os
+
+import pytest
+from src.server import logs
+from src.server.config import ServerConfig
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def hook_logger():
+    logger = logging.getLogger("tests.hook_logging")
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger, handler.records
+    logger.removeHandler(handler)
+    logs.set_sample_rates({})
+    logs.disable_session_debug("debug-session")
+
+
+def _explode():
+    raise AssertionError("payload built for a record that is not emitted")
+
+
+def test_payload_not_built_when_level_disabled(hook_logger):
+    logger, records = hook_logger
+    logs.log_hook(logger, "PreToolUse", "s", "m", _explode, level=logging.DEBUG)
+    assert records == []
+
+
+def test_sampling_rate_zero_drops_hook(hook_logger):
+    logger, records = hook_logger
+    logs.set_sample_rates({"PreToolUse": 0.0})
+
+    logs.log_hook(logger, "PreToolUse", "s", "m", _explode)
+    logs.log_hook(logger, "Stop", "s", "m")
+
+    assert [record.hook for record in records] == ["Stop"]
+
+
+def test_debug_session_bypasses_level_and_sampling(hook_logger):
+    logger, records = hook_logger
+    logs.set_sample_rates({"PreToolUse": 0.0})
+    logs.enable_session_debug("debug-session")
+
+    logs.log_hook(
+        logger,
+        "PreToolUse",
+        "debug-session",
+        "Hook received",
+        lambda: {"command": "ls"},
+        level=logging.DEBUG,
+    )
+
+    assert len(records) == 1
+    assert records[0].command == "ls"
+    assert records[0].session_id == "debug-session"
+
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.makeLogRecord(
+        {"name": "x", "levelname": "INFO", "msg": "Hook outcome", "hook": "Stop"}
+    )
+    payload = json.loads(logs.JsonFormatter().format(record))
+
+    assert payload["message"] == "Hook outcome"
+    assert payload["hook"] == "Stop"
+
+
+def test_sample_rates_from_env():
+    config = ServerConfig.from_env(
+        {"POLICY_SERVER_LOG_SAMPLE_RATES": "PreToolUse=0.1, Stop=1"}
+    )
+    assert config.log_sample_rates == {"PreToolUse": 0.1, "Stop": 1.0}
+
+    with pytest.raises(ValueError):
+        ServerConfig.from_env({"POLICY_SERVER_LOG_SAMPLE_RATES": "PreToolUse=2"})
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_forked_child_writes_logs():
+    read_fd, write_fd = os.pipe()
+    level = logging.getLogger().level
+    logs.setup_logging(ServerConfig(log_format="text", log_level="INFO"))
+    try:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                logs._listener.handlers[0].setStream(os.fdopen(write_fd, "w"))
+                logging.getLogger("tests.fork").warning("from child")
+                logs._stop_listener()
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd) as output:
+            assert output.read() == "WARNING:tests.fork:from child\n"
+    finally:
+        logs._stop_listener()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, logs._DeferredQueueHandler):
+                root.removeHandler(handler)
+        root.setLevel(level)
+        logs._listener = None
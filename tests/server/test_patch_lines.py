@@ -0,0 +1,122 @@
+"""Tests for the compact structured patch representation."""
+
+import pickle
+
+import pytest
+from pydantic import ValidationError
+from regopy import Interpreter
+
+from src.evaluation.rego import RegoEvaluator
+from src.server.claude_code.mapper import _parse_patch_lines
+from src.server.enums import SourceClient
+from src.server.models import (
+    PatchLine,
+    PatchLines,
+    PostFileEditEvent,
+    StructuredPatch,
+)
+
+RAW = ["+# comment", " code", "-old_code", "bare", "", "+", " "]
+
+EXPECTED = [
+    ("added", "# comment"),
+    ("unchanged", "code"),
+    ("removed", "old_code"),
+    ("unchanged", "bare"),
+    ("unchanged", ""),
+    ("added", ""),
+    ("unchanged", ""),
+]
+
+
+def test_parse_patch_lines_separates_operation_and_content():
+    lines = _parse_patch_lines(RAW)
+
+    assert isinstance(lines, PatchLines)
+    assert list(lines.pairs()) == EXPECTED
+    assert [lines.operation(i) for i in range(len(lines))] == [e[0] for e in EXPECTED]
+    assert [lines.content(i) for i in range(len(lines))] == [e[1] for e in EXPECTED]
+    assert lines.count_operation("unchanged") == 4
+
+
+def test_indexing_returns_patch_lines_for_compatibility():
+    lines = PatchLines.from_diff(RAW)
+
+    assert lines[0] == PatchLine(operation="added", content="# comment")
+    assert lines[-1].operation == "unchanged"
+    assert [line.content for line in lines[1:3]] == ["code", "old_code"]
+    assert lines == [PatchLine(operation=op, content=c) for op, c in EXPECTED]
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        [PatchLine(operation=op, content=c) for op, c in EXPECTED],
+        [{"operation": op, "content": c} for op, c in EXPECTED],
+        EXPECTED,
+    ],
+)
+def test_structured_patch_compacts_line_lists(lines):
+    patch = StructuredPatch(oldStart=1, oldLines=0, newStart=1, newLines=7, lines=lines)
+
+    assert isinstance(patch.lines, PatchLines)
+    assert list(patch.lines.pairs()) == EXPECTED
+    assert patch.model_dump()["lines"] == [
+        {"operation": op, "content": c} for op, c in EXPECTED
+    ]
+
+
+def test_structured_patch_rejects_unknown_operation():
+    with pytest.raises(ValidationError):
+        StructuredPatch(
+            oldStart=1,
+            oldLines=0,
+            newStart=1,
+            newLines=1,
+            lines=[{"operation": "moved", "content": "x"}],
+        )
+
+
+def test_documents_view_builds_rego_objects_on_access():
+    documents = PatchLines.from_diff(RAW).documents()
+
+    assert len(documents) == len(RAW)
+    assert documents[2] == {"operation": "removed", "content": "old_code"}
+    assert list(documents) == [{"operation": op, "content": c} for op, c in EXPECTED]
+    assert list(pickle.loads(pickle.dumps(documents))) == list(documents)
+
+
+def test_rego_reads_lines_from_view():
+    patch = StructuredPatch(
+        oldStart=1,
+        oldLines=0,
+        newStart=1,
+        newLines=len(RAW),
+        lines=PatchLines.from_diff(RAW),
+    )
+    event = PostFileEditEvent(
+        session_id="patch-session",
+        source_client=SourceClient.CLAUDE_CODE,
+        file_path="a.py",
+        structured_patch=[patch],
+    )
+    evaluator = RegoEvaluator.__new__(RegoEvaluator)
+    input_doc = evaluator._build_file_edit_input_document(event)
+
+    interpreter = Interpreter()
+    interpreter.set_input(input_doc)
+    output = interpreter.query("x := input.structured_patch[0].lines[2]")
+
+    assert output.binding("x").json() == '{"content":"old_code", "operation":"removed"}'
+
+
+def test_digest_depends_on_content_only():
+    same = PatchLines.from_diff(list(RAW))
+
+    assert PatchLines.from_diff(RAW).digest() == same.digest()
+    assert PatchLines.from_diff(["+ab", "+c"]).digest() != (
+        PatchLines.from_diff(["+a", "+bc"]).digest()
+    )
+    assert (
+        PatchLines.from_diff(["+a"]).digest() != PatchLines.from_diff(["-a"]).digest()
+    )
@@ -0,0 +1,103 @@
+"""Tests for state shared between pre-forked workers."""
+
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+WORKERS = 3
+REQUESTS = 12
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, path: str):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def _request(path: str, method: str, url: str, body=None):
+    """Send one request on a fresh connection, so any worker may accept it."""
+    conn = UnixHTTPConnection(path)
+    try:
+        conn.request(
+            method,
+            url,
+            body=json.dumps(body) if body is not None else None,
+            headers={"Content-Type": "application/json"},
+        )
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def prefork_server(tmp_path):
+    path = str(tmp_path / "policy.sock")
+    env = dict(
+        os.environ,
+        POLICY_SERVER_TCP="false",
+        POLICY_SERVER_UDS=path,
+        POLICY_SERVER_WORKERS=str(WORKERS),
+        POLICY_SERVER_RATE_LIMITS="PreToolUse=0.001:2",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.main"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                _request(path, "GET", "/admin/sessions")
+                break
+            except OSError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    pytest.fail("Pre-forked server did not start")
+                time.sleep(0.1)
+        yield path
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=10)
+
+
+def test_rate_limit_is_shared_by_workers(prefork_server):
+    body = {
+        "event": {
+            "session_id": "prefork-session",
+            "transcript_path": "/tmp/transcript.jsonl",
+            "cwd": "/workspace",
+            "hook_event_name": "PreToolUse",
+            "tool_name": "Bash",
+            "tool_input": {"command": "ls"},
+        },
+        "bundles": ["universal"],
+    }
+
+    decisions = [
+        _request(prefork_server, "POST", "/policy/claude-code/PreToolUse", body)[1][
+            "hookSpecificOutput"
+        ]["permissionDecision"]
+        for _ in range(REQUESTS)
+    ]
+
+    assert decisions == ["allow"] * 2 + ["ask"] * (REQUESTS - 2)
+    for _ in range(WORKERS * 2):
+        assert _request(prefork_server, "GET", "/admin/sessions/prefork-session") == (
+            200,
+            {"allowed": {"PreToolUse": 2}, "limited": {"PreToolUse": REQUESTS - 2}},
+        )
@@ -0,0 +1,150 @@
+"""Tests for per-session rate limiting."""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from src.server import ratelimit
+from src.server.config import ServerConfig
+from src.server.ratelimit import (
+    SessionRateLimiter,
+    SharedSessionRateLimiter,
+    TokenBucket,
+)
+from src.server.responses import DEGRADED_HEADER
+from src.server.server import app
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2, burst=2, tokens=2, updated=0.0)
+    assert bucket.take(0.0)
+    assert bucket.take(0.0)
+    assert not bucket.take(0.0)
+    assert bucket.take(0.5)
+    assert not bucket.take(0.5)
+
+
+@pytest.fixture(params=["memory", "shared"])
+def make_limiter(request, tmp_path):
+    """Build limiters keeping state in memory or in a shared database."""
+
+    def make(limits, **kwargs):
+        if request.param == "shared":
+            return SharedSessionRateLimiter(
+                limits, str(tmp_path / "shared.sqlite3"), **kwargs
+            )
+        return SessionRateLimiter(limits, **kwargs)
+
+    return make
+
+
+def test_limits_are_per_session_and_hook(make_limiter):
+    limiter = make_limiter({"PreToolUse": (0.001, 2)})
+
+    assert [limiter.allow("looping", "PreToolUse") for _ in range(3)] == [
+        True,
+        True,
+        False,
+    ]
+    assert limiter.allow("other", "PreToolUse")
+    assert limiter.allow("looping", "PostToolUse")
+
+    assert limiter.session_stats("looping") == {
+        "allowed": {"PreToolUse": 2, "PostToolUse": 1},
+        "limited": {"PreToolUse": 1},
+    }
+    assert limiter.session_stats("unknown") is None
+
+
+def test_wildcard_limit_applies_to_unlisted_hooks(make_limiter):
+    limiter = make_limiter({"*": (0.001, 1), "Stop": (0.001, 3)})
+    assert limiter.allow("s", "PostToolUse")
+    assert not limiter.allow("s", "PostToolUse")
+    assert all(limiter.allow("s", "Stop") for _ in range(3))
+
+
+def test_least_recently_seen_sessions_are_dropped(make_limiter):
+    limiter = make_limiter({}, max_sessions=2)
+    for session_id in ("a", "b", "a", "c"):
+        limiter.allow(session_id, "Stop")
+    assert set(limiter.stats()) == {"a", "c"}
+
+
+def test_shared_limiter_is_one_limit_across_processes(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    limiter = SharedSessionRateLimiter({"PreToolUse": (0.001, 2)}, path)
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            limiter.allow("forked", "PreToolUse")
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    other = SharedSessionRateLimiter({"PreToolUse": (0.001, 2)}, path)
+    assert [other.allow("forked", "PreToolUse") for _ in range(2)] == [True, False]
+    assert limiter.session_stats("forked") == {
+        "allowed": {"PreToolUse": 2},
+        "limited": {"PreToolUse": 1},
+    }
+
+
+def test_rate_limits_config():
+    config = ServerConfig.from_env(
+        {"POLICY_SERVER_RATE_LIMITS": "PreToolUse=20:40, *=50"}
+    )
+    assert config.rate_limits == {"PreToolUse": (20.0, 40.0), "*": (50.0, 50.0)}
+
+    with pytest.raises(ValueError, match="POLICY_SERVER_RATE_LIMITS"):
+        ServerConfig.from_env({"POLICY_SERVER_RATE_LIMITS": "PreToolUse=fast"})
+
+
+@pytest.fixture
+def limited_client():
+    ratelimit.rate_limiter = SessionRateLimiter({"PreToolUse": (0.001, 1)})
+    yield TestClient(app)
+    ratelimit.configure_rate_limits(ServerConfig())
+
+
+def _pre_tool_use(session_id: str) -> dict:
+    return {
+        "event": {
+            "session_id": session_id,
+            "transcript_path": "/tmp/transcript.jsonl",
+            "cwd": "/workspace",
+            "hook_event_name": "PreToolUse",
+            "tool_name": "Bash",
+            "tool_input": {"command": "ls"},
+        },
+        "bundles": ["universal"],
+    }
+
+
+def test_over_limit_request_gets_default_response(limited_client):
+    first = limited_client.post(
+        "/policy/claude-code/PreToolUse", json=_pre_tool_use("loop-session")
+    )
+    second = limited_client.post(
+        "/policy/claude-code/PreToolUse", json=_pre_tool_use("loop-session")
+    )
+
+    assert DEGRADED_HEADER not in first.headers
+    assert first.json()["hookSpecificOutput"]["permissionDecision"] == "allow"
+    assert second.headers[DEGRADED_HEADER] == "rate_limited"
+    assert second.json()["hookSpecificOutput"]["permissionDecision"] == "ask"
+
+
+def test_admin_endpoint_reports_session_counts(limited_client):
+    for _ in range(3):
+        limited_client.post(
+            "/policy/claude-code/PreToolUse", json=_pre_tool_use("admin-session")
+        )
+
+    response = limited_client.get("/admin/sessions/admin-session")
+    assert response.json() == {
+        "allowed": {"PreToolUse": 1},
+        "limited": {"PreToolUse": 2},
+    }
+    assert "admin-session" in limited_client.get("/admin/sessions").json()["sessions"]
+    assert limited_client.get("/admin/sessions/unknown").status_code == 404
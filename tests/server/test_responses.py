@@ -0,0 +1,49 @@
+"""Tests for fast hook response rendering."""
+
+import json
+
+from fastapi.encoders import jsonable_encoder
+from src.server.claude_code.api.enums import PermissionDecision
+from src.server.claude_code.api.pre_tool_use import (
+    PreToolUseHookSpecificOutput,
+    PreToolUseOutput,
+)
+from src.server.cursor.api.before_shell_execution import BeforeShellExecutionOutput
+from src.server.cursor.api.common import Permission
+from src.server.responses import _templates, render, serialize
+
+
+def _fastapi_json(model):
+    return jsonable_encoder(model, by_alias=True, exclude_none=True)
+
+
+def test_template_is_used_for_plain_decision():
+    model = PreToolUseOutput(
+        continue_=True,
+        hookSpecificOutput=PreToolUseHookSpecificOutput(
+            permissionDecision=PermissionDecision.ALLOW
+        ),
+    )
+    body = render(model)
+
+    assert any(body is template for _, template in _templates[PreToolUseOutput])
+    assert json.loads(body) == _fastapi_json(model)
+
+
+def test_messages_are_rendered_without_template():
+    model = PreToolUseOutput(
+        continue_=True,
+        systemMessage="Use uv instead",
+        hookSpecificOutput=PreToolUseHookSpecificOutput(
+            permissionDecision=PermissionDecision.DENY,
+            permissionDecisionReason="Use uv instead",
+        ),
+    )
+
+    assert render(model) == serialize(model)
+    assert json.loads(render(model)) == _fastapi_json(model)
+
+
+def test_cursor_permission_template():
+    model = BeforeShellExecutionOutput(permission=Permission.ASK)
+    assert json.loads(render(model)) == {"permission": "ask"}
@@ -1,5 +1,7 @@
 """Tests for session flag management."""
 
+import os
+
 import pytest
 from unittest.mock import patch
 from src.server.session import (
@@ -10,14 +12,18 @@ from src.server.session import (
     clear_flags,
     get_all_flags,
     initialize_flags_storage,
+    use_shared_store,
 )
 
 
-@pytest.fixture(autouse=True)
-def setup_flags():
-    """Initialize flags storage before each test."""
+@pytest.fixture(autouse=True, params=["memory", "shared"])
+def setup_flags(request, tmp_path):
+    """Initialize flags storage before each test, in memory and shared."""
     initialize_flags_storage()
-    yield
+    if request.param == "shared":
+        use_shared_store(str(tmp_path / "flags.sqlite3"))
+    yield request.param
+    use_shared_store(None)
     # No cleanup needed - each test uses unique session IDs
 
 
@@ -208,3 +214,27 @@ def test_no_expiration_flag_persists():
     # Cleanup shouldn't remove it
     cleanup_expired_flags(session_id)
     assert get_flag(session_id, "persistent") is True
+
+
+def test_shared_flags_seen_across_processes(setup_flags):
+    """Test that a forked worker's flag changes reach the other workers."""
+    if setup_flags != "shared":
+        pytest.skip("in-memory flags are per process")
+    session_id = "test-session-forked"
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            set_flag(
+                session_id,
+                {"name": "lint", "expires_after": 2, "expires_unit": "invocations"},
+            )
+            decrement_invocation_flags(session_id)
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert get_flag(session_id, "lint") is True
+    decrement_invocation_flags(session_id)
+    cleanup_expired_flags(session_id)
+    assert get_all_flags(session_id) == {}